@@ -11,6 +11,7 @@ from trend_scrapping_node import (
 	process_extractions_and_recommend,
 	align_extractions_with_profile,
 )
+import tracing
 
 
 class ApprovalDecision(str):
@@ -111,82 +112,99 @@ def run_interaction(
 	save_profile: Optional[Callable[[UserProfile], None]] = None,
 	log_event: Optional[Callable[[InteractionEvent], None]] = None,
 	tune_trend_model: Optional[Callable[[Dict[str, Any]], None]] = None,
+	aligned: Optional[UserProfile] = None,
+	recs: Optional[List[CareerActionRecommendation]] = None,
 ) -> Dict[str, Any]:
 	"""Orchestrate a user interaction cycle:
 	1) Ask personalized questions to enrich the profile
 	2) Present recommendations and collect approval/feedback
 	3) Propose validation tasks for existing skills with approval
 	Applies updates and optionally persists/logs via callbacks.
+	Pass `aligned` and `recs` when they are already computed for these extracts
+	(agent.trend_scrapping_node) to skip re-running alignment and the rules.
 	Returns a dict with updated profile, questions asked, decisions, and tasks.
 	"""
 
 	logs: List[InteractionEvent] = []
 
 	# 1) Personalized questions
-	questions = generate_personalized_questions(user)
-	answers: Dict[str, str] = {}
-	for q in questions:
-		ans = ask(q) if ask else ""
-		answers[q] = ans
-		evt = InteractionEvent(event_type="question", message=q, payload={"answer": ans})
-		logs.append(evt)
-		if log_event:
-			log_event(evt)
+	with tracing.span("interaction_questions"):
+		questions = generate_personalized_questions(user)
+		answers: Dict[str, str] = {}
+		for q in questions:
+			ans = ask(q) if ask else ""
+			answers[q] = ans
+			evt = InteractionEvent(event_type="question", message=q, payload={"answer": ans})
+			logs.append(evt)
+			if log_event:
+				log_event(evt)
 
 	# Apply simple enrichments from answers (lightweight parsing)
-	if answers.get("What's your current city and country?") and not user.location:
-		user.location = answers["What's your current city and country?"]
-
-	# 2) Build/align and get recommendations
-	aligned, recs = process_extractions_and_recommend(
-		user,
-		github=github_extract,
-		linkedin=linkedin_extract,
-		hf_models=hf_models,
-	)
+	location = answers.get("What's your current city and country?")
+	if location and not user.location:
+		user.location = location
+
+	# 2) Build/align and get recommendations, unless the caller passed them in
+	if aligned is None or recs is None:
+		with tracing.span("interaction_recommendations"):
+			aligned, recs = process_extractions_and_recommend(
+				user,
+				github=github_extract,
+				linkedin=linkedin_extract,
+				hf_models=hf_models,
+			)
+	elif location and not aligned.location:
+		aligned.location = location
 
 	# Present recs and gather approvals
-	decisions: List[Tuple[CareerActionRecommendation, str]] = []
-	for rec in recs:
-		prompt = (
-			f"Recommendation: {rec.title}\n"
-			f"Why: {rec.reason or ''}\n"
-			f"Actions: {', '.join(rec.suggested_actions)}\n"
-			"Approve, Defer, or Reject?"
-		)
-		decision = confirm(prompt) if confirm else ApprovalDecision.DEFERRED
-		rec.approval_status = decision
-		decisions.append((rec, decision))
-		evt = InteractionEvent(event_type="recommendation_decision", message=rec.title, payload={"decision": decision})
-		logs.append(evt)
-		if log_event:
-			log_event(evt)
+	with tracing.span("interaction_approvals"):
+		decisions: List[Tuple[CareerActionRecommendation, str]] = []
+		for rec in recs:
+			prompt = (
+				f"Recommendation: {rec.title}\n"
+				f"Why: {rec.reason or ''}\n"
+				f"Actions: {', '.join(rec.suggested_actions)}\n"
+				"Approve, Defer, or Reject?"
+			)
+			decision = confirm(prompt) if confirm else ApprovalDecision.DEFERRED
+			rec.approval_status = decision
+			decisions.append((rec, decision))
+			evt = InteractionEvent(event_type="recommendation_decision", message=rec.title, payload={"decision": decision})
+			logs.append(evt)
+			if log_event:
+				log_event(evt)
 
 	# 3) Propose validation tasks and seek approval
-	tasks = propose_skill_validation_tasks(aligned)
-	approved_tasks: List[ValidationTask] = []
-	for task in tasks:
-		decision = confirm(f"Task: {task.title}\n{task.description}\nApprove?") if confirm else ApprovalDecision.DEFERRED
-		evt = InteractionEvent(event_type="task_decision", message=task.title, payload={"decision": decision})
-		logs.append(evt)
-		if log_event:
-			log_event(evt)
-		if decision == ApprovalDecision.APPROVED:
-			approved_tasks.append(task)
-			# Optionally add a planned project entry
-			aligned.projects.append(
-				Projects(
-					name=f"Planned: {task.title}",
-					description=task.description,
-					technologies=[task.related_skill] if task.related_skill else [],
-					link=None,
-					interactions=None,
-				)
-			)
+	with tracing.span("interaction_validation_tasks"):
+		tasks = propose_skill_validation_tasks(aligned)
+		approved_tasks: List[ValidationTask] = []
+		planned = {p.name for p in aligned.projects}
+		for task in tasks:
+			decision = confirm(f"Task: {task.title}\n{task.description}\nApprove?") if confirm else ApprovalDecision.DEFERRED
+			evt = InteractionEvent(event_type="task_decision", message=task.title, payload={"decision": decision})
+			logs.append(evt)
+			if log_event:
+				log_event(evt)
+			if decision == ApprovalDecision.APPROVED:
+				approved_tasks.append(task)
+				# Optionally add a planned project entry (once; re-approving in a later cycle is a no-op)
+				name = f"Planned: {task.title}"
+				if name not in planned:
+					planned.add(name)
+					aligned.projects.append(
+						Projects(
+							name=name,
+							description=task.description,
+							technologies=[task.related_skill] if task.related_skill else [],
+							link=None,
+							interactions=None,
+						)
+					)
 
 	# Persist updates
 	if save_profile:
-		save_profile(aligned)
+		with tracing.span("interaction_save_profile"):
+			save_profile(aligned)
 
 	# Optional: provide feedback to trend model (e.g., approvals/deferals)
 	if tune_trend_model:
@@ -4,12 +4,16 @@ from datetime import datetime, timedelta
 from typing import Callable, Dict, List, Optional, Tuple, Any, TypedDict
 
 try:
+    from langgraph.checkpoint.memory import MemorySaver
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
     from langgraph.graph import StateGraph, END
+    from langgraph.types import Command, interrupt
 except ImportError as e:
     raise ImportError(
         "langgraph is required for agent graph orchestration. Install with: pip install langgraph"
     ) from e
 
+import schemas
 from schemas import (
     UserProfile,
     GitHubUserExtract,
@@ -17,8 +21,11 @@ from schemas import (
     HuggingFaceModelExtract,
     CareerActionRecommendation,
 )
-from trend_scrapping_node import process_extractions_and_recommend
-from User_interaction_node import run_interaction
+import trend_scrapping_node as trends
+from trend_scrapping_node import apply_extractions_and_recommend, process_extractions_and_recommend
+from User_interaction_node import ApprovalDecision, run_interaction
+from metrics import timed
+import tracing
 
 
 # Optional pluggable callbacks (override from your app before building the graph)
@@ -26,6 +33,18 @@ RUN_USER_PROCESSING_CB: Optional[
     Callable[[UserProfile], Tuple[UserProfile, Optional[GitHubUserExtract], Optional[LinkedInProfileExtract], Optional[List[HuggingFaceModelExtract]]]]
 ] = None
 
+# Persist the profile after each interaction, e.g. profile_index.save_user_profile
+# (writes users.profile_data plus the user_skill/user_project/user_certification rows)
+SAVE_PROFILE_CB: Optional[Callable[[UserProfile], Any]] = None
+
+# Concurrent per-source ingestion used when RUN_USER_PROCESSING_CB is unset,
+# e.g. ingestion.Ingestion.from_env() (per-source deadlines/retries, cached extracts kept on failure)
+INGESTION: Optional[Any] = None
+
+# Persist AgentState after every node, e.g. checkpoint_store.AgentCheckpointStore()
+# (writes only the fields whose content changed)
+CHECKPOINT_STORE: Optional[Any] = None
+
 
 class AgentState(TypedDict, total=False):
     user: UserProfile
@@ -36,6 +55,33 @@ class AgentState(TypedDict, total=False):
     last_user_processing_at: Optional[datetime]
     next_user_processing_at: Optional[datetime]
     schedule_interval_days: int
+    # Event that resumed a suspended user, consumed by the next node
+    pending_event: Optional[Dict[str, Any]]
+    # Extracts from sources without a dedicated field above, keyed by DataSource value
+    extracts: Dict[str, Any]
+    # Last ingestion outcome per source: status, seconds, attempts, error
+    ingestion: Dict[str, Dict[str, Any]]
+    # fetched_at of the extracts already aligned into `user`, per DataSource value (delta alignment)
+    aligned_through: Dict[str, datetime]
+
+
+# --- Events ---
+#
+# A user whose processing isn't due is suspended in wait_for_event (LangGraph
+# interrupt + checkpointer), so an idle user costs no CPU. resume_agent() wakes it with
+#   {"type": "answer", "answers": {question: answer}}
+#   {"type": "approval", "decisions": {recommendation or task title: "Approved"/"Deferred"/"Rejected"}}
+#   {"type": "profile_edit", "user": UserProfile or dict}
+#   {"type": "timer"}  - sent by whoever owns the clock once next_user_processing_at passes
+INTERACTION_EVENTS = ("answer", "approval", "profile_edit")
+TIMER_EVENT = "timer"
+
+# Checkpointed states hold schemas models; allow exactly those when restoring
+CHECKPOINT_MODELS = [
+    ("schemas", name)
+    for name, obj in vars(schemas).items()
+    if isinstance(obj, type) and issubclass(obj, (schemas.BaseModel, schemas.Enum)) and obj.__module__ == "schemas"
+]
 
 
 # --- Nodes ---
@@ -44,12 +90,17 @@ def user_processing_node(state: AgentState) -> AgentState:
     user = state["user"]
     # Invoke custom ingestion if provided; else no-op (keep previous extracts)
     if RUN_USER_PROCESSING_CB is not None:
-        user, github, linkedin, hf_models = RUN_USER_PROCESSING_CB(user)
+        with tracing.span("user_processing_callback"):
+            user, github, linkedin, hf_models = RUN_USER_PROCESSING_CB(user)
         state["user"] = user
         state["github"] = github
         state["linkedin"] = linkedin
         state["hf_models"] = hf_models
+    elif INGESTION is not None:
+        with tracing.span("ingestion"):
+            state = INGESTION.run(state)
 
+    state["pending_event"] = None
     now = datetime.now()
     state["last_user_processing_at"] = now
     interval_days = int(state.get("schedule_interval_days", 7))
@@ -64,12 +115,25 @@ def trend_scrapping_node(state: AgentState) -> AgentState:
         state.get("linkedin"),
         state.get("hf_models"),
     )
-    aligned_user, recs = process_extractions_and_recommend(user, github=github, linkedin=linkedin, hf_models=hf_models)
+    if trends.ALIGN_MODE == "delta":
+        # Only extract items newer than the last aligned fetch; patches the profile in place
+        aligned_user, recs, patch = apply_extractions_and_recommend(
+            user, github=github, linkedin=linkedin, hf_models=hf_models, since=state.get("aligned_through")
+        )
+        state["aligned_through"] = {**(state.get("aligned_through") or {}), **patch.fetched_at}
+    else:
+        aligned_user, recs = process_extractions_and_recommend(user, github=github, linkedin=linkedin, hf_models=hf_models)
     state["user"] = aligned_user
     state["recs"] = recs
     return state
 
 
+def _prompt_title(prompt: str) -> str:
+    # run_interaction prompts start with "Recommendation: <title>" or "Task: <title>"
+    first_line = prompt.split("\n", 1)[0]
+    return first_line.split(": ", 1)[1] if ": " in first_line else first_line
+
+
 def user_interaction_node(state: AgentState) -> AgentState:
     user, github, linkedin, hf_models = (
         state["user"],
@@ -77,67 +141,192 @@ def user_interaction_node(state: AgentState) -> AgentState:
         state.get("linkedin"),
         state.get("hf_models"),
     )
+    # trend_scrapping_node already aligned state["user"] and computed recs for these extracts
+    recs = state.get("recs")
+    event = state.get("pending_event") or {}
+    state["pending_event"] = None
+    if event.get("type") == "profile_edit" and event.get("user") is not None:
+        edited = event["user"]
+        user = edited if isinstance(edited, UserProfile) else UserProfile.model_validate(edited)
+        recs = None  # the edited profile needs re-aligning
+    answers = event.get("answers") or {}
+    decisions = event.get("decisions") or {}
+
     # Reuse interaction flow; it internally handles approvals/tasks
-    result = run_interaction(user, github_extract=github, linkedin_extract=linkedin, hf_models=hf_models)
+    result = run_interaction(
+        user,
+        github_extract=github,
+        linkedin_extract=linkedin,
+        hf_models=hf_models,
+        ask=lambda question: answers.get(question, ""),
+        confirm=lambda prompt: decisions.get(_prompt_title(prompt), ApprovalDecision.DEFERRED),
+        save_profile=SAVE_PROFILE_CB,
+        aligned=user if recs is not None else None,
+        recs=recs,
+    )
     state["user"] = result["updated_profile"]
-    # Keep recommendations as context (could be refreshed next cycle)
-    state.setdefault("recs", [])
+    # Keep recommendations (with their approval status) as context until the next cycle refreshes them
+    state["recs"] = result["recommendations"]
     return state
 
 
+def _extract_sizes(state: AgentState) -> Dict[str, int]:
+    user, github, linkedin = state["user"], state.get("github"), state.get("linkedin")
+    return {
+        "github_repos": len(github.repositories) if github else 0,
+        "linkedin_skills": len(linkedin.skills) if linkedin else 0,
+        "linkedin_posts": len(linkedin.posts) if linkedin else 0,
+        "hf_models": len(state.get("hf_models") or []),
+        "profile_skills": len(user.skills or []),
+        "profile_projects": len(user.projects or []),
+    }
+
+
+def _traced(name: str, run: Callable[[AgentState], AgentState], state: AgentState) -> AgentState:
+    user = state["user"]
+    token = tracing.current_user.set(str(user.id if user.id is not None else user.email))
+    try:
+        with tracing.span(name, args=lambda: _extract_sizes(state)):
+            return run(state)
+    finally:
+        tracing.current_user.reset(token)
+
+
+def _node(name: str, fn: Callable[[AgentState], AgentState], timing: bool = True) -> Callable[[AgentState], AgentState]:
+    # Node wall times are exported as lakshsetu_agent_node_duration_seconds{node};
+    # with tracing enabled each call is also a span (see tracing.py)
+    run = timed(name, fn) if timing else fn
+
+    def wrapper(state: AgentState) -> AgentState:
+        state = run(state) if tracing.get_tracer() is None else _traced(name, run, state)
+        if CHECKPOINT_STORE is not None:
+            CHECKPOINT_STORE.save(state)
+        return state
+
+    wrapper.__name__ = name
+    return wrapper
+
+
 # --- Routing helpers ---
 
-def route_after_interaction(state: AgentState) -> str:
-    """Loop in interaction until the next scheduled processing time."""
+def wait_for_event_node(state: AgentState) -> AgentState:
+    """Suspend until an external event arrives or processing is due.
+
+    interrupt() checkpoints the state and ends the current invoke; the node
+    re-runs on resume_agent() and interrupt() then returns the event.
+    """
     next_at = state.get("next_user_processing_at")
-    now = datetime.now()
-    if next_at and now >= next_at:
+    if next_at and datetime.now() >= next_at:
+        state["pending_event"] = {"type": TIMER_EVENT}
+        return state
+    event = interrupt({"resume_at": next_at})
+    state["pending_event"] = event or {"type": TIMER_EVENT}
+    return state
+
+
+def route_after_wake(state: AgentState) -> str:
+    """Reprocess once due, re-run interaction for user events, else suspend again."""
+    next_at = state.get("next_user_processing_at")
+    if next_at and datetime.now() >= next_at:
         return "user_processing"
-    return "user_interaction"
+    if (state.get("pending_event") or {}).get("type") in INTERACTION_EVENTS:
+        return "user_interaction"
+    return "wait_for_event"
 
 
 # --- Graph factory ---
 
-def build_agent(user: UserProfile, schedule_interval_days: int = 7):
+def build_agent(user: UserProfile, schedule_interval_days: int = 7, checkpointer=None):
     """Build and compile the LangGraph app with initial state returned.
 
+    Suspending needs a checkpointer (in-memory by default), so invoke with
+    agent_config(user) and continue with resume_agent().
+
     Returns: (app, initial_state)
     """
     sg = StateGraph(AgentState)
-    sg.add_node("user_processing", user_processing_node)
-    sg.add_node("trend_scrapping", trend_scrapping_node)
-    sg.add_node("user_interaction", user_interaction_node)
+    sg.add_node("user_processing", _node("user_processing", user_processing_node))
+    sg.add_node("trend_scrapping", _node("trend_scrapping", trend_scrapping_node))
+    sg.add_node("user_interaction", _node("user_interaction", user_interaction_node))
+    sg.add_node("wait_for_event", _node("wait_for_event", wait_for_event_node, timing=False))
 
     sg.set_entry_point("user_processing")
     sg.add_edge("user_processing", "trend_scrapping")
     sg.add_edge("trend_scrapping", "user_interaction")
+    sg.add_edge("user_interaction", "wait_for_event")
     sg.add_conditional_edges(
-        "user_interaction",
-        route_after_interaction,
+        "wait_for_event",
+        route_after_wake,
         {
             "user_processing": "user_processing",
             "user_interaction": "user_interaction",
+            "wait_for_event": "wait_for_event",
         },
     )
 
-    app = sg.compile()
-    init_state: AgentState = {
+    if checkpointer is None:
+        checkpointer = MemorySaver(serde=JsonPlusSerializer(allowed_msgpack_modules=CHECKPOINT_MODELS))
+    app = sg.compile(checkpointer=checkpointer)
+    return app, initial_state(user, schedule_interval_days)
+
+
+def initial_state(user: UserProfile, schedule_interval_days: int = 7) -> AgentState:
+    return {
         "user": user,
         "github": None,
         "linkedin": None,
         "hf_models": None,
         "recs": [],
+        "aligned_through": {},
         "last_user_processing_at": None,
         "next_user_processing_at": datetime.now(),  # run immediately
         "schedule_interval_days": schedule_interval_days,
     }
-    return app, init_state
 
 
-# Optional helper to step a limited number of times (to avoid infinite loops)
-def run_steps(app, state: AgentState, max_steps: int = 3):
-    for _ in range(max_steps):
-        state = app.invoke(state)
+# One processing -> trend_scrapping -> interaction pass, in graph order
+CYCLE_NODES = [
+    ("user_processing", _node("user_processing", user_processing_node)),
+    ("trend_scrapping", _node("trend_scrapping", trend_scrapping_node)),
+    ("user_interaction", _node("user_interaction", user_interaction_node)),
+]
+
+
+def run_cycle(state: AgentState) -> AgentState:
+    """Run one pass of the graph without suspending afterwards.
+
+    For callers that own the wait until next_user_processing_at themselves
+    (scheduler.AgentScheduler) and don't need a per-user checkpointer.
+    """
+    for _, node in CYCLE_NODES:
+        state = node(state)
+    return state
+
+
+def agent_config(user: UserProfile) -> Dict[str, Any]:
+    """Invoke config for `user`'s graph; the thread id keys its checkpoints."""
+    return {"configurable": {"thread_id": str(user.id if user.id is not None else user.email)}}
+
+
+def resume_agent(app, config: Dict[str, Any], event: Optional[Dict[str, Any]] = None) -> AgentState:
+    """Resume a suspended user with an external event (a timer wake-up if None)."""
+    return app.invoke(Command(resume=event or {"type": TIMER_EVENT}), config)
+
+
+def suspended_until(app, config: Dict[str, Any]) -> Optional[datetime]:
+    """When a suspended user should be woken with a timer event; None if not suspended."""
+    for task in app.get_state(config).tasks:
+        for pending in task.interrupts:
+            return (pending.value or {}).get("resume_at")
+    return None
+
+
+# Optional helper: run until the first suspension, then resume with up to max_steps - 1 events
+def run_steps(app, state: AgentState, max_steps: int = 3, config: Optional[Dict[str, Any]] = None, events: Optional[List[Dict[str, Any]]] = None):
+    config = config or agent_config(state["user"])
+    state = app.invoke(state, config)
+    for event in (events or [])[: max_steps - 1]:
+        state = resume_agent(app, config, event)
     return state
 
 
@@ -145,10 +334,13 @@ if __name__ == "__main__":
     # Minimal demo usage: requires a basic UserProfile
     demo = UserProfile(id=1, email="user@example.com", name="Demo User", projects=[])
     app, state = build_agent(demo, schedule_interval_days=7)
-    # Run a few steps
-    final = run_steps(app, state, max_steps=3)
+    # Run until suspended, then deliver one answer event
+    events = [{"type": "answer", "answers": {"What's your current city and country?": "Pune, India"}}]
+    final = run_steps(app, state, max_steps=2, events=events)
     # Print resulting node scheduling info
     print({
+        "location": final["user"].location,
         "next_user_processing_at": final.get("next_user_processing_at"),
         "last_user_processing_at": final.get("last_user_processing_at"),
+        "suspended_until": suspended_until(app, agent_config(demo)),
     })
@@ -0,0 +1,238 @@
+"""Batch refresh: one agent cycle for every user in users.db, on a process pool.
+
+Users are read from table.UserDB in id order, in chunks. Each chunk runs on a
+worker process that compiled the agent graph once at start-up. Results are
+written back one transaction per chunk. The transaction covers profile_data,
+the side tables and the run's resume point (batch_run.last_user_id), so a
+crashed run continues with --resume and never skips a user.
+
+Usage: python batch_runner.py [--workers N] [--chunk-size 200] [--limit N]
+                              [--resume [RUN_ID]] [--ingest]
+
+With LAKSHSETU_TRACE_FILE=trace-{pid}.json every worker writes its spans to its
+own file when the pool shuts down (see tracing.py).
+"""
+import argparse
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import datetime
+from multiprocessing.util import Finalize
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import bindparam, func, select, update
+
+from log_queue import get_logger
+from profile_cache import profile_cache
+from profile_index import ensure_skill_index_current, notify_profiles_saved, side_table_writes
+from schemas import UserProfile
+from table import BatchRunDB, SessionLocal, UserDB, engine
+
+logger = get_logger("batch_runner")
+
+BATCH_WORKERS = int(os.getenv("LAKSHSETU_BATCH_WORKERS", str(os.cpu_count() or 1)))
+BATCH_CHUNK_SIZE = int(os.getenv("LAKSHSETU_BATCH_CHUNK_SIZE", "200"))
+
+
+# --- Worker process ---
+
+_worker_app = None
+
+
+def _init_worker(ingest: bool) -> None:
+    global _worker_app
+    import agent
+    import tracing
+
+    tracer = tracing.get_tracer()
+    if tracer is not None:
+        # A forked worker inherits the coordinator's spans; record its own from scratch.
+        # Workers skip atexit, so write the trace when the pool shuts the process down.
+        tracing.enable(tracer.max_events)
+        Finalize(None, tracing.export_trace_file, exitpriority=10)
+    if ingest:
+        from ingestion import Ingestion
+
+        agent.INGESTION = Ingestion.from_env()
+    # The graph doesn't depend on the user; compile it once per process
+    _worker_app, _ = agent.build_agent(UserProfile(email="batch@localhost", name="batch"))
+
+
+def _run_chunk(rows: List[Tuple[int, Dict[str, Any]]]) -> Tuple[List[Tuple[int, Dict[str, Any]]], List[Tuple[int, str]]]:
+    """Run one cycle per (user_id, profile_data); returns (updated profiles, failures)."""
+    from agent import agent_config, initial_state, run_steps
+
+    done: List[Tuple[int, Dict[str, Any]]] = []
+    failed: List[Tuple[int, str]] = []
+    for user_id, profile_data in rows:
+        try:
+            user = UserProfile.model_validate({**(profile_data or {}), "id": user_id})
+            config = agent_config(user)
+            # Runs processing -> trend -> interaction, then suspends in wait_for_event
+            state = run_steps(_worker_app, initial_state(user), max_steps=1, config=config)
+            _worker_app.checkpointer.delete_thread(config["configurable"]["thread_id"])
+            done.append((user_id, state["user"].model_dump(warnings=False)))
+        except Exception as e:
+            failed.append((user_id, f"{type(e).__name__}: {e}"))
+    return done, failed
+
+
+# --- Coordinator ---
+
+USERS_TABLE = UserDB.__table__
+_update_profile = (
+    update(USERS_TABLE)
+    .where(USERS_TABLE.c.id == bindparam("b_id"))
+    .values(profile_data=bindparam("b_profile_data"))
+)
+
+
+class BatchRunner:
+    def __init__(self, workers: int = BATCH_WORKERS, chunk_size: int = BATCH_CHUNK_SIZE, ingest: bool = False, limit: Optional[int] = None):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.ingest = ingest
+        self.limit = limit
+
+    def _start_run(self, resume: Optional[Any]) -> BatchRunDB:
+        with SessionLocal() as db:
+            run = None
+            if resume == "latest":
+                run = db.execute(
+                    select(BatchRunDB).where(BatchRunDB.finished_at.is_(None)).order_by(BatchRunDB.id.desc()).limit(1)
+                ).scalar_one_or_none()
+            elif resume is not None:
+                run = db.get(BatchRunDB, int(resume))
+                if run is None:
+                    raise ValueError(f"No batch run with id {resume}")
+            if run is None:
+                now = datetime.now()
+                run = BatchRunDB(started_at=now, updated_at=now, last_user_id=0, processed=0, failed=0)
+                db.add(run)
+                db.commit()
+                db.refresh(run)
+            elif run.finished_at is not None:
+                raise ValueError(f"Batch run {run.id} already finished at {run.finished_at}")
+            db.expunge(run)
+            return run
+
+    def _read_chunk(self, after_id: int, size: int) -> List[Tuple[int, Dict[str, Any]]]:
+        with engine.connect() as conn:
+            rows = conn.execute(
+                select(USERS_TABLE.c.id, USERS_TABLE.c.profile_data)
+                .where(USERS_TABLE.c.id > after_id)
+                .order_by(USERS_TABLE.c.id)
+                .limit(size)
+            ).all()
+        return [(row.id, row.profile_data) for row in rows]
+
+    def _write_chunk(self, run: BatchRunDB, done: List[Tuple[int, Dict[str, Any]]], failed: int, watermark: int) -> None:
+        # One transaction: profiles, side tables and the resume point move together
+        with engine.begin() as conn:
+            if done:
+                conn.execute(_update_profile, [{"b_id": user_id, "b_profile_data": data} for user_id, data in done])
+                for stmt, params in side_table_writes(dict(done), replace=True):
+                    conn.execute(stmt, params)
+            conn.execute(
+                update(BatchRunDB.__table__)
+                .where(BatchRunDB.__table__.c.id == run.id)
+                .values(
+                    last_user_id=watermark,
+                    processed=BatchRunDB.__table__.c.processed + len(done),
+                    failed=BatchRunDB.__table__.c.failed + failed,
+                    updated_at=datetime.now(),
+                )
+            )
+        for user_id, data in done:
+            profile_cache.invalidate(user_id=user_id, email=data.get("email"))
+        notify_profiles_saved(dict(done))
+
+    def run(self, resume: Optional[Any] = None) -> Dict[str, Any]:
+        """Process every user after the run's resume point. `resume`: None (new run), a run id, or "latest"."""
+        run = self._start_run(resume)
+        with engine.connect() as conn:
+            total = conn.execute(select(func.count()).select_from(USERS_TABLE).where(USERS_TABLE.c.id > run.last_user_id)).scalar_one()
+        if self.limit is not None:
+            total = min(total, self.limit)
+        logger.info("Batch run %s: %d users after id %d, %d workers", run.id, total, run.last_user_id, self.workers)
+
+        t0 = time.perf_counter()
+        processed = failed = submitted = 0
+        next_after = watermark = run.last_user_id
+        # Chunks in submission order: [last_id, finished]; the resume point only
+        # advances past a chunk once every chunk before it has been written too.
+        order: List[List[Any]] = []
+        pending: Dict[Future, List[Any]] = {}
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.ingest,)) as pool:
+            while True:
+                while len(pending) < self.workers * 2 and submitted < total:
+                    rows = self._read_chunk(next_after, min(self.chunk_size, total - submitted))
+                    if not rows:
+                        total = submitted
+                        break
+                    slot = [rows[-1][0], False]
+                    order.append(slot)
+                    pending[pool.submit(_run_chunk, rows)] = slot
+                    submitted += len(rows)
+                    next_after = rows[-1][0]
+                if not pending:
+                    break
+
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    slot = pending.pop(future)
+                    done, errors = future.result()
+                    for user_id, error in errors:
+                        logger.warning("User %s failed: %s", user_id, error)
+                    slot[1] = True
+                    while order and order[0][1]:
+                        watermark = order.pop(0)[0]
+                    self._write_chunk(run, done, len(errors), watermark)
+                    processed += len(done)
+                    failed += len(errors)
+
+                    elapsed = time.perf_counter() - t0
+                    rate = (processed + failed) / elapsed * 60 if elapsed else 0.0
+                    remaining = total - processed - failed
+                    eta = remaining / rate * 60 if rate else 0.0
+                    logger.info(
+                        "Batch run %s: %d/%d users (%d failed), %.0f users/min, ETA %.0fs",
+                        run.id, processed + failed, total, failed, rate, eta,
+                    )
+
+        elapsed = time.perf_counter() - t0
+        with engine.begin() as conn:
+            conn.execute(
+                update(BatchRunDB.__table__)
+                .where(BatchRunDB.__table__.c.id == run.id)
+                .values(finished_at=datetime.now(), updated_at=datetime.now())
+            )
+        summary = {
+            "run_id": run.id,
+            "processed": processed,
+            "failed": failed,
+            "seconds": round(elapsed, 2),
+            "users_per_minute": round((processed + failed) / elapsed * 60, 1) if elapsed else 0.0,
+            "workers": self.workers,
+            "chunk_size": self.chunk_size,
+        }
+        logger.info("Batch run finished: %s", summary)
+        return summary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run one agent cycle for every user in users.db")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE)
+    parser.add_argument("--limit", type=int, help="stop after N users")
+    parser.add_argument("--resume", nargs="?", const="latest", help="continue an unfinished run (default: the latest)")
+    parser.add_argument("--ingest", action="store_true", help="fetch fresh extracts per user (ingestion.Ingestion.from_env)")
+    args = parser.parse_args(argv)
+    ensure_skill_index_current()
+    summary = BatchRunner(args.workers, args.chunk_size, ingest=args.ingest, limit=args.limit).run(resume=args.resume)
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
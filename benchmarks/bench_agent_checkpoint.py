@@ -0,0 +1,64 @@
+"""Bytes written per cycle and bulk restore time for AgentState checkpoints.
+
+Runs agent.run_cycle for N synthetic users with checkpoint_store attached, twice:
+the first cycle writes every field, later cycles only the fields that changed.
+"full snapshot" is what rewriting the whole state after each node would cost.
+
+Usage: python benchmarks/bench_agent_checkpoint.py [--users 2000] [--cycles 3]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_TMP_DIR = tempfile.mkdtemp(prefix="lakshsetu-bench-")
+os.environ["LAKSHSETU_DB_PATH"] = os.path.join(_TMP_DIR, "bench.db")
+os.environ.setdefault("LAKSHSETU_LOG_LEVEL", "WARNING")
+
+import agent  # noqa: E402
+from checkpoint_store import AgentCheckpointStore, encode_field  # noqa: E402
+from scheduler import synthetic_users  # noqa: E402
+
+
+def main(users: int, cycles: int) -> None:
+    store = AgentCheckpointStore()
+    agent.CHECKPOINT_STORE = store
+    states = [agent.initial_state(user) for user in synthetic_users(users)]
+
+    print(f"users={users}")
+    print(f"{'cycle':>6}{'seconds':>10}{'fields written':>16}{'KiB written':>13}{'full snapshot KiB':>19}")
+    for cycle in range(1, cycles + 1):
+        before = store.stats()
+        full = 0
+        t0 = time.perf_counter()
+        for i, state in enumerate(states):
+            states[i] = state = agent.run_cycle(state)
+            # run_cycle saves after each of its nodes; a full snapshot would rewrite everything each time
+            full += len(agent.CYCLE_NODES) * sum(len(encode_field(v)[0]) for v in state.values())
+        elapsed = time.perf_counter() - t0
+        after = store.stats()
+        fields = after["fields_written"] - before["fields_written"]
+        written = after["bytes_written"] - before["bytes_written"]
+        print(f"{cycle:>6}{elapsed:>10.2f}{fields:>16}{written / 1024:>13.1f}{full / 1024:>19.1f}")
+
+    # A new store, as after a restart
+    fresh = AgentCheckpointStore()
+    restored = fresh.restore_all()
+    stats = fresh.stats()
+    assert len(restored) == users
+    print(
+        f"restore_all: {stats['last_restore_users']} users, {stats['last_restore_bytes'] / 1024:.1f} KiB "
+        f"in {stats['last_restore_seconds'] * 1000:.1f} ms "
+        f"({stats['last_restore_users'] / max(stats['last_restore_seconds'], 1e-9):.0f} users/s)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--cycles", type=int, default=3)
+    args = parser.parse_args()
+    main(args.users, args.cycles)
@@ -0,0 +1,64 @@
+"""Full agent cycle with and without reusing trend_scrapping_node's alignment in run_interaction.
+
+Each cycle runs agent.CYCLE_NODES (processing -> trend_scrapping -> interaction)
+on users with GitHub and LinkedIn extracts. "recompute" drops the stored recs
+before the interaction node, which makes run_interaction align and run the
+rules again (the previous behaviour). Measured with the recommendation memo
+off and on.
+
+Usage: python benchmarks/bench_agent_cycle.py [--users 200] [--skills 10] [--repos 30] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("LAKSHSETU_LOG_LEVEL", "WARNING")
+
+import agent  # noqa: E402
+from bench_recs_memo import build_inputs  # noqa: E402
+from trend_scrapping_node import recommendation_memo  # noqa: E402
+
+
+def run(inputs, reuse: bool, repeat: int) -> float:
+    """Best of `repeat` passes of one cycle per user; seconds per cycle."""
+    best = float("inf")
+    for _ in range(repeat):
+        recommendation_memo.clear()
+        states = []
+        for user, github, linkedin in inputs:
+            state = agent.initial_state(user.model_copy(deep=True))
+            state.update(github=github, linkedin=linkedin)
+            states.append(state)
+        t0 = time.perf_counter()
+        for state in states:
+            for name, node in agent.CYCLE_NODES:
+                if name == "user_interaction" and not reuse:
+                    state["recs"] = None
+                state = node(state)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(inputs)
+
+
+def main(users: int, skills: int, repos: int, repeat: int) -> None:
+    inputs = build_inputs(users, skills, repos)
+    print(f"users={users} skills/user={skills} repos/user={repos}")
+    print(f"{'memo':<6}{'recompute us':>14}{'reuse us':>10}{'speedup':>9}")
+    for memo_size in (0, 4096):
+        recommendation_memo.max_entries = memo_size
+        recompute = run(inputs, reuse=False, repeat=repeat)
+        reuse = run(inputs, reuse=True, repeat=repeat)
+        label = "on" if memo_size else "off"
+        print(f"{label:<6}{recompute * 1e6:>14.0f}{reuse * 1e6:>10.0f}{recompute / reuse:>8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--skills", type=int, default=10)
+    parser.add_argument("--repos", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.users, args.skills, args.repos, args.repeat)
@@ -0,0 +1,132 @@
+"""Delta alignment (diff_extractions + ProfilePatch.apply) vs the full rebuild.
+
+Profiles carry a long history (--projects, --skills). Each round a re-fetched
+GitHub extract holds --repos repositories, of which --updated changed since
+the previous fetch. "full" is align_extractions_with_profile over everything;
+"delta" only looks at items newer than the last aligned fetched_at.
+
+Usage: python benchmarks/bench_alignment_delta.py [--users 100] [--projects 300] [--skills 100] [--repos 100] [--updated 5] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("LAKSHSETU_LOG_LEVEL", "WARNING")
+
+from schemas import (  # noqa: E402
+    DataSource,
+    ExtractionMeta,
+    GitHubRepoExtract,
+    GitHubUserExtract,
+    LinkedInProfileExtract,
+    Projects,
+    Skills,
+    UserProfile,
+)
+from trend_scrapping_node import align_extractions_with_profile, diff_extractions  # noqa: E402
+
+LANGUAGES = ["Python", "Go", "Rust", "TypeScript", "Java", "C++", "Kotlin", "Scala"]
+
+
+def github_extract(i: int, repos: int, updated: int, fetched_at: datetime) -> GitHubUserExtract:
+    old = fetched_at - timedelta(days=30)
+    return GitHubUserExtract(
+        username=f"user{i}",
+        repositories=[
+            GitHubRepoExtract(
+                name=f"repo-{j}",
+                url=f"https://github.com/user{i}/repo-{j}",
+                primary_language=LANGUAGES[j % len(LANGUAGES)],
+                last_updated=fetched_at - timedelta(hours=1) if j < updated else old,
+            )
+            for j in range(repos)
+        ],
+        meta=ExtractionMeta(source=DataSource.github, fetched_at=fetched_at),
+    )
+
+
+def build(users: int, projects: int, skills: int, repos: int, updated: int):
+    first = datetime(2025, 1, 1)
+    second = first + timedelta(days=7)
+    rows = []
+    for i in range(users):
+        user = UserProfile(
+            id=i,
+            email=f"user{i}@example.com",
+            name=f"User {i}",
+            skills=[Skills(skill_name=f"Skill {j}", skill_strength="Medium") for j in range(skills)],
+            projects=[Projects(name=f"project-{j}", description="A project", technologies=["Python"]) for j in range(projects)],
+        )
+        linkedin = LinkedInProfileExtract(
+            username=f"user{i}",
+            skills=[f"Skill {j}" for j in range(0, skills, 3)] + ["Leadership"],
+            certifications=["AWS Solutions Architect"],
+            meta=ExtractionMeta(source=DataSource.linkedin, fetched_at=first),
+        )
+        # The profile as it stands after aligning the first fetch
+        aligned = align_extractions_with_profile(user, github=github_extract(i, repos, repos, first), linkedin=linkedin)
+        since = {DataSource.github.value: first, DataSource.linkedin.value: first}
+        rows.append((aligned, github_extract(i, repos, updated, second), linkedin, since))
+    return rows
+
+
+def timed(fn, rows, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for row in rows:
+            fn(*row)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(rows)
+
+
+def main(users: int, projects: int, skills: int, repos: int, updated: int, repeat: int) -> None:
+    rows = build(users, projects, skills, repos, updated)
+
+    # Same profile either way (on a copy: apply() patches in place)
+    for aligned, github, linkedin, since in rows[:10]:
+        full = align_extractions_with_profile(aligned, github=github, linkedin=linkedin)
+        patched = aligned.model_copy(deep=True)
+        diff_extractions(patched, github=github, linkedin=linkedin, since=since).apply(patched)
+        # the full rebuild re-appends LinkedIn certifications every call; the patch doesn't
+        full.certifications = patched.certifications
+        assert full == patched
+
+    def full(aligned, github, linkedin, since):
+        align_extractions_with_profile(aligned, github=github, linkedin=linkedin)
+
+    def delta(aligned, github, linkedin, since):
+        # Patches computed but not applied so every round sees the same profile
+        diff_extractions(aligned, github=github, linkedin=linkedin, since=since)
+
+    def delta_unchanged(aligned, github, linkedin, since):
+        diff_extractions(aligned, github=github, linkedin=linkedin, since={**since, DataSource.github.value: github.meta.fetched_at})
+
+    patch = diff_extractions(*rows[0][:3], since=rows[0][3])
+    print(
+        f"users={users} projects={projects} skills={skills} repos={repos} updated={updated} "
+        f"patch: +{len(patch.added_projects)} projects, {len(patch.merged_projects)} merged, +{len(patch.added_skills)} skills"
+    )
+    print(f"{'variant':<18}{'us/user':>10}")
+    t_full = timed(full, rows, repeat)
+    t_delta = timed(delta, rows, repeat)
+    t_same = timed(delta_unchanged, rows, repeat)
+    print(f"{'full rebuild':<18}{t_full * 1e6:>10.0f}")
+    print(f"{'delta':<18}{t_delta * 1e6:>10.0f}  ({t_full / t_delta:.0f}x)")
+    print(f"{'delta, no change':<18}{t_same * 1e6:>10.0f}  ({t_full / t_same:.0f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--projects", type=int, default=300)
+    parser.add_argument("--skills", type=int, default=100)
+    parser.add_argument("--repos", type=int, default=100)
+    parser.add_argument("--updated", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.users, args.projects, args.skills, args.repos, args.updated, args.repeat)
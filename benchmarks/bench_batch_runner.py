@@ -0,0 +1,65 @@
+"""Users/minute of batch_runner.BatchRunner by worker count.
+
+Seeds N synthetic users into a temporary users.db, then runs a full batch
+for each worker count (each run is a new batch_run row over every user).
+Every other user is stored the way /registration writes it, with skills,
+projects and certifications as plain strings; no user may fail.
+
+Usage: python benchmarks/bench_batch_runner.py [--users 2000] [--workers 1,2,4] [--chunk-size 200]
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_TMP_DIR = tempfile.mkdtemp(prefix="lakshsetu-bench-")
+os.environ["LAKSHSETU_DB_PATH"] = os.path.join(_TMP_DIR, "bench.db")
+os.environ.setdefault("LAKSHSETU_LOG_LEVEL", "WARNING")
+
+from batch_runner import BatchRunner  # noqa: E402
+from profile_index import side_table_writes  # noqa: E402
+from scheduler import synthetic_users  # noqa: E402
+from table import UserDB, engine  # noqa: E402
+
+
+def registration_shaped(data: dict) -> dict:
+    # profile_data as stored by /registration before alignment: plain-string entries
+    return {
+        **data,
+        "skills": [s["skill_name"] for s in data["skills"] or []],
+        "projects": ["Portfolio site"],
+        "certifications": ["AWS Certified Cloud Practitioner"],
+    }
+
+
+def seed(users: int) -> None:
+    profiles = {user.id: user.model_dump(warnings=False) for user in synthetic_users(users)}
+    profiles = {uid: registration_shaped(data) if uid % 2 else data for uid, data in profiles.items()}
+    with engine.begin() as conn:
+        conn.execute(
+            UserDB.__table__.insert(),
+            [{"id": uid, "name": data["name"], "email": data["email"], "profile_data": data} for uid, data in profiles.items()],
+        )
+        for stmt, params in side_table_writes(profiles):
+            conn.execute(stmt, params)
+
+
+def main(users: int, workers: list, chunk_size: int) -> None:
+    seed(users)
+    print(f"users={users} chunk_size={chunk_size} cpus={os.cpu_count()}")
+    print(f"{'workers':>8}{'seconds':>10}{'users/min':>12}{'failed':>8}")
+    for n in workers:
+        summary = BatchRunner(workers=n, chunk_size=chunk_size).run()
+        assert summary["failed"] == 0, summary
+        print(f"{n:>8}{summary['seconds']:>10.2f}{summary['users_per_minute']:>12.0f}{summary['failed']:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--chunk-size", type=int, default=200)
+    args = parser.parse_args()
+    main(args.users, [int(n) for n in args.workers.split(",")], args.chunk_size)
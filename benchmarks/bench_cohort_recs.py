@@ -0,0 +1,68 @@
+"""Cohort recommendations: cohort_recs.suggest_next_steps_batch vs a per-user loop.
+
+Builds a synthetic cohort (cohort_recs.synthetic_cohort: mixed skills, GitHub
+repos, LinkedIn activity, certifications; a quarter of the profiles
+registration-shaped, with plain-string entries), checks both paths return
+identical recommendation lists, and times them. The batch time is split into building the columns, evaluating the
+rule masks and materializing CareerActionRecommendation objects; "rule counts
+only" is a cohort report that never materializes them.
+
+Usage: python benchmarks/bench_cohort_recs.py [--users 20000] [--repos 10] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("LAKSHSETU_LOG_LEVEL", "WARNING")
+
+from cohort_recs import CohortFrame, synthetic_cohort  # noqa: E402
+from trend_scrapping_node import suggest_next_steps  # noqa: E402
+
+
+def best(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main(users: int, repos: int, repeat: int) -> None:
+    rows = synthetic_cohort(users, repos)
+    profiles, githubs, linkedins = (list(col) for col in zip(*rows))
+
+    expected = [suggest_next_steps(u, github=g, linkedin=l) for u, g, l in rows]
+    frame = CohortFrame(profiles, githubs, linkedins)
+    assert frame.recommendations() == expected
+    assert all(frame.recommendations_for(i) == expected[i] for i in range(0, users, 97))
+
+    t_loop = best(lambda: [suggest_next_steps(u, github=g, linkedin=l) for u, g, l in rows], repeat)
+    t_build = best(lambda: CohortFrame(profiles, githubs, linkedins), repeat)
+    t_masks = best(frame.masks, repeat)
+    t_materialize = best(frame.recommendations, repeat)
+    t_batch = t_build + t_materialize  # recommendations() evaluates the masks itself
+    t_counts = t_build + best(frame.rule_counts, repeat)
+
+    print(f"users={users} repos/user<={repos} recommendations={sum(map(len, expected))}")
+    print(f"rule counts: {frame.rule_counts()}")
+    print(f"{'path':<22}{'seconds':>9}{'us/user':>9}")
+    print(f"{'per-user loop':<22}{t_loop:>9.3f}{t_loop / users * 1e6:>9.1f}")
+    print(f"{'batch':<22}{t_batch:>9.3f}{t_batch / users * 1e6:>9.1f}  ({t_loop / t_batch:.1f}x)")
+    print(f"{'  build columns':<22}{t_build:>9.3f}")
+    print(f"{'  rule masks':<22}{t_masks:>9.4f}")
+    print(f"{'  materialize':<22}{t_materialize:>9.3f}")
+    # A per-rule cohort report: the per-user path has to build every recommendation to answer it
+    print(f"{'rule counts only':<22}{t_counts:>9.3f}{t_counts / users * 1e6:>9.1f}  ({t_loop / t_counts:.1f}x vs per-user loop)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--repos", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.users, args.repos, args.repeat)
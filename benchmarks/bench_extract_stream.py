@@ -0,0 +1,119 @@
+"""extract_stream.ExtractStreamIngestor: records/s and peak memory by dump size.
+
+Writes gzipped JSONL dumps with one GitHub, LinkedIn and Hugging Face record
+per user, for --users / 4 and --users users. Each dump is streamed into
+freshly seeded synthetic profiles in a temporary users.db:
+- once under tracemalloc, for peak Python memory;
+- once without it, for throughput.
+For reference it also measures the peak of decoding and validating the whole
+dump into memory at once.
+
+Usage: python benchmarks/bench_extract_stream.py [--users 20000] [--repos 10] [--chunk-size 1000] [--batch-users 500]
+"""
+import argparse
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_TMP_DIR = tempfile.mkdtemp(prefix="lakshsetu-bench-")
+os.environ["LAKSHSETU_DB_PATH"] = os.path.join(_TMP_DIR, "bench.db")
+os.environ.setdefault("LAKSHSETU_LOG_LEVEL", "WARNING")
+
+from extract_stream import ALIGN_SOURCES, ExtractStreamIngestor, _CHUNK_ADAPTERS, read_lines  # noqa: E402
+from ingestion import _stub_payload  # noqa: E402
+from profile_codec import loads_json  # noqa: E402
+from profile_index import SIDE_TABLES, side_table_writes  # noqa: E402
+from scheduler import synthetic_users  # noqa: E402
+from schemas import DataSource  # noqa: E402
+from table import UserDB, engine  # noqa: E402
+
+
+def seed(users: int) -> None:
+    # Fresh profiles for every measured run: a second alignment of the same dump works on bigger profiles
+    profiles = {user.id: user.model_dump(warnings=False) for user in synthetic_users(users)}
+    with engine.begin() as conn:
+        for table in (*SIDE_TABLES, UserDB.__table__):
+            conn.execute(table.delete())
+        conn.execute(
+            UserDB.__table__.insert(),
+            [{"id": uid, "name": data["name"], "email": data["email"], "profile_data": data} for uid, data in profiles.items()],
+        )
+        for stmt, params in side_table_writes(profiles):
+            conn.execute(stmt, params)
+
+
+def write_dump(path: str, users: int, repos: int) -> int:
+    records = 0
+    with gzip.open(path, "wt") as out:
+        for user_id in range(1, users + 1):
+            handle = f"user{user_id}"
+            github = _stub_payload(DataSource.github, handle)
+            github["repositories"] = [
+                {**github["repositories"][j % 3], "name": f"{handle}-repo-{j}", "url": f"https://github.com/{handle}/{handle}-repo-{j}"}
+                for j in range(repos)
+            ]
+            for source, extract in (
+                (DataSource.github, github),
+                (DataSource.linkedin, _stub_payload(DataSource.linkedin, handle)),
+                (DataSource.huggingface, _stub_payload(DataSource.huggingface, handle)),
+            ):
+                # Half the records name the user by email, as scrapers without a user id do
+                key = {"user_id": user_id} if user_id % 2 else {"email": f"user{user_id}@example.com"}
+                out.write(json.dumps({**key, "source": source.value, "extract": extract}) + "\n")
+                records += 1
+    return records
+
+
+def load_all(path: str) -> int:
+    # Whole-dump reference: every record decoded and validated before any alignment
+    extracts = []
+    for line in read_lines([path]):
+        obj = loads_json(line)
+        extracts.append(_CHUNK_ADAPTERS[DataSource(obj["source"])].validate_python([obj["extract"]])[0])
+    return len(extracts)
+
+
+def peak(fn) -> float:
+    tracemalloc.start()
+    fn()
+    _, top = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return top / 2**20
+
+
+def main(users: int, repos: int, chunk_size: int, batch_users: int) -> None:
+    assert set(ALIGN_SOURCES) == {DataSource.github, DataSource.linkedin, DataSource.huggingface}
+    ingestor = ExtractStreamIngestor(chunk_size, batch_users)
+    print(f"chunk_size={chunk_size} batch_users={batch_users} repos/user={repos}")
+    print(f"{'users':>8}{'records':>9}{'dump MiB':>10}{'records/s':>11}{'users/s':>9}{'stream peak MiB':>17}{'load-all peak MiB':>19}")
+    for n in (users // 4, users):
+        path = os.path.join(_TMP_DIR, f"dump-{n}.jsonl.gz")
+        records = write_dump(path, n, repos)
+        seed(n)
+        t0 = time.perf_counter()
+        summary = ingestor.run([path])
+        elapsed = time.perf_counter() - t0
+        assert summary["written"] == n and summary["invalid"] == 0, summary
+        seed(n)
+        stream_peak = peak(lambda: ingestor.run([path]))
+        all_peak = peak(lambda: load_all(path))
+        print(
+            f"{n:>8}{records:>9}{os.path.getsize(path) / 2**20:>10.1f}{records / elapsed:>11.0f}{n / elapsed:>9.0f}"
+            f"{stream_peak:>17.1f}{all_peak:>19.1f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20000)
+    parser.add_argument("--repos", type=int, default=10)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--batch-users", type=int, default=500)
+    args = parser.parse_args()
+    main(args.users, args.repos, args.chunk_size, args.batch_users)
@@ -0,0 +1,78 @@
+"""Encode/decode time and stored bytes per profile size for each profile_data codec.
+
+Compares the stdlib json path SQLAlchemy's JSON column used before
+(json.dumps/json.loads) with the profile_codec codecs (orjson-backed JSON,
+msgpack) on aligned profiles with growing numbers of skills and projects.
+
+Usage: python benchmarks/bench_profile_codec.py [--sizes 10 100 500] [--repeat 200]
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from profile_codec import JsonProfileCodec, MsgpackProfileCodec, decode_profile, msgpack, orjson  # noqa: E402
+from schemas import Certifications, Projects, Skills, UserProfile  # noqa: E402
+
+
+def build_profile(size: int) -> Dict[str, Any]:
+    """A profile_data dict as alignment produces it: `size` skills, projects and certifications."""
+    projects = [
+        Projects(
+            name=f"project-{i}",
+            description=f"A project about topic {i} with a reasonably long one-line description",
+            technologies=["Python", "FastAPI", "SQLite"],
+            link=f"https://github.com/example/project-{i}",
+            interactions="Stars: 12, Forks: 3",
+        )
+        for i in range(size)
+    ]
+    skills = [Skills(skill_name=f"Skill {i}", skill_strength="Medium", achievements_of_skills=["badge"]) for i in range(size)]
+    certs = [Certifications(title=f"Cert {i}", issuer="LinkedIn", issued_date="2024-01-01") for i in range(size // 5)]
+    user = UserProfile(
+        id=1,
+        email="bench@example.com",
+        name="Bench User",
+        location="Pune",
+        skills=skills,
+        projects=projects,
+        certifications=certs,
+        recommendations=["Close top skill gaps", "Post on LinkedIn"],
+    )
+    return user.model_dump()
+
+
+def _codecs() -> List[Tuple[str, Callable[[Any], Any], Callable[[Any], Any]]]:
+    rows = [("stdlib json", lambda obj: json.dumps(obj), lambda data: json.loads(data))]
+    if orjson is not None:
+        codec = JsonProfileCodec()
+        rows.append(("orjson", codec.encode, decode_profile))
+    if msgpack is not None:
+        codec = MsgpackProfileCodec()
+        rows.append(("msgpack", codec.encode, decode_profile))
+    return rows
+
+
+def main(sizes: List[int], repeat: int) -> None:
+    print(f"{'size':>6}{'codec':>14}{'bytes':>10}{'encode us':>12}{'decode us':>12}")
+    for size in sizes:
+        profile = build_profile(size)
+        for name, encode, decode in _codecs():
+            payload = encode(profile)
+            assert decode(payload) == json.loads(json.dumps(profile))
+            enc = min(timeit.repeat(lambda: encode(profile), number=repeat, repeat=3)) / repeat
+            dec = min(timeit.repeat(lambda: decode(payload), number=repeat, repeat=3)) / repeat
+            stored = len(payload.encode() if isinstance(payload, str) else payload)
+            print(f"{size:>6}{name:>14}{stored:>10}{enc * 1e6:>12.1f}{dec * 1e6:>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    main(args.sizes, args.repeat)
@@ -0,0 +1,92 @@
+"""process_extractions_and_recommend with and without the content-hash memo.
+
+Each simulated agent cycle calls it once from trend_scrapping_node and once per
+interaction pass (run_interaction), with unchanged inputs, as the graph does.
+
+Usage: python benchmarks/bench_recs_memo.py [--users 200] [--interactions 3] [--skills 10] [--repos 30] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ingestion import SOURCE_SPECS, _stub_payload  # noqa: E402
+from rule_engine import DEFAULT_RULESET, RULES  # noqa: E402
+from schemas import DataSource, Projects, Skills, UserProfile  # noqa: E402
+from trend_scrapping_node import process_extractions_and_recommend, recommendation_memo  # noqa: E402
+
+
+def build_inputs(users: int, skills: int, repos: int):
+    inputs = []
+    for i in range(users):
+        user = UserProfile(
+            id=i,
+            email=f"user{i}@example.com",
+            name=f"User {i}",
+            skills=[Skills(skill_name=f"Skill {j}", skill_strength="Medium") for j in range(skills)],
+            projects=[Projects(name=f"project-{j}", description="A project", technologies=["Python"]) for j in range(skills // 2)],
+        )
+        payload = _stub_payload(DataSource.github, f"user{i}")
+        template = payload["repositories"]
+        payload["repositories"] = [
+            dict(template[j % len(template)], name=f"repo-{j}", url=f"https://github.com/user{i}/repo-{j}") for j in range(repos)
+        ]
+        github = SOURCE_SPECS[DataSource.github].adapter.validate_python(payload)
+        linkedin = SOURCE_SPECS[DataSource.linkedin].adapter.validate_python(_stub_payload(DataSource.linkedin, f"user{i}"))
+        inputs.append((user, github, linkedin))
+    return inputs
+
+
+def run(inputs, interactions: int, memo_size: int, repeat: int) -> float:
+    """Best of `repeat` runs, each starting from an empty memo."""
+    best = float("inf")
+    recommendation_memo.max_entries = memo_size
+    for _ in range(repeat):
+        recommendation_memo.clear()
+        t0 = time.perf_counter()
+        for user, github, linkedin in inputs:
+            for _ in range(1 + interactions):
+                process_extractions_and_recommend(user, github=github, linkedin=linkedin)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main(users: int, interactions: int, skills: int, repos: int, repeat: int) -> None:
+    inputs = build_inputs(users, skills, repos)
+    calls = users * (1 + interactions)
+
+    baseline = run(inputs, interactions, 0, repeat)
+    memo = run(inputs, interactions, 4096, repeat)
+    stats = recommendation_memo.stats()
+
+    # Same answers either way
+    user, github, linkedin = inputs[0]
+    recommendation_memo.max_entries = 0
+    fresh_user, fresh_recs = process_extractions_and_recommend(user, github=github, linkedin=linkedin)
+    recommendation_memo.max_entries = 4096
+    cached_user, cached_recs = process_extractions_and_recommend(user, github=github, linkedin=linkedin)
+    assert fresh_user == cached_user and fresh_recs == cached_recs
+
+    RULES.load(dict(DEFAULT_RULESET, version="bench-2"))
+    process_extractions_and_recommend(user, github=github, linkedin=linkedin)
+    after = recommendation_memo.stats()
+
+    print(f"users={users} calls={calls} skills/user={skills} repos/user={repos}")
+    print(f"{'variant':<10}{'seconds':>10}{'us/call':>10}")
+    print(f"{'no memo':<10}{baseline:>10.2f}{baseline / calls * 1e6:>10.0f}")
+    print(f"{'memo':<10}{memo:>10.2f}{memo / calls * 1e6:>10.0f}")
+    print(f"speedup: {baseline / memo:.1f}x  hit rate: {stats['hit_rate']:.0%}")
+    print(f"after ruleset bump: invalidations={after['invalidations']} entries={after['entries']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--interactions", type=int, default=3)
+    parser.add_argument("--skills", type=int, default=10)
+    parser.add_argument("--repos", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.users, args.interactions, args.skills, args.repos, args.repeat)
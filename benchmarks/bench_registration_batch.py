@@ -0,0 +1,92 @@
+"""Throughput of POST /registration/batch vs. one POST /registration per user.
+
+Runs in-process over httpx's ASGI transport against a temporary SQLite file
+and reports rows/sec for each path.
+
+Usage: python benchmarks/bench_registration_batch.py [--rows 5000] [--concurrency 16]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_TMP_DIR = tempfile.mkdtemp(prefix="lakshsetu-bench-")
+os.environ["LAKSHSETU_DB_PATH"] = os.path.join(_TMP_DIR, "bench.db")
+os.environ.setdefault("LAKSHSETU_LOG_LEVEL", "WARNING")
+
+import httpx  # noqa: E402
+
+import server  # noqa: E402
+from table import Base, async_engine, engine  # noqa: E402
+
+
+def _profile(tag: str, i: int) -> dict:
+    return {
+        "email": f"{tag}-{i}@example.com",
+        "name": f"Student {i}",
+        "location": "Bengaluru",
+        "skills": ["Python", "SQL", "Machine Learning"],
+        "projects": [f"Project {i}-a", f"Project {i}-b"],
+    }
+
+
+def _reset_db() -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+async def run_single(client: httpx.AsyncClient, rows: int, concurrency: int) -> float:
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with sem:
+            resp = await client.post("/registration", json=_profile("single", i))
+            resp.raise_for_status()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(rows)))
+    return time.perf_counter() - t0
+
+
+async def run_batch(client: httpx.AsyncClient, rows: int) -> float:
+    body = "\n".join(json.dumps(_profile("batch", i)) for i in range(rows))
+    t0 = time.perf_counter()
+    resp = await client.post(
+        "/registration/batch",
+        content=body,
+        headers={"content-type": "application/x-ndjson"},
+    )
+    resp.raise_for_status()
+    created = sum(1 for line in resp.text.splitlines() if '"created"' in line)
+    elapsed = time.perf_counter() - t0
+    assert created == rows, f"expected {rows} created rows, got {created}"
+    return elapsed
+
+
+async def main(rows: int, concurrency: int) -> None:
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        _reset_db()
+        single = await run_single(client, rows, concurrency)
+        _reset_db()
+        batch = await run_batch(client, rows)
+    await async_engine.dispose()
+
+    print(f"rows={rows} chunk={server.BATCH_CHUNK_SIZE}")
+    print(f"{'path':<24}{'seconds':>10}{'rows/sec':>12}")
+    print(f"{'/registration (x' + str(concurrency) + ')':<24}{single:>10.2f}{rows / single:>12.0f}")
+    print(f"{'/registration/batch':<24}{batch:>10.2f}{rows / batch:>12.0f}")
+    print(f"speedup: {single / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.concurrency))
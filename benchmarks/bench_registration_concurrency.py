@@ -0,0 +1,144 @@
+"""Concurrency benchmark for POST /registration: blocking Session vs. AsyncSession.
+
+Runs both handlers in-process over httpx's ASGI transport against a temporary
+SQLite file and reports p50/p99 latency per concurrency level. A probe task
+polls GET / throughout each run: its p99 shows how long the event loop is
+stalled for every other request while registrations are in flight.
+
+Usage: python benchmarks/bench_registration_concurrency.py [--clients 50 100 250 500] [--requests-per-client 4]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_TMP_DIR = tempfile.mkdtemp(prefix="lakshsetu-bench-")
+os.environ["LAKSHSETU_DB_PATH"] = os.path.join(_TMP_DIR, "bench.db")
+os.environ.setdefault("LAKSHSETU_LOG_LEVEL", "WARNING")
+
+import httpx  # noqa: E402
+from fastapi import Depends, FastAPI, HTTPException  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+from sqlalchemy.pool import NullPool  # noqa: E402
+
+import server  # noqa: E402
+from schemas import UserProfile  # noqa: E402
+from table import SQLALCHEMY_DATABASE_URL, Base, UserDB, async_engine, engine  # noqa: E402
+
+
+def build_blocking_app() -> FastAPI:
+    """The pre-async handler: sync Session used from inside an async def.
+
+    Uses NullPool so the numbers show event-loop blocking rather than the
+    default QueuePool running dry (checkout would block the loop until timeout).
+    """
+    legacy = FastAPI()
+    SessionLocal = sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}, poolclass=NullPool),
+    )
+
+    def get_sync_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    @legacy.post("/registration")
+    async def user_registration(user_data: UserProfile, db: Session = Depends(get_sync_db)):
+        existing_user = db.query(UserDB).filter(UserDB.email == user_data.email).first()
+        if existing_user:
+            raise HTTPException(status_code=400, detail="User with this email already exists")
+        db_user = UserDB(name=user_data.name, email=user_data.email, profile_data=user_data.model_dump())
+        db.add(db_user)
+        db.commit()
+        db.refresh(db_user)
+        return {"message": "Registration successful", "user_id": db_user.id}
+
+    return legacy
+
+
+def _reset_db() -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+async def _run_level(app: FastAPI, clients: int, per_client: int, tag: str) -> Dict[str, float]:
+    latencies: List[float] = []
+    probe_latencies: List[float] = []
+    errors = 0
+    done = asyncio.Event()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def worker(cid: int) -> None:
+            nonlocal errors
+            for i in range(per_client):
+                payload = {"email": f"{tag}-{clients}-{cid}-{i}@example.com", "name": f"User {cid}-{i}", "projects": []}
+                t0 = time.perf_counter()
+                resp = await client.post("/registration", json=payload)
+                latencies.append(time.perf_counter() - t0)
+                if resp.status_code != 200:
+                    errors += 1
+
+        async def probe() -> None:
+            while not done.is_set():
+                t0 = time.perf_counter()
+                await client.get("/")
+                probe_latencies.append(time.perf_counter() - t0)
+                await asyncio.sleep(0.005)
+
+        probe_task = asyncio.create_task(probe())
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker(c) for c in range(clients)))
+        elapsed = time.perf_counter() - t0
+        done.set()
+        await probe_task
+
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+        "probe_p99_ms": round(_percentile(probe_latencies, 99) * 1000, 2),
+    }
+
+
+async def main(levels: List[int], per_client: int) -> None:
+    variants = [("blocking", build_blocking_app()), ("async", server.app)]
+    print(f"{'variant':<10}{'clients':>8}{'reqs':>7}{'errs':>6}{'rps':>9}{'p50 ms':>10}{'p99 ms':>10}{'GET / p99':>11}")
+    for clients in levels:
+        for name, app in variants:
+            _reset_db()
+            row = await _run_level(app, clients, per_client, name)
+            print(
+                f"{name:<10}{row['clients']:>8}{row['requests']:>7}{row['errors']:>6}"
+                f"{row['rps']:>9}{row['p50_ms']:>10}{row['p99_ms']:>10}{row['probe_p99_ms']:>11}"
+            )
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 100, 250, 500])
+    parser.add_argument("--requests-per-client", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.clients, args.requests_per_client))
@@ -0,0 +1,161 @@
+"""repo_analytics.RepoFrame on a very large GitHub account vs per-repo Python scans.
+
+One account with --repos repositories (random stars/forks/impressions, dates
+over two years, an eighth undated). It times the following:
+- building the frame, and its array memory;
+- top --k by each rank key: argpartition vs sorted() and heapq.nlargest;
+- the most recent repo: argmax vs the linear scan rule_engine used;
+- the language distribution and a 30-day activity histogram: bincount vs Counter;
+- align_extractions_with_profile with every repo turned into a project
+  (PROFILE_REPO_LIMIT lifted) vs the default cap. Reported as time, tracemalloc
+  peak and stored profile_data size.
+
+Usage: python benchmarks/bench_repo_analytics.py [--repos 10000] [--k 50] [--repeat 5]
+"""
+import argparse
+import heapq
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("LAKSHSETU_LOG_LEVEL", "WARNING")
+
+import trend_scrapping_node  # noqa: E402
+from repo_analytics import RANK_KEYS, RepoFrame  # noqa: E402
+from schemas import DataSource, EngagementMetrics, ExtractionMeta, GitHubRepoExtract, GitHubUserExtract, UserProfile  # noqa: E402
+from trend_scrapping_node import align_extractions_with_profile  # noqa: E402
+
+LANGUAGES = ["Python", "Go", "Rust", "TypeScript", "Java", "C++", "Kotlin", "Scala", "Jupyter Notebook", "Shell"]
+NOW = datetime(2025, 6, 1)
+
+
+def github_extract(repos: int, seed: int = 7) -> GitHubUserExtract:
+    rng = random.Random(seed)
+    return GitHubUserExtract(
+        username="prolific",
+        repositories=[
+            GitHubRepoExtract(
+                name=f"repo-{j}",
+                url=f"https://github.com/prolific/repo-{j}",
+                description="Generated repository",
+                primary_language=rng.choice(LANGUAGES) if j % 5 else None,
+                last_updated=NOW - timedelta(minutes=rng.randrange(2 * 365 * 24 * 60)) if j % 8 else None,
+                metrics=EngagementMetrics(
+                    stars=int(rng.paretovariate(1.2)) - 1,
+                    forks=int(rng.paretovariate(1.5)) - 1,
+                    impressions=rng.randrange(5000),
+                ),
+            )
+            for j in range(repos)
+        ],
+        meta=ExtractionMeta(source=DataSource.github, fetched_at=NOW),
+    )
+
+
+def best(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def peak(fn) -> float:
+    tracemalloc.start()
+    fn()
+    _, top = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return top / 2**20
+
+
+def sort_key(by: str):
+    if by == "recency":
+        return lambda r: r.last_updated or datetime.min
+    return lambda r: getattr(r.metrics, by)
+
+
+def linear_most_recent(repos):
+    # rule_engine.most_recent_repo's scan for small accounts
+    most_recent = None
+    for r in repos:
+        if r.last_updated and (most_recent is None or r.last_updated > most_recent.last_updated):
+            most_recent = r
+    return most_recent
+
+
+def main(repos: int, k: int, repeat: int) -> None:
+    github = github_extract(repos)
+    items = github.repositories
+    frame = RepoFrame(items)
+    t_build = best(lambda: RepoFrame(items), repeat)
+    print(f"repos={repos} k={k} languages={len(frame.languages)}")
+    print(f"frame build {t_build * 1000:.1f} ms, arrays {frame.nbytes() / 2**10:.0f} KiB ({frame.nbytes() / repos:.0f} B/repo)")
+
+    print(f"{'query':<22}{'frame ms':>10}{'sorted ms':>11}{'heapq ms':>10}")
+    for by in RANK_KEYS:
+        key = sort_key(by)
+        top = [items[i] for i in frame.top(by, k)]
+        expected = sorted(items, key=key, reverse=True)[:k]
+        assert [key(r) for r in top] == [key(r) for r in expected]
+        t_frame = best(lambda: frame.top(by, k), repeat)
+        t_sorted = best(lambda: sorted(items, key=key, reverse=True)[:k], repeat)
+        t_heap = best(lambda: heapq.nlargest(k, items, key=key), repeat)
+        print(f"{'top ' + by:<22}{t_frame * 1000:>10.3f}{t_sorted * 1000:>11.2f}{t_heap * 1000:>10.2f}")
+
+    assert frame.most_recent() is linear_most_recent(items)
+    t_frame = best(frame.most_recent, repeat)
+    t_scan = best(lambda: linear_most_recent(items), repeat)
+    print(f"{'most recent':<22}{t_frame * 1000:>10.3f}{t_scan * 1000:>11.2f}  (linear scan)")
+
+    counted = Counter(r.primary_language for r in items if r.primary_language)
+    assert frame.language_distribution() == dict(counted.most_common())
+    t_frame = best(frame.language_distribution, repeat)
+    t_count = best(lambda: Counter(r.primary_language for r in items if r.primary_language).most_common(), repeat)
+    print(f"{'language dist':<22}{t_frame * 1000:>10.3f}{t_count * 1000:>11.2f}  (Counter)")
+
+    def histogram_loop():
+        counts = [0] * 24
+        for r in items:
+            if r.last_updated:
+                bucket = (NOW - r.last_updated).days // 30
+                if bucket < 24:
+                    counts[bucket] += 1
+        return counts
+
+    assert frame.activity_histogram(30, 24, now=NOW).tolist() == histogram_loop()
+    t_frame = best(lambda: frame.activity_histogram(30, 24, now=NOW), repeat)
+    t_loop = best(histogram_loop, repeat)
+    print(f"{'activity histogram':<22}{t_frame * 1000:>10.3f}{t_loop * 1000:>11.2f}  (loop)")
+    print(f"{'featured ' + str(k):<22}{best(lambda: RepoFrame(items).featured(k), repeat) * 1000:>10.2f}  (incl. frame build)")
+
+    # Full alignment of a fresh profile; a new extract object each run so no frame is cached
+    user = UserProfile(id=1, email="prolific@example.com", name="Prolific Dev")
+    capped = trend_scrapping_node.PROFILE_REPO_LIMIT
+    print(f"{'alignment':<22}{'ms':>10}{'peak MiB':>11}{'projects':>10}{'profile KiB':>13}")
+    for label, limit in (("every repo", repos), (f"top {capped}", capped)):
+        trend_scrapping_node.PROFILE_REPO_LIMIT = limit
+        aligned = align_extractions_with_profile(user, github=github)
+        size = len(json.dumps(aligned.model_dump(mode="json", warnings=False)))
+        fresh = github_extract(repos)
+        t_align = best(lambda: align_extractions_with_profile(user, github=fresh), 1)
+        fresh = github_extract(repos)
+        mib = peak(lambda: align_extractions_with_profile(user, github=fresh))
+        print(f"{label:<22}{t_align * 1000:>10.0f}{mib:>11.1f}{len(aligned.projects):>10}{size / 2**10:>13.0f}")
+    trend_scrapping_node.PROFILE_REPO_LIMIT = capped
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repos", type=int, default=10000)
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.repos, args.k, args.repeat)
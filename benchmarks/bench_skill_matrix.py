@@ -0,0 +1,110 @@
+"""skill_matrix.SkillBitMatrix: memory per user and gap-query latency at scale.
+
+Fills a matrix with --users synthetic profiles (a Zipf-ish draw of --per-user
+skills from the canonical vocabulary plus --extra long-tail skills), with user
+ids --id-stride apart to model sparse ids (deleted accounts). It checks
+the vectorized answers against per-user sets on a sample, then times:
+- the bulk load,
+- single-profile updates (the save hook),
+- "which trending skills is each user missing" (missing()),
+- "how many users lack skill X" (count_missing()),
+- users_missing(),
+- the per-user set loop those queries replace.
+
+Usage: python benchmarks/bench_skill_matrix.py [--users 1000000] [--per-user 8] [--extra 40] [--id-stride 1] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("LAKSHSETU_LOG_LEVEL", "WARNING")
+
+import trend_scrapping_node  # noqa: E402
+from skill_matrix import SkillBitMatrix  # noqa: E402
+from skill_vocab import CANONICAL_SKILLS, skill_key  # noqa: E402
+
+
+def best(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main(users: int, per_user: int, extra: int, id_stride: int, repeat: int) -> None:
+    rng = random.Random(5)
+    vocab = list(CANONICAL_SKILLS) + [f"Niche Skill {i}" for i in range(extra)]
+    weights = [1 / (i + 1) ** 0.8 for i in range(len(vocab))]
+    trending = list(trend_scrapping_node.TRENDING_SKILLS)
+
+    # Rows drawn in blocks: random.choices per user is the slow part of the setup
+    pool = [rng.choices(vocab, weights=weights, k=rng.randint(0, per_user * 2)) for _ in range(4096)]
+    matrix = SkillBitMatrix()
+    user_ids = range(1, users * id_stride + 1, id_stride)
+    t0 = time.perf_counter()
+    chunk = 50_000
+    for start in range(0, users, chunk):
+        matrix._set_rows({user_id: pool[user_id % len(pool)] for user_id in user_ids[start:start + chunk]})
+    t_load = time.perf_counter() - t0
+
+    # Same answers as per-user sets
+    sample = user_ids[:20_000]
+    sets = {u: {skill_key(s) for s in pool[u % len(pool)]} for u in sample}
+    ids, missing = matrix.missing(trending)
+    for row, user_id in enumerate(ids[: len(sets)].tolist()):
+        assert missing[row].tolist() == [skill_key(t) not in sets[user_id] for t in trending]
+    skill = trending[0]
+    assert matrix.count_missing(skill) == len(matrix.users_missing(skill)) == int(missing[:, 0].sum())
+
+    def per_user_sets():
+        # What analyze_skill_gaps / the gap rule do per call, for the sampled users
+        keys = [skill_key(t) for t in trending]
+        for u in sample:
+            have = {skill_key(s) for s in pool[u % len(pool)]}
+            [k for k in keys if k not in have]
+
+    n_updates = 10_000
+    profiles = [{"skills": [{"skill_name": s} for s in pool[(u * 7) % len(pool)]]} for u in range(n_updates)]
+
+    def updates():
+        for user_id, data in zip(user_ids, profiles):
+            matrix.update_profiles({user_id: data})
+
+    t_missing = best(lambda: matrix.missing(trending), repeat)
+    t_missing_ws = best(lambda: matrix.missing(trending, with_skills_only=True), repeat)
+    t_count = best(lambda: matrix.count_missing(skill), repeat)
+    t_gaps = best(lambda: matrix.gap_counts(trending), repeat)
+    t_users = best(lambda: matrix.users_missing(skill), repeat)
+    t_sets = best(per_user_sets, repeat) * users / len(sample)
+    t_update = best(updates, 1) / n_updates
+
+    stats = matrix.stats()
+    print(
+        f"users={stats['users']:,} skills={stats['skills']} words/user={stats['words_per_user']} "
+        f"memory={stats['nbytes'] / 2**20:.1f} MiB ({stats['bytes_per_user']:.1f} B/user, capacity {stats['capacity']:,})"
+    )
+    print(f"bulk load: {t_load:.2f} s; save-hook update: {t_update * 1e6:.1f} us/profile")
+    print(f"{'query':<44}{'ms':>10}")
+    print(f"{f'missing({len(trending)} trending) -> bool matrix':<44}{t_missing * 1000:>10.1f}")
+    print(f"{'  ... with_skills_only':<44}{t_missing_ws * 1000:>10.1f}")
+    print(f"{'count_missing(skill)':<44}{t_count * 1000:>10.2f}")
+    print(f"{f'gap_counts({len(trending)} trending)':<44}{t_gaps * 1000:>10.1f}")
+    print(f"{'users_missing(skill) -> id array':<44}{t_users * 1000:>10.1f}")
+    print(f"{'per-user sets (extrapolated)':<44}{t_sets * 1000:>10.0f}  ({t_sets / t_missing:.0f}x missing())")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--per-user", type=int, default=8)
+    parser.add_argument("--extra", type=int, default=40)
+    parser.add_argument("--id-stride", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.users, args.per_user, args.extra, args.id_stride, args.repeat)
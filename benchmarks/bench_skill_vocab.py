@@ -0,0 +1,81 @@
+"""Normalizing raw skill strings through skill_vocab vs plain lower().
+
+Draws --strings raw skills from GitHub language, LinkedIn skill and Hugging
+Face task/tag spellings, with random case and separator variants, and times
+each way of turning them into match keys. Also reports how many distinct
+keys each produces (fewer = more duplicate skills merged).
+
+Usage: python benchmarks/bench_skill_vocab.py [--strings 2000000] [--seed 7]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from skill_vocab import CANONICAL_SKILLS, SkillVocabulary, normalize  # noqa: E402
+
+GITHUB_LANGUAGES = ["Python", "JavaScript", "TypeScript", "C++", "C#", "Go", "Rust", "Java", "Kotlin", "Shell", "Jupyter Notebook", "HTML", "CSS", "R"]
+LINKEDIN_SKILLS = [
+    "Machine Learning", "ML", "AI/ML", "Artificial Intelligence", "Deep Learning", "Data Science", "Data Analysis",
+    "Natural Language Processing", "NLP", "Cloud Computing", "AWS", "Kubernetes", "Docker", "DevOps", "CI/CD",
+    "Cybersecurity", "Information Security", "Software Development", "SQL", "Node.js", "React.js", "Leadership",
+]
+HF_TAGS = [
+    "text-classification", "text-generation", "token-classification", "image-classification", "object-detection",
+    "pytorch", "tensorflow", "transformers", "llm", "generative-ai", "mlops", "scikit-learn", "sklearn",
+]
+
+
+def variants(rng: random.Random, base: str) -> str:
+    s = base
+    roll = rng.random()
+    if roll < 0.25:
+        s = s.lower()
+    elif roll < 0.35:
+        s = s.upper()
+    if rng.random() < 0.2:
+        s = s.replace(" ", rng.choice(["-", "_", "  "]))
+    if rng.random() < 0.1:
+        s = f" {s} "
+    return s
+
+
+def timed(fn, strings) -> float:
+    t0 = time.perf_counter()
+    for s in strings:
+        fn(s)
+    return time.perf_counter() - t0
+
+
+def main(count: int, seed: int) -> None:
+    rng = random.Random(seed)
+    pool = GITHUB_LANGUAGES + LINKEDIN_SKILLS + HF_TAGS
+    strings = [variants(rng, rng.choice(pool)) for _ in range(count)]
+
+    vocab = SkillVocabulary(CANONICAL_SKILLS)
+    t_lower = timed(lambda s: s.strip().lower(), strings)
+    t_normalize = timed(normalize, strings)
+    t_key = timed(vocab.key, strings)
+    t_lookup = timed(vocab.lookup, strings)
+
+    distinct = len(set(strings))
+    print(f"strings={count} distinct raw={distinct} vocabulary aliases={len(vocab.index)}")
+    print(f"{'method':<24}{'seconds':>9}{'ns/string':>11}{'distinct keys':>15}")
+    for name, seconds, keys in (
+        ("str.strip().lower()", t_lower, {s.strip().lower() for s in strings}),
+        ("normalize (no vocab)", t_normalize, {normalize(s) for s in strings}),
+        ("vocab.lookup (uncached)", t_lookup, {vocab.lookup(s) or normalize(s) for s in strings}),
+        ("vocab.key (cached)", t_key, {vocab.key(s) for s in strings}),
+    ):
+        print(f"{name:<24}{seconds:>9.2f}{seconds / count * 1e9:>11.0f}{len(keys):>15}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--strings", type=int, default=2_000_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    main(args.strings, args.seed)
@@ -0,0 +1,150 @@
+"""Mixed read/write load against uvicorn for each SQLite profile and group-commit setting.
+
+For every combination of LAKSHSETU_SQLITE_PROFILE, LAKSHSETU_GROUP_COMMIT and
+worker count this starts `uvicorn server:app --workers N` on a fresh temporary
+SQLite file and drives it over HTTP:
+
+  write: POST /registration with a new email      (SELECT + INSERT/commit)
+  read:  POST /registration with a seeded email   (SELECT only, answered 400)
+
+Usage: python benchmarks/bench_storage_profiles.py [--workers 1 4] [--requests 3000] [--concurrency 64] [--write-ratio 0.3]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEED_USERS = 500
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def start_server(workers: int, profile: str, group_commit: bool, db_path: str) -> tuple:
+    port = _free_port()
+    env = dict(
+        os.environ,
+        LAKSHSETU_DB_PATH=db_path,
+        LAKSHSETU_SQLITE_PROFILE=profile,
+        LAKSHSETU_GROUP_COMMIT="1" if group_commit else "0",
+        LAKSHSETU_LOG_LEVEL="WARNING",
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=REPO_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(base_url + "/").status_code == 200:
+                return proc, base_url
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("uvicorn did not come up within 30s")
+
+
+async def drive(base_url: str, requests: int, concurrency: int, write_ratio: float) -> Dict[str, float]:
+    rng = random.Random(7)
+    plan = ["write" if rng.random() < write_ratio else "read" for _ in range(requests)]
+    counter = itertools.count()
+    latencies: Dict[str, List[float]] = {"read": [], "write": []}
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        seed = "\n".join(json.dumps({"email": f"seed-{i}@example.com", "name": f"Seed {i}"}) for i in range(SEED_USERS))
+        resp = await client.post("/registration/batch", content=seed, headers={"content-type": "application/x-ndjson"})
+        resp.raise_for_status()
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for kind in plan:
+            queue.put_nowait(kind)
+
+        async def worker() -> None:
+            nonlocal errors
+            while not queue.empty():
+                kind = queue.get_nowait()
+                if kind == "write":
+                    payload = {"email": f"new-{next(counter)}@example.com", "name": "Load Test"}
+                    expected = 200
+                else:
+                    payload = {"email": f"seed-{rng.randrange(SEED_USERS)}@example.com", "name": "Load Test"}
+                    expected = 400
+                t0 = time.perf_counter()
+                try:
+                    resp = await client.post("/registration", json=payload)
+                    ok = resp.status_code == expected
+                except httpx.HTTPError:
+                    ok = False
+                latencies[kind].append(time.perf_counter() - t0)
+                if not ok:
+                    errors += 1
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+
+    return {
+        "rps": round(requests / elapsed, 1),
+        "read_p50_ms": round(_percentile(latencies["read"], 50) * 1000, 2),
+        "read_p99_ms": round(_percentile(latencies["read"], 99) * 1000, 2),
+        "write_p50_ms": round(_percentile(latencies["write"], 50) * 1000, 2),
+        "write_p99_ms": round(_percentile(latencies["write"], 99) * 1000, 2),
+        "errors": errors,
+    }
+
+
+def main(worker_counts: List[int], requests: int, concurrency: int, write_ratio: float) -> None:
+    tmp_dir = tempfile.mkdtemp(prefix="lakshsetu-bench-")
+    header = ["profile", "group", "workers", "rps", "read p50", "read p99", "write p50", "write p99", "errors"]
+    print("".join(f"{h:>11}" for h in header))
+    for workers, profile, group_commit in itertools.product(worker_counts, ["default", "wal"], [False, True]):
+        db_path = os.path.join(tmp_dir, f"{profile}-{int(group_commit)}-{workers}.db")
+        proc, base_url = start_server(workers, profile, group_commit, db_path)
+        try:
+            row = asyncio.run(drive(base_url, requests, concurrency, write_ratio))
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+        cells = [
+            profile, "on" if group_commit else "off", workers, row["rps"],
+            row["read_p50_ms"], row["read_p99_ms"], row["write_p50_ms"], row["write_p99_ms"], row["errors"],
+        ]
+        print("".join(f"{c:>11}" for c in cells))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--write-ratio", type=float, default=0.3)
+    args = parser.parse_args()
+    main(args.workers, args.requests, args.concurrency, args.write_ratio)
@@ -0,0 +1,66 @@
+"""Agent cycle cost with per-node tracing disabled vs enabled.
+
+Also times a bare disabled span() (the only cost instrumented code pays when
+tracing is off) and writes the enabled run's trace for inspection.
+
+Usage: python benchmarks/bench_tracing.py [--users 500] [--repeat 5] [--out trace.json]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("LAKSHSETU_LOG_LEVEL", "WARNING")
+
+import agent  # noqa: E402
+import tracing  # noqa: E402
+from scheduler import synthetic_users  # noqa: E402
+
+
+def run(users, repeat: int) -> float:
+    """Best of `repeat` passes of one cycle per user; seconds per cycle."""
+    best = float("inf")
+    for _ in range(repeat):
+        states = [agent.initial_state(user) for user in users]
+        t0 = time.perf_counter()
+        for state in states:
+            agent.run_cycle(state)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(users)
+
+
+def main(users: int, repeat: int, out: str) -> None:
+    population = synthetic_users(users)
+    tracing.disable()
+    off = run(population, repeat)
+    tracer = tracing.enable()
+    on = run(population, repeat)
+    tracing.disable()
+    spans = tracer.export(out)
+
+    n = 1_000_000
+    noop = timeit.timeit('with span("x"): pass', globals={"span": tracing.span}, number=n) / n
+    spans_per_cycle = spans / (users * repeat)
+
+    print(f"users={users} spans/cycle={spans_per_cycle:.0f}")
+    print(f"{'tracing':<10}{'us/cycle':>10}")
+    print(f"{'disabled':<10}{off * 1e6:>10.1f}")
+    print(f"{'enabled':<10}{on * 1e6:>10.1f}")
+    print(
+        f"disabled span(): {noop * 1e9:.0f} ns, "
+        f"{noop * spans_per_cycle / off:.2%} of a cycle; enabled overhead {on / off - 1:.0%}"
+    )
+    print(f"trace: {out}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", default=os.path.join(tempfile.gettempdir(), "lakshsetu-trace.json"))
+    args = parser.parse_args()
+    main(args.users, args.repeat, args.out)
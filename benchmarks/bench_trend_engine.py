@@ -0,0 +1,117 @@
+"""trend_engine.TrendEngine: bulk ingest, incremental batches and table reads.
+
+Generates a synthetic corpus of arXiv, Medium, X, Stack Overflow and
+TrendSkill extracts spread over --days, checks the engine's scores against a
+plain-Python evaluation of the same formula, then times a bulk ingest, a
+small incremental batch plus refresh, and top()/rank() reads.
+
+Usage: python benchmarks/bench_trend_engine.py [--extracts 50000] [--skills 500] [--batch 1000] [--days 180]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("LAKSHSETU_LOG_LEVEL", "WARNING")
+
+import trend_engine  # noqa: E402
+import trend_scrapping_node  # noqa: E402
+from schemas import (  # noqa: E402
+    ArxivPaperExtract,
+    DataSource,
+    EngagementMetrics,
+    ExtractionMeta,
+    MediumArticleExtract,
+    StackOverflowProfileExtract,
+    TrendSkillExtract,
+    XPostExtract,
+)
+from trend_engine import ENGAGEMENT_COEFFICIENTS, ENGAGEMENT_COLUMNS, SOURCE_WEIGHTS, TrendEngine, observations  # noqa: E402
+
+
+def corpus(n: int, skills: int, days: int, end: datetime, seed: int = 7):
+    rng = random.Random(seed)
+    # Zipf-ish popularity so a few skills clearly lead
+    names = [f"skill{i}" for i in range(skills)]
+    pick = lambda k: rng.choices(names, weights=[1 / (i + 1) for i in range(skills)], k=k)  # noqa: E731
+    extracts = []
+    for i in range(n):
+        when = end - timedelta(seconds=rng.uniform(0, days * 86400))
+        metrics = EngagementMetrics(views=rng.randint(0, 5000), likes=rng.randint(0, 200), comments=rng.randint(0, 20))
+        kind = i % 5
+        if kind == 0:
+            meta = ExtractionMeta(source=DataSource.arxiv, fetched_at=end)
+            extracts.append(ArxivPaperExtract(title=f"p{i}", published_at=when, categories=pick(2), citations=rng.randint(0, 50), meta=meta))
+        elif kind == 1:
+            meta = ExtractionMeta(source=DataSource.medium, fetched_at=end)
+            extracts.append(MediumArticleExtract(title=f"a{i}", url=f"https://medium.com/a{i}", published_at=when, tags=pick(3), metrics=metrics, meta=meta))
+        elif kind == 2:
+            meta = ExtractionMeta(source=DataSource.x, fetched_at=end)
+            extracts.append(XPostExtract(content=" ".join(f"#{t}" for t in pick(2)), created_at=when, metrics=metrics, meta=meta))
+        elif kind == 3:
+            meta = ExtractionMeta(source=DataSource.stack_overflow, fetched_at=when)
+            extracts.append(StackOverflowProfileExtract(display_name=f"u{i}", reputation=rng.randint(1, 20000), answers=rng.randint(0, 300), top_tags=pick(3), meta=meta))
+        else:
+            meta = ExtractionMeta(source=DataSource.website, fetched_at=when)
+            extracts.append(TrendSkillExtract(name=pick(1)[0], score=rng.random(), meta=meta))
+    return extracts
+
+
+def reference_scores(extracts, half_life_days: float, now: datetime):
+    rate = math.log(2) / (half_life_days * 86400)
+    scores = {}
+    for extract in extracts:
+        for skill, when, values in observations(extract):
+            engagement = sum(c * values.get(col, 0) for c, col in zip(ENGAGEMENT_COEFFICIENTS, ENGAGEMENT_COLUMNS))
+            weight = SOURCE_WEIGHTS.get(type(extract), 1.0) * (1 + math.log1p(engagement))
+            age = (now - when).total_seconds()
+            scores[skill.lower()] = scores.get(skill.lower(), 0.0) + weight * math.exp(-rate * age)
+    return scores
+
+
+def main(extracts: int, skills: int, batch: int, days: int) -> None:
+    end = datetime(2025, 6, 1)
+    bulk = corpus(extracts, skills, days, end)
+    fresh = corpus(batch, skills, 1, end + timedelta(days=1), seed=11)
+
+    engine = TrendEngine()
+    t0 = time.perf_counter()
+    obs = engine.ingest(bulk)
+    t_bulk = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    ref = reference_scores(bulk, trend_engine.TREND_HALF_LIFE_DAYS, end)
+    t_python = time.perf_counter() - t0
+    got = {k.lower(): v for k, v in engine.scores(now=end).items()}
+    worst = max(abs(got[k] - v) / v for k, v in ref.items())
+    assert worst < 1e-9, worst
+
+    t0 = time.perf_counter()
+    engine.ingest(fresh)
+    t_batch = time.perf_counter() - t0
+
+    n = 100_000
+    t_top = timeit.timeit(lambda: engine.top(6), number=n) / n
+    t_rank = timeit.timeit(lambda: engine.rank("skill3"), number=n) / n
+
+    print(f"extracts={extracts} observations={obs} skills={engine.stats()['skills']} days={days}")
+    print(f"bulk ingest + refresh: {t_bulk:.2f} s ({obs / t_bulk:,.0f} obs/s); plain-Python scoring: {t_python:.2f} s; max rel. error {worst:.1e}")
+    print(f"incremental batch of {batch} + refresh: {t_batch * 1000:.1f} ms")
+    print(f"top(6): {t_top * 1e9:.0f} ns  rank(): {t_rank * 1e9:.0f} ns")
+    print(f"published: {list(trend_scrapping_node.TRENDING_SKILLS[:6])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--extracts", type=int, default=50000)
+    parser.add_argument("--skills", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=180)
+    args = parser.parse_args()
+    main(args.extracts, args.skills, args.batch, args.days)
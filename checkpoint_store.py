@@ -0,0 +1,257 @@
+import hashlib
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+
+from metrics import REGISTRY
+from profile_codec import dumps_json, loads_json
+from schemas import (
+    CareerActionRecommendation,
+    DataSource,
+    GitHubUserExtract,
+    HuggingFaceModelExtract,
+    LinkedInProfileExtract,
+    UserProfile,
+)
+from table import AgentStateFieldDB, engine as default_engine
+
+
+# --- Durable AgentState checkpoints ---
+#
+# Each AgentState field is stored as its own JSON row keyed by (user_key, field) with a
+# content hash. save() re-encodes the state but only writes fields whose hash differs
+# from the last one stored, so a cycle that only moves the schedule writes two small
+# rows instead of the whole profile plus extracts.
+
+STATE_TABLE = AgentStateFieldDB.__table__
+
+
+def _to_jsonable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", warnings=False)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _to_jsonable(v) for k, v in value.items()}
+    return value
+
+
+def _model(cls) -> Callable[[Any], Any]:
+    return lambda data: None if data is None else cls.model_validate(data)
+
+
+def _model_list(cls) -> Callable[[Any], Any]:
+    return lambda data: None if data is None else [cls.model_validate(item) for item in data]
+
+
+def _datetime(data: Any) -> Optional[datetime]:
+    return None if data is None else datetime.fromisoformat(data)
+
+
+def _datetime_map(data: Any) -> Optional[Dict[str, datetime]]:
+    return None if data is None else {k: datetime.fromisoformat(v) for k, v in data.items()}
+
+
+def _json(data: Any) -> Any:
+    # Fields that are plain JSON already (ints, status dicts)
+    return data
+
+
+def _extracts(data: Any) -> Optional[Dict[str, Any]]:
+    # {DataSource value: extract}, validated with the ingestion adapter of each source
+    if data is None:
+        return None
+    from ingestion import SOURCE_SPECS
+
+    out: Dict[str, Any] = {}
+    for source, value in data.items():
+        try:
+            spec = SOURCE_SPECS.get(DataSource(source))
+        except ValueError:
+            spec = None
+        out[source] = spec.adapter.validate_python(value) if spec is not None and value is not None else value
+    return out
+
+
+def _event(data: Any) -> Optional[Dict[str, Any]]:
+    # Resume event; a profile_edit carries the edited UserProfile
+    if data is None:
+        return None
+    event = dict(data)
+    if event.get("user") is not None:
+        event["user"] = UserProfile.model_validate(event["user"])
+    return event
+
+
+# How to rebuild each AgentState field (agent.AgentState) from its JSON; unknown fields come back as plain JSON
+FIELD_DECODERS: Dict[str, Callable[[Any], Any]] = {
+    "user": _model(UserProfile),
+    "github": _model(GitHubUserExtract),
+    "linkedin": _model(LinkedInProfileExtract),
+    "hf_models": _model_list(HuggingFaceModelExtract),
+    "recs": _model_list(CareerActionRecommendation),
+    "last_user_processing_at": _datetime,
+    "next_user_processing_at": _datetime,
+    "schedule_interval_days": _json,
+    "pending_event": _event,
+    "extracts": _extracts,
+    "ingestion": _json,
+    "aligned_through": _datetime_map,
+}
+
+
+def encode_field(value: Any) -> Tuple[bytes, str]:
+    """(payload, digest) for one state field."""
+    payload = dumps_json(_to_jsonable(value))
+    return payload, hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def decode_field(field: str, payload: bytes) -> Any:
+    data = loads_json(payload)
+    decoder = FIELD_DECODERS.get(field)
+    return decoder(data) if decoder else data
+
+
+def state_key(state: Dict[str, Any]) -> str:
+    """Checkpoint key for a state: the user's id, else email (as the scheduler keys users)."""
+    user = state["user"]
+    return str(user.id if user.id is not None else user.email)
+
+
+class AgentCheckpointStore:
+    """Per-field, content-addressed AgentState persistence on a SQLite engine.
+
+    Defaults to the users.db engine from table.py; pass another engine for a
+    separate file. Safe to share across scheduler worker threads.
+    """
+
+    def __init__(self, engine: Engine = default_engine):
+        self.engine = engine
+        # user_key -> {field: digest} as last written/restored
+        self._digests: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+        self.saves = 0
+        self.fields_written = 0
+        self.fields_skipped = 0
+        self.bytes_written = 0
+        self.last_restore_seconds = 0.0
+        self.last_restore_bytes = 0
+        self.last_restore_users = 0
+        REGISTRY.register_collector(self._collect)
+
+    def close(self) -> None:
+        """Stop exporting this store's metrics (the engine belongs to the caller)."""
+        REGISTRY.unregister_collector(self._collect)
+
+    def save(self, state: Dict[str, Any], key: Optional[str] = None) -> int:
+        """Persist the fields of `state` that changed since the last save. Returns bytes written."""
+        key = key or state_key(state)
+        with self._lock:
+            known = dict(self._digests.get(key, {}))
+
+        rows = []
+        for field, value in state.items():
+            payload, digest = encode_field(value)
+            if known.get(field) == digest:
+                continue
+            rows.append({"user_key": key, "field": field, "digest": digest, "payload": payload})
+
+        written = sum(len(row["payload"]) for row in rows)
+        if rows:
+            stmt = sqlite_insert(STATE_TABLE)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["user_key", "field"],
+                set_={"digest": stmt.excluded.digest, "payload": stmt.excluded.payload},
+            )
+            with self.engine.begin() as conn:
+                conn.execute(stmt, rows)
+
+        with self._lock:
+            digests = self._digests.setdefault(key, {})
+            for row in rows:
+                digests[row["field"]] = row["digest"]
+            self.saves += 1
+            self.fields_written += len(rows)
+            self.fields_skipped += len(state) - len(rows)
+            self.bytes_written += written
+        return written
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        with self.engine.connect() as conn:
+            rows = conn.execute(
+                select(STATE_TABLE.c.field, STATE_TABLE.c.digest, STATE_TABLE.c.payload).where(STATE_TABLE.c.user_key == key)
+            ).all()
+        if not rows:
+            return None
+        state = {field: decode_field(field, payload) for field, _, payload in rows}
+        with self._lock:
+            self._digests[key] = {field: digest for field, digest, _ in rows}
+        return state
+
+    def restore_all(self, chunk_size: int = 5000) -> Dict[str, Dict[str, Any]]:
+        """Load every stored state in one ordered scan ({user_key: state})."""
+        t0 = time.perf_counter()
+        states: Dict[str, Dict[str, Any]] = {}
+        digests: Dict[str, Dict[str, str]] = {}
+        read = 0
+        query = select(STATE_TABLE.c.user_key, STATE_TABLE.c.field, STATE_TABLE.c.digest, STATE_TABLE.c.payload)
+        with self.engine.connect() as conn:
+            result = conn.execution_options(stream_results=True).execute(query.order_by(STATE_TABLE.c.user_key))
+            for partition in result.partitions(chunk_size):
+                for key, field, digest, payload in partition:
+                    states.setdefault(key, {})[field] = decode_field(field, payload)
+                    digests.setdefault(key, {})[field] = digest
+                    read += len(payload)
+        with self._lock:
+            self._digests.update(digests)
+            self.last_restore_seconds = time.perf_counter() - t0
+            self.last_restore_bytes = read
+            self.last_restore_users = len(states)
+        return states
+
+    def delete(self, key: str) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(delete(STATE_TABLE).where(STATE_TABLE.c.user_key == key))
+        with self._lock:
+            self._digests.pop(key, None)
+
+    def keys(self) -> Iterable[str]:
+        with self.engine.connect() as conn:
+            return [row[0] for row in conn.execute(select(STATE_TABLE.c.user_key).distinct())]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "saves": self.saves,
+                "fields_written": self.fields_written,
+                "fields_skipped": self.fields_skipped,
+                "bytes_written": self.bytes_written,
+                "last_restore_seconds": round(self.last_restore_seconds, 4),
+                "last_restore_bytes": self.last_restore_bytes,
+                "last_restore_users": self.last_restore_users,
+            }
+
+    def _collect(self):
+        stats = self.stats()
+        yield ("lakshsetu_checkpoint_saves_total", "counter", "AgentState checkpoint saves", [({}, stats["saves"])])
+        yield (
+            "lakshsetu_checkpoint_fields_total", "counter", "State fields per save, written or skipped as unchanged",
+            [({"result": "written"}, stats["fields_written"]), ({"result": "skipped"}, stats["fields_skipped"])],
+        )
+        yield ("lakshsetu_checkpoint_bytes_written_total", "counter", "Payload bytes written", [({}, stats["bytes_written"])])
+        yield (
+            "lakshsetu_checkpoint_last_restore_seconds", "gauge", "Duration of the last restore_all()",
+            [({}, stats["last_restore_seconds"])],
+        )
+        yield (
+            "lakshsetu_checkpoint_last_restore_bytes", "gauge", "Payload bytes read by the last restore_all()",
+            [({}, stats["last_restore_bytes"])],
+        )
@@ -0,0 +1,321 @@
+"""Cohort-level suggest_next_steps: the same rules, evaluated as NumPy masks.
+
+CohortFrame flattens many (profile, GitHub, LinkedIn) triples into one column per
+rule_engine feature: counts and flags, the most recent repo, and a user x
+trending-skill membership matrix. Each rule of the live rule plan (rule_engine.RULES,
+including hot-reloaded or custom rule files) is then one boolean mask over the
+cohort, built from its condition tree. A rule whose condition uses a feature or
+operator the columns can't express is tested per user with the compiled
+condition instead. CareerActionRecommendation objects are only built at the end,
+in firing order, so each user's list equals suggest_next_steps for that user.
+"""
+import random
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError("numpy is required for cohort recommendations. Install with: pip install numpy") from e
+
+import trend_scrapping_node
+from rule_engine import OPERATORS, RULES, CompiledRule, Features, RuleEngine, most_recent_repo
+from schemas import (
+    CareerActionRecommendation,
+    Certifications,
+    DataSource,
+    ExtractionMeta,
+    GitHubRepoExtract,
+    GitHubUserExtract,
+    LinkedInProfileExtract,
+    Projects,
+    Skills,
+    UserProfile,
+)
+from skill_vocab import skill_key
+
+# Comparisons run as one ufunc over a column (equality also on object columns); anything else
+# goes through OPERATORS per user
+_VECTOR_OPS: Dict[str, Callable[[np.ndarray, Any], np.ndarray]] = {
+    "==": np.equal,
+    "!=": np.not_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+}
+# List-valued features: only their truth is vectorized, as count > 0
+_LIST_COUNTS = {"trending_gaps": "trending_gap_count"}
+
+
+def _truth(col: np.ndarray) -> np.ndarray:
+    if col.dtype == bool:
+        return col
+    if col.dtype == object:
+        return np.fromiter(map(bool, col), dtype=bool, count=len(col))
+    return col != 0
+
+
+class CohortFrame:
+    """Columnar view of a cohort for the rule plan of `engine` (default rule_engine.RULES)."""
+
+    def __init__(
+        self,
+        users: Sequence[UserProfile],
+        githubs: Optional[Sequence[Optional[GitHubUserExtract]]] = None,
+        linkedins: Optional[Sequence[Optional[LinkedInProfileExtract]]] = None,
+        trending: Optional[Sequence[str]] = None,
+        engine: Optional[RuleEngine] = None,
+    ):
+        n = len(users)
+        self.users = users
+        self.githubs = githubs if githubs is not None else [None] * n
+        self.linkedins = linkedins if linkedins is not None else [None] * n
+        self.trending = tuple(trending if trending is not None else trend_scrapping_node.TRENDING_SKILLS)
+        self.size = n
+        # Same plan suggest_next_steps would use right now
+        engine = engine or RULES
+        engine.maybe_reload()
+        self.plan = engine.plan
+
+        trend_cols: Dict[str, List[int]] = {}
+        for col, name in enumerate(self.trending):
+            trend_cols.setdefault(skill_key(name), []).append(col)
+
+        # Gathered as Python lists (appends are cheaper than NumPy item writes), converted once
+        skill_count: List[int] = []
+        project_count: List[int] = []
+        certification_count: List[int] = []
+        has_github: List[bool] = []
+        repo_count: List[int] = []
+        has_linkedin: List[bool] = []
+        post_count: List[int] = []
+        connections: List[int] = []
+        hit_user: List[int] = []
+        hit_col: List[int] = []
+        # Aggregate per user: name of the most recently updated repo (None if no dated repo)
+        self.recent_repo: List[Optional[str]] = []
+        for i, (user, github, linkedin) in enumerate(zip(users, self.githubs, self.linkedins)):
+            skills = user.skills
+            skill_count.append(len(skills or ()))
+            if skills:
+                for s in skills:
+                    for col in trend_cols.get(skill_key(s.skill_name), ()):
+                        hit_user.append(i)
+                        hit_col.append(col)
+            project_count.append(len(user.projects or ()))
+            certification_count.append(len(user.certifications or ()))
+            if github:
+                has_github.append(True)
+                repo_count.append(len(github.repositories or ()))
+                self.recent_repo.append(most_recent_repo(github))
+            else:
+                has_github.append(False)
+                repo_count.append(0)
+                self.recent_repo.append(None)
+            if linkedin:
+                has_linkedin.append(True)
+                post_count.append(linkedin.post_count or 0)
+                connections.append(linkedin.connections or 0)
+            else:
+                has_linkedin.append(False)
+                post_count.append(0)
+                connections.append(0)
+
+        # has_trending[i, t]: user i already has trending skill t
+        self.has_trending = np.zeros((n, len(self.trending)), dtype=bool)
+        self.has_trending[hit_user, hit_col] = True
+
+        # One column per rule_engine feature the masks can use, same meaning as FEATURES
+        counts = {
+            "skill_count": skill_count,
+            "project_count": project_count,
+            "certification_count": certification_count,
+            "repo_count": repo_count,
+            "linkedin_posts": post_count,
+            "linkedin_connections": connections,
+        }
+        self.columns: Dict[str, np.ndarray] = {name: np.array(v, dtype=np.int64) for name, v in counts.items()}
+        self.columns["has_skills"] = self.columns["skill_count"] > 0
+        self.columns["has_projects"] = self.columns["project_count"] > 0
+        self.columns["has_certifications"] = self.columns["certification_count"] > 0
+        self.columns["has_github"] = np.array(has_github, dtype=bool)
+        self.columns["has_linkedin"] = np.array(has_linkedin, dtype=bool)
+        self.columns["trending_gap_count"] = len(self.trending) - self.has_trending.sum(axis=1)
+        self.columns["most_recent_repo"] = np.array(self.recent_repo, dtype=object)
+
+        self._features: List[Optional[Features]] = [None] * n
+        self._gap_names: Optional[List[List[str]]] = None
+        self._gap_pattern: Optional[np.ndarray] = None
+
+    # --- Conditions ---
+
+    def _mask(self, cond: Any) -> Optional[np.ndarray]:
+        # Vectorized condition tree, or None if some term has no column form
+        if isinstance(cond, str):
+            if cond in _LIST_COUNTS:
+                return self.columns[_LIST_COUNTS[cond]] > 0
+            col = self.columns.get(cond)
+            return None if col is None else _truth(col)
+        if isinstance(cond, list):
+            name, op, value = cond
+            col = self.columns.get(name)
+            if col is None:
+                return None
+            if col.dtype == object:
+                if op in ("==", "!=") and isinstance(value, (bool, int, float, str, type(None))):
+                    return _VECTOR_OPS[op](col, value).astype(bool, copy=False)
+            elif op in _VECTOR_OPS and isinstance(value, (bool, int, float)):
+                return _VECTOR_OPS[op](col, value)
+            test = OPERATORS[op]("v", value)
+            return np.fromiter((bool(test({"v": x})) for x in col.tolist()), dtype=bool, count=self.size)
+        (kind, arg), = cond.items()
+        if kind == "not":
+            inner = self._mask(arg)
+            return None if inner is None else ~inner
+        masks = [self._mask(c) for c in arg]
+        if any(m is None for m in masks):
+            return None
+        return np.logical_and.reduce(masks) if kind == "all" else np.logical_or.reduce(masks)
+
+    def _rule_mask(self, rule: CompiledRule) -> np.ndarray:
+        if rule.when is None:
+            return np.ones(self.size, dtype=bool)
+        mask = self._mask(rule.when)
+        if mask is None:
+            # Not expressible over the columns: the compiled condition, per user
+            mask = np.fromiter((bool(rule.test(self.features(i))) for i in range(self.size)), dtype=bool, count=self.size)
+        return mask
+
+    def _fired(self) -> Tuple[List[np.ndarray], List[int]]:
+        # Per rule: users it fires for, and users it is evaluated for (the plan stops at max_recommendations)
+        masks = [self._rule_mask(rule) for rule in self.plan.rules]
+        evaluated = [self.size] * len(masks)
+        limit = self.plan.max_recommendations
+        if limit is not None and masks:
+            fired = np.column_stack(masks)
+            open_ = (np.cumsum(fired, axis=1) - fired) < limit
+            masks = list((fired & open_).T)
+            evaluated = open_.sum(axis=0).tolist()
+        return masks, evaluated
+
+    def masks(self) -> Dict[str, np.ndarray]:
+        """Boolean mask per rule (after max_recommendations), in firing order."""
+        return {rule.id: mask for rule, mask in zip(self.plan.rules, self._fired()[0])}
+
+    # --- Rendering ---
+
+    def _gaps(self, i: int) -> List[str]:
+        if self._gap_names is None:
+            # Users share few distinct gap patterns: name each one once
+            patterns, inverse = np.unique(~self.has_trending, axis=0, return_inverse=True)
+            self._gap_names = [[t for t, gap in zip(self.trending, row) if gap] for row in patterns.tolist()]
+            self._gap_pattern = inverse.reshape(-1)
+        return self._gap_names[self._gap_pattern[i]]
+
+    def features(self, i: int) -> Features:
+        """User i's rule features: the columns' values filled in, anything else computed on demand."""
+        f = self._features[i]
+        if f is None:
+            f = self._features[i] = Features(
+                user=self.users[i],
+                github=self.githubs[i],
+                linkedin=self.linkedins[i],
+                trending=self.trending,
+                trending_gaps=self._gaps(i),
+                most_recent_repo=self.recent_repo[i],
+            )
+        return f
+
+    def recommendations(self) -> List[List[CareerActionRecommendation]]:
+        """Per-user recommendation lists, equal to suggest_next_steps for each user."""
+        masks, evaluated = self._fired()
+        plan = self.plan
+        out: List[List[CareerActionRecommendation]] = [[] for _ in range(self.size)]
+        # Rules in firing order, so every user's list comes out in suggest_next_steps order
+        for j, rule in enumerate(plan.rules):
+            users = np.flatnonzero(masks[j]).tolist()
+            plan.hits[j] += len(users)
+            plan.evaluated[j] += evaluated[j]
+            render, features = rule.render, self.features
+            for i in users:
+                out[i].append(render(features(i)))
+        return out
+
+    def recommendations_for(self, i: int) -> List[CareerActionRecommendation]:
+        """One user's recommendations, from the plan run for that user alone."""
+        return self.plan.evaluate(self.users[i], self.githubs[i], self.linkedins[i], self.trending)
+
+    def rule_counts(self) -> Dict[str, int]:
+        """How many users each rule fires for."""
+        return {rule: int(mask.sum()) for rule, mask in self.masks().items()}
+
+
+def suggest_next_steps_batch(
+    users: Sequence[UserProfile],
+    githubs: Optional[Sequence[Optional[GitHubUserExtract]]] = None,
+    linkedins: Optional[Sequence[Optional[LinkedInProfileExtract]]] = None,
+) -> List[List[CareerActionRecommendation]]:
+    """suggest_next_steps for a whole cohort (lists aligned by index)."""
+    return CohortFrame(users, githubs, linkedins).recommendations()
+
+
+# --- Synthetic cohorts (benchmarks/bench_cohort_recs.py, tests) ---
+
+SYNTHETIC_SKILLS = ["Python", "ML", "Machine Learning", "genai", "Kubernetes", "SQL", "ETL", "Docker", "Rust", "infosec", "React"]
+
+
+def synthetic_cohort(
+    users: int, repos: int = 10, seed: int = 7
+) -> List[Tuple[UserProfile, Optional[GitHubUserExtract], Optional[LinkedInProfileExtract]]]:
+    """Reproducible (profile, GitHub, LinkedIn) triples with mixed skills, repos and activity.
+
+    A quarter of the profiles are registration-shaped (plain-string entries); up to
+    `repos` repositories per user, some without a last_updated.
+    """
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    rows = []
+    for i in range(users):
+        skills = rng.sample(SYNTHETIC_SKILLS, rng.randint(0, 5))
+        projects = [f"p{j}" for j in range(rng.choice([0, 0, 1, 3]))]
+        certified = rng.random() < 0.3
+        if i % 4 == 0:
+            # Stored the way /registration writes it: plain strings, expanded by UserProfile validation
+            user = UserProfile.model_validate({
+                "id": i, "email": f"user{i}@example.com", "name": f"User {i}",
+                "skills": skills, "projects": projects, "certifications": ["AWS"] if certified else None,
+            })
+        else:
+            user = UserProfile(
+                id=i,
+                email=f"user{i}@example.com",
+                name=f"User {i}",
+                skills=[Skills(skill_name=s, skill_strength="Medium") for s in skills],
+                projects=[Projects(name=p, description="") for p in projects],
+                certifications=[Certifications(title="AWS", issuer="AWS", issued_date="2024")] if certified else None,
+            )
+        github = None
+        if rng.random() < 0.8:
+            github = GitHubUserExtract(
+                username=f"user{i}",
+                repositories=[
+                    GitHubRepoExtract(
+                        name=f"repo-{j}",
+                        url=f"https://github.com/user{i}/repo-{j}",
+                        last_updated=start + timedelta(days=rng.randint(0, 300)) if rng.random() < 0.9 else None,
+                    )
+                    for j in range(rng.randint(0, repos))
+                ],
+                meta=ExtractionMeta(source=DataSource.github),
+            )
+        linkedin = None
+        if rng.random() < 0.7:
+            linkedin = LinkedInProfileExtract(
+                username=f"user{i}",
+                post_count=rng.choice([0, 0, 3, 12]),
+                connections=rng.randint(0, 600),
+                meta=ExtractionMeta(source=DataSource.linkedin),
+            )
+        rows.append((user, github, linkedin))
+    return rows
@@ -0,0 +1,286 @@
+"""Streaming ingestion of scraper dumps: JSONL extract records -> aligned profiles.
+
+Each line of a dump (.jsonl / .ndjson, optionally gzip) is one extract for one user:
+
+    {"user_id": 42, "source": "github", "extract": {...GitHubUserExtract...}}
+    {"email": "a@example.com", "source": "huggingface", "extract": [{...HuggingFaceModelExtract...}]}
+
+The pipeline is a chain of generators, so only one chunk of records and one
+batch of users are held at a time, whatever the dump size:
+
+    read_lines       raw lines from files (gzip detected by magic bytes) or stdin
+    validate_chunks  JSON decode, then one pydantic call per source per chunk
+    group_by_user    consecutive records of one user merged into an ExtractGroup
+    ExtractStreamIngestor.run
+                     per batch of users: one SELECT for their profiles,
+                     align_extractions_with_profile per user, one transaction
+                     for profile_data and the side tables
+
+Dumps are expected to be clustered by user (scrapers write a user's sources
+together). A user who shows up again later is aligned again on top of the
+earlier result, so an unsorted dump is still correct, just slower.
+
+Usage: python extract_stream.py DUMP [DUMP ...] [--chunk-size 1000] [--batch-users 500] [--dry-run]
+"""
+import argparse
+import gzip
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import bindparam, select, update
+
+from log_queue import get_logger
+from profile_cache import profile_cache
+from profile_codec import loads_json
+from profile_index import ensure_skill_index_current, notify_profiles_saved, side_table_writes
+from schemas import DataSource, GitHubUserExtract, HuggingFaceModelExtract, LinkedInProfileExtract, UserProfile
+from table import UserDB, engine
+from trend_scrapping_node import align_extractions_with_profile
+
+logger = get_logger("extract_stream")
+
+STREAM_CHUNK_SIZE = int(os.getenv("LAKSHSETU_STREAM_CHUNK_SIZE", "1000"))  # records per validation call
+STREAM_BATCH_USERS = int(os.getenv("LAKSHSETU_STREAM_BATCH_USERS", "500"))  # users per write transaction
+PROGRESS_SECONDS = 10.0
+
+# Sources align_extractions_with_profile consumes, with the type one record's "extract" holds
+ALIGN_SOURCES: Dict[DataSource, Any] = {
+    DataSource.github: GitHubUserExtract,
+    DataSource.linkedin: LinkedInProfileExtract,
+    DataSource.huggingface: List[HuggingFaceModelExtract],
+}
+_CHUNK_ADAPTERS = {source: TypeAdapter(List[tp]) for source, tp in ALIGN_SOURCES.items()}
+
+# A record's user: the users.id, or the account email when the scraper only knows that
+UserKey = Union[int, str]
+Record = Tuple[UserKey, DataSource, Any]
+
+USERS_TABLE = UserDB.__table__
+_update_profile = (
+    update(USERS_TABLE)
+    .where(USERS_TABLE.c.id == bindparam("b_id"))
+    .values(profile_data=bindparam("b_profile_data"))
+)
+
+
+@dataclass
+class StreamStats:
+    records: int = 0
+    invalid: int = 0
+    skipped: int = 0  # valid envelope, but a source alignment doesn't use
+    users: int = 0
+    unknown_users: int = 0
+    failed: int = 0
+    written: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+@dataclass
+class ExtractGroup:
+    """One user's extracts from a run of consecutive records."""
+
+    key: UserKey
+    github: Optional[GitHubUserExtract] = None
+    linkedin: Optional[LinkedInProfileExtract] = None
+    hf_models: List[HuggingFaceModelExtract] = field(default_factory=list)
+
+    def add(self, source: DataSource, extract: Any) -> None:
+        # A later GitHub/LinkedIn record is a newer fetch and replaces the earlier one
+        if source == DataSource.github:
+            self.github = extract
+        elif source == DataSource.linkedin:
+            self.linkedin = extract
+        else:
+            self.hf_models.extend(extract)
+
+
+# --- Pipeline stages ---
+
+def read_lines(paths: Iterable[str]) -> Iterator[bytes]:
+    """Non-empty lines of each file in turn ("-" is stdin); gzip is detected by its magic bytes."""
+    for path in paths:
+        raw = sys.stdin.buffer if path == "-" else open(path, "rb")
+        try:
+            stream = gzip.GzipFile(fileobj=raw) if raw.peek(2)[:2] == b"\x1f\x8b" else raw
+            for line in stream:
+                line = line.strip()
+                if line:
+                    yield line
+        finally:
+            if raw is not sys.stdin.buffer:
+                raw.close()
+
+
+def _envelope(line: bytes) -> Tuple[UserKey, DataSource, Any]:
+    obj = loads_json(line)
+    key = obj.get("user_id")
+    if key is None:
+        key = obj.get("email")
+    if key is None or "extract" not in obj:
+        raise ValueError("record needs user_id or email, and extract")
+    return key, DataSource(obj["source"]), obj["extract"]
+
+
+def _validate(source: DataSource, raws: List[Any]) -> List[Optional[Any]]:
+    # One call for the whole chunk; on failure drop the offending items and validate the rest once more
+    adapter = _CHUNK_ADAPTERS[source]
+    try:
+        return adapter.validate_python(raws)
+    except ValidationError as e:
+        bad = {err["loc"][0] for err in e.errors() if err["loc"]}
+        good = [i for i in range(len(raws)) if i not in bad]
+        try:
+            valid = iter(adapter.validate_python([raws[i] for i in good]))
+        except ValidationError:
+            return [None] * len(raws)
+        return [None if i in bad else next(valid) for i in range(len(raws))]
+
+
+def validate_chunks(lines: Iterable[bytes], chunk_size: int = STREAM_CHUNK_SIZE, stats: Optional[StreamStats] = None) -> Iterator[List[Record]]:
+    """Decode and validate `chunk_size` lines at a time; yields each chunk's valid records in input order."""
+    stats = stats if stats is not None else StreamStats()
+    lines = iter(lines)
+    while True:
+        chunk = list(islice(lines, chunk_size))
+        if not chunk:
+            return
+        stats.records += len(chunk)
+        slots: List[Optional[Record]] = [None] * len(chunk)
+        by_source: Dict[DataSource, List[Tuple[int, UserKey, Any]]] = {}
+        for i, line in enumerate(chunk):
+            try:
+                key, source, raw = _envelope(line)
+            except (ValueError, TypeError, AttributeError, KeyError) as e:
+                stats.invalid += 1
+                logger.debug("Invalid extract record: %s", e)
+                continue
+            if source not in ALIGN_SOURCES:
+                stats.skipped += 1
+                continue
+            by_source.setdefault(source, []).append((i, key, raw))
+
+        for source, items in by_source.items():
+            for (i, key, _), extract in zip(items, _validate(source, [raw for _, _, raw in items])):
+                if extract is None:
+                    stats.invalid += 1
+                else:
+                    slots[i] = (key, source, extract)
+        yield [record for record in slots if record is not None]
+
+
+def group_by_user(chunks: Iterable[List[Record]]) -> Iterator[ExtractGroup]:
+    """Merge runs of consecutive records for the same user."""
+    group: Optional[ExtractGroup] = None
+    for chunk in chunks:
+        for key, source, extract in chunk:
+            if group is None or key != group.key:
+                if group is not None:
+                    yield group
+                group = ExtractGroup(key)
+            group.add(source, extract)
+    if group is not None:
+        yield group
+
+
+# --- Alignment and writes ---
+
+class ExtractStreamIngestor:
+    def __init__(self, chunk_size: int = STREAM_CHUNK_SIZE, batch_users: int = STREAM_BATCH_USERS, dry_run: bool = False):
+        self.chunk_size = chunk_size
+        self.batch_users = batch_users
+        self.dry_run = dry_run
+
+    def _load(self, keys: List[UserKey]) -> Dict[UserKey, Tuple[int, Dict[str, Any]]]:
+        ids = [k for k in keys if isinstance(k, int)]
+        emails = [k for k in keys if isinstance(k, str)]
+        cols = (USERS_TABLE.c.id, USERS_TABLE.c.email, USERS_TABLE.c.profile_data)
+        found: Dict[UserKey, Tuple[int, Dict[str, Any]]] = {}
+        with engine.connect() as conn:
+            if ids:
+                for row in conn.execute(select(*cols).where(USERS_TABLE.c.id.in_(ids))):
+                    found[row.id] = (row.id, row.profile_data or {})
+            if emails:
+                for row in conn.execute(select(*cols).where(USERS_TABLE.c.email.in_(emails))):
+                    found[row.email] = (row.id, row.profile_data or {})
+        return found
+
+    def _write(self, profiles: Dict[int, Dict[str, Any]]) -> None:
+        # One transaction per batch: profile_data and side tables move together
+        with engine.begin() as conn:
+            conn.execute(_update_profile, [{"b_id": user_id, "b_profile_data": data} for user_id, data in profiles.items()])
+            for stmt, params in side_table_writes(profiles, replace=True):
+                conn.execute(stmt, params)
+        for user_id, data in profiles.items():
+            profile_cache.invalidate(user_id=user_id, email=data.get("email"))
+        notify_profiles_saved(profiles)
+
+    def _process(self, batch: List[ExtractGroup], stats: StreamStats) -> None:
+        loaded = self._load(list({group.key for group in batch}))
+        updated: Dict[int, Dict[str, Any]] = {}
+        for group in batch:
+            hit = loaded.get(group.key)
+            if hit is None:
+                stats.unknown_users += 1
+                continue
+            user_id, profile_data = hit
+            try:
+                # A user seen twice in one batch builds on the first result
+                user = UserProfile.model_validate({**updated.get(user_id, profile_data), "id": user_id})
+                aligned = align_extractions_with_profile(user, github=group.github, linkedin=group.linkedin, hf_models=group.hf_models or None)
+                updated[user_id] = aligned.model_dump(warnings=False)
+            except Exception as e:
+                stats.failed += 1
+                logger.warning("User %s failed: %s: %s", group.key, type(e).__name__, e)
+            stats.users += 1
+        if updated and not self.dry_run:
+            self._write(updated)
+            stats.written += len(updated)
+
+    def run(self, paths: Iterable[str]) -> Dict[str, Any]:
+        """Stream every record of `paths` into the users' profiles. Returns a summary."""
+        stats = StreamStats()
+        groups = group_by_user(validate_chunks(read_lines(paths), self.chunk_size, stats))
+        t0 = last_log = time.perf_counter()
+        while True:
+            batch = list(islice(groups, self.batch_users))
+            if not batch:
+                break
+            self._process(batch, stats)
+            now = time.perf_counter()
+            if now - last_log >= PROGRESS_SECONDS:
+                last_log = now
+                logger.info("Extract stream: %d records, %d users, %.0f records/s", stats.records, stats.users, stats.records / (now - t0))
+
+        elapsed = time.perf_counter() - t0
+        summary = {
+            **stats.as_dict(),
+            "seconds": round(elapsed, 2),
+            "records_per_second": round(stats.records / elapsed, 1) if elapsed else 0.0,
+            "dry_run": self.dry_run,
+        }
+        logger.info("Extract stream finished: %s", summary)
+        return summary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Align users' profiles with a JSONL dump of scraped extracts")
+    parser.add_argument("paths", nargs="+", metavar="DUMP", help=".jsonl/.ndjson file, optionally gzipped; - for stdin")
+    parser.add_argument("--chunk-size", type=int, default=STREAM_CHUNK_SIZE, help="records per validation call")
+    parser.add_argument("--batch-users", type=int, default=STREAM_BATCH_USERS, help="users per write transaction")
+    parser.add_argument("--dry-run", action="store_true", help="validate and align, but write nothing")
+    args = parser.parse_args(argv)
+    if not args.dry_run:
+        ensure_skill_index_current()
+    summary = ExtractStreamIngestor(args.chunk_size, args.batch_users, dry_run=args.dry_run).run(args.paths)
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
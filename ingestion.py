@@ -0,0 +1,466 @@
+"""Concurrent per-source ingestion for agent.user_processing_node.
+
+One fetcher per schemas.DataSource runs concurrently for a user. Each source
+has its own deadline and retries. A source that fails keeps the extract
+cached in the AgentState, and the other sources' results still land.
+
+Fetchers read extract-shaped JSON from an extraction service:
+    GET {LAKSHSETU_INGEST_URL}/{source}/{handle}   (handle URL-escaped; profile URLs reduced to the username)
+    -> GitHubUserExtract / LinkedInProfileExtract / [HuggingFaceModelExtract, ...] / ...
+stub_app() serves synthetic extracts with configurable latency and failure
+rates, so the whole stage can be exercised offline:
+
+    python ingestion.py --users 50 --latency github=0.3 --fail linkedin=0.5
+    python ingestion.py --serve-stub 8100
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+from urllib.parse import quote, urlsplit
+
+import httpx
+from pydantic import TypeAdapter, ValidationError
+
+from log_queue import get_logger
+from metrics import REGISTRY
+from schemas import (
+    ArxivPaperExtract,
+    DataSource,
+    GitHubUserExtract,
+    GoogleScholarPublicationExtract,
+    HuggingFaceModelExtract,
+    LinkedInProfileExtract,
+    MediumArticleExtract,
+    StackOverflowProfileExtract,
+    UserProfile,
+    XPostExtract,
+)
+
+logger = get_logger("ingestion")
+
+INGEST_URL = os.getenv("LAKSHSETU_INGEST_URL", "http://127.0.0.1:8100")
+# Sources fetched by default: the ones the trend/interaction nodes and the trend engine consume
+INGEST_SOURCES = [
+    s.strip()
+    for s in os.getenv("LAKSHSETU_INGEST_SOURCES", "github,linkedin,huggingface,x,arxiv,medium,stack_overflow").split(",")
+    if s.strip()
+]
+# Fresh extracts from these sources are fed to the trend engine (trend_engine.observations)
+TREND_SOURCES = (DataSource.x, DataSource.arxiv, DataSource.medium, DataSource.stack_overflow)
+INGEST_TIMEOUT = float(os.getenv("LAKSHSETU_INGEST_TIMEOUT", "10"))  # seconds per source, retries included
+INGEST_RETRIES = int(os.getenv("LAKSHSETU_INGEST_RETRIES", "2"))
+INGEST_BACKOFF = 0.2  # first retry delay in seconds, doubled per attempt
+
+INGEST_SOURCE_SECONDS = REGISTRY.histogram(
+    "lakshsetu_ingest_source_duration_seconds",
+    "Per-source ingestion time, retries included",
+    ("source", "status"),
+)
+INGEST_ATTEMPTS = REGISTRY.counter(
+    "lakshsetu_ingest_attempts_total",
+    "Fetch attempts per source by result",
+    ("source", "result"),
+)
+
+
+# Leading path segments that come before the username in profile URLs (linkedin.com/in/<name>)
+_PROFILE_PATH_PREFIXES = {"in", "pub", "u", "user", "users"}
+
+
+def account_handle(value: Optional[str]) -> Optional[str]:
+    """Username for a profile field that may hold a handle or a profile URL.
+
+    "octo", "@octo", "https://github.com/octo" and "linkedin.com/in/octo/" all give "octo".
+    """
+    value = (value or "").strip()
+    if "://" not in value and not value.startswith("www.") and "/" not in value:
+        return value.lstrip("@") or None
+    parts = urlsplit(value if "://" in value else f"https://{value}")
+    segments = [s for s in parts.path.split("/") if s]
+    if len(segments) > 1 and segments[0].lower() in _PROFILE_PATH_PREFIXES:
+        segments = segments[1:]
+    if not segments:
+        return None
+    return segments[0].lstrip("@") or None
+
+
+@dataclass(frozen=True)
+class SourceSpec:
+    source: DataSource
+    # Validates the fetched JSON (a model, or List[model] for list-valued sources)
+    adapter: TypeAdapter
+    # Lookup handle for a user; None means the source doesn't apply to this user
+    handle: Callable[[UserProfile], Optional[str]]
+    # AgentState field the extract goes to; other sources land in state["extracts"][source]
+    state_key: Optional[str] = None
+
+
+SOURCE_SPECS: Dict[DataSource, SourceSpec] = {
+    spec.source: spec
+    for spec in [
+        SourceSpec(DataSource.github, TypeAdapter(GitHubUserExtract), lambda u: account_handle(u.github), "github"),
+        SourceSpec(DataSource.linkedin, TypeAdapter(LinkedInProfileExtract), lambda u: account_handle(u.linkedin), "linkedin"),
+        SourceSpec(
+            DataSource.huggingface, TypeAdapter(List[HuggingFaceModelExtract]), lambda u: account_handle(u.huggingface), "hf_models"
+        ),
+        SourceSpec(DataSource.x, TypeAdapter(List[XPostExtract]), lambda u: account_handle(u.x)),
+        # The site URL itself is the handle; fetch() escapes it into one path segment
+        SourceSpec(DataSource.website, TypeAdapter(Dict[str, Any]), lambda u: u.website),
+        # No handle field on UserProfile: looked up by author name / account email
+        SourceSpec(DataSource.google_scholar, TypeAdapter(List[GoogleScholarPublicationExtract]), lambda u: u.name),
+        SourceSpec(DataSource.arxiv, TypeAdapter(List[ArxivPaperExtract]), lambda u: u.name),
+        SourceSpec(DataSource.medium, TypeAdapter(List[MediumArticleExtract]), lambda u: u.email),
+        SourceSpec(DataSource.stack_overflow, TypeAdapter(StackOverflowProfileExtract), lambda u: u.email),
+        SourceSpec(DataSource.kaggle, TypeAdapter(Dict[str, Any]), lambda u: u.email),
+    ]
+}
+
+
+class SourceNotFound(Exception):
+    """The extraction service has nothing for this handle (not retried)."""
+
+
+class HttpSourceFetcher:
+    """Fetches one source's extract from the extraction service."""
+
+    def __init__(self, spec: SourceSpec, base_url: str = INGEST_URL):
+        self.spec = spec
+        self.source = spec.source
+        self.base_url = base_url.rstrip("/")
+
+    async def fetch(self, client: httpx.AsyncClient, handle: str) -> Any:
+        # Names, emails and website URLs become a single escaped path segment
+        resp = await client.get(f"{self.base_url}/{self.source.value}/{quote(handle, safe='')}")
+        if resp.status_code == 404:
+            raise SourceNotFound(f"{self.source.value}/{handle}")
+        resp.raise_for_status()
+        return self.spec.adapter.validate_json(resp.content)
+
+
+T = TypeVar("T")
+
+
+def run_coroutine(factory: Callable[[], Awaitable[T]]) -> T:
+    """Run `factory()` to completion from sync code, inside an event loop or not.
+
+    asyncio.run refuses to start while this thread runs a loop (FastAPI handler,
+    notebook, async scheduler), so there the coroutine gets a private loop on a
+    worker thread and the caller blocks until it finishes. Async callers should
+    await Ingestion.arun instead.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        in_loop = False
+    else:
+        in_loop = True
+    if not in_loop:
+        return asyncio.run(factory())
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingestion-loop") as pool:
+        return pool.submit(lambda: asyncio.run(factory())).result()
+
+
+def _retryable(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500 or exc.response.status_code == 429
+    return isinstance(exc, (httpx.TransportError, asyncio.TimeoutError))
+
+
+@dataclass
+class SourceResult:
+    status: str  # ok | cached (fetch failed, previous extract kept) | failed | skipped
+    seconds: float = 0.0
+    attempts: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class IngestionReport:
+    extracts: Dict[DataSource, Any] = field(default_factory=dict)
+    results: Dict[DataSource, SourceResult] = field(default_factory=dict)
+    seconds: float = 0.0
+
+
+class Ingestion:
+    """Run every source's fetcher for a user concurrently.
+
+    `timeouts` overrides the per-source deadline (seconds, retries included).
+    `transport` is handed to httpx, e.g. httpx.ASGITransport(app=stub_app()).
+    `trends` (a trend_engine.TrendEngine) receives every freshly fetched
+    TREND_SOURCES extract; cached fallbacks are not counted again.
+    """
+
+    def __init__(
+        self,
+        fetchers: List[Any],
+        timeouts: Optional[Dict[DataSource, float]] = None,
+        default_timeout: float = INGEST_TIMEOUT,
+        retries: int = INGEST_RETRIES,
+        backoff: float = INGEST_BACKOFF,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        trends: Optional[Any] = None,
+    ):
+        self.fetchers = fetchers
+        self.timeouts = timeouts or {}
+        self.default_timeout = default_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.transport = transport
+        self.trends = trends
+
+    @classmethod
+    def from_env(cls, base_url: str = INGEST_URL, **kwargs) -> "Ingestion":
+        """Fetchers for INGEST_SOURCES, feeding the process's shared trend engine unless `trends` is given."""
+        sources = [DataSource(name) for name in INGEST_SOURCES]
+        if "trends" not in kwargs and any(s in TREND_SOURCES for s in sources):
+            from trend_engine import shared_engine
+
+            kwargs["trends"] = shared_engine()
+        return cls([HttpSourceFetcher(SOURCE_SPECS[s], base_url) for s in sources], **kwargs)
+
+    async def _fetch_with_retries(self, fetcher, client: httpx.AsyncClient, handle: str, result: SourceResult) -> Any:
+        delay = self.backoff
+        while True:
+            result.attempts += 1
+            try:
+                value = await fetcher.fetch(client, handle)
+                INGEST_ATTEMPTS.inc(fetcher.source.value, "ok")
+                return value
+            except Exception as exc:
+                retry = _retryable(exc) and result.attempts <= self.retries
+                INGEST_ATTEMPTS.inc(fetcher.source.value, "retry" if retry else "error")
+                if not retry:
+                    raise
+                await asyncio.sleep(delay)
+                delay *= 2
+
+    async def _run_source(self, fetcher, client: httpx.AsyncClient, user: UserProfile, cached: Any) -> Tuple[SourceResult, Any]:
+        source = fetcher.source
+        handle = SOURCE_SPECS[source].handle(user) if source in SOURCE_SPECS else user.email
+        result = SourceResult(status="skipped")
+        if not handle:
+            return result, cached
+        t0 = time.perf_counter()
+        value = cached
+        try:
+            value = await asyncio.wait_for(
+                self._fetch_with_retries(fetcher, client, handle, result),
+                timeout=self.timeouts.get(source, self.default_timeout),
+            )
+            result.status = "ok"
+        except (asyncio.TimeoutError, httpx.HTTPError, SourceNotFound, ValidationError) as exc:
+            result.status = "cached" if cached is not None else "failed"
+            result.error = f"{type(exc).__name__}: {exc}" if str(exc) else type(exc).__name__
+            logger.warning("Ingestion from %s failed for %s: %s", source.value, user.email, result.error)
+        result.seconds = time.perf_counter() - t0
+        INGEST_SOURCE_SECONDS.observe(result.seconds, source.value, result.status)
+        return result, value
+
+    async def ingest(self, user: UserProfile, cached: Optional[Dict[DataSource, Any]] = None) -> IngestionReport:
+        """Fetch all sources for `user`; failed sources fall back to `cached` extracts."""
+        cached = cached or {}
+        report = IngestionReport()
+        t0 = time.perf_counter()
+        async with httpx.AsyncClient(transport=self.transport, timeout=self.default_timeout) as client:
+            # return_exceptions: a fetcher bug fails its own source, not the whole user
+            outcomes = await asyncio.gather(
+                *(self._run_source(f, client, user, cached.get(f.source)) for f in self.fetchers),
+                return_exceptions=True,
+            )
+        for fetcher, outcome in zip(self.fetchers, outcomes):
+            if isinstance(outcome, BaseException):
+                value = cached.get(fetcher.source)
+                result = SourceResult(status="cached" if value is not None else "failed", error=f"{type(outcome).__name__}: {outcome}")
+                logger.error("Ingestion from %s crashed for %s", fetcher.source.value, user.email, exc_info=outcome)
+            else:
+                result, value = outcome
+            report.results[fetcher.source] = result
+            if value is not None:
+                report.extracts[fetcher.source] = value
+        report.seconds = time.perf_counter() - t0
+        return report
+
+    def _cached(self, state: Dict[str, Any]) -> Dict[DataSource, Any]:
+        extras = state.get("extracts") or {}
+        cached: Dict[DataSource, Any] = {}
+        for fetcher in self.fetchers:
+            spec = SOURCE_SPECS.get(fetcher.source)
+            key = spec.state_key if spec else None
+            cached[fetcher.source] = state.get(key) if key else extras.get(fetcher.source.value)
+        return cached
+
+    def run(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Ingest into an AgentState (sync; called from agent.user_processing_node)."""
+        cached = self._cached(state)
+        report = run_coroutine(lambda: self.ingest(state["user"], cached))
+        return self._apply(state, report)
+
+    async def arun(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Async run(), for callers already on an event loop."""
+        report = await self.ingest(state["user"], self._cached(state))
+        return self._apply(state, report)
+
+    def _apply(self, state: Dict[str, Any], report: IngestionReport) -> Dict[str, Any]:
+        extras = dict(state.get("extracts") or {})
+        for source, value in report.extracts.items():
+            spec = SOURCE_SPECS.get(source)
+            if spec and spec.state_key:
+                state[spec.state_key] = value
+            else:
+                extras[source.value] = value
+        state["extracts"] = extras
+        state["ingestion"] = {
+            source.value: {"status": r.status, "seconds": round(r.seconds, 4), "attempts": r.attempts, "error": r.error}
+            for source, r in report.results.items()
+        }
+        if self.trends is not None:
+            self._feed_trends(report)
+        return state
+
+    def _feed_trends(self, report: IngestionReport) -> None:
+        fresh: List[Any] = []
+        for source in TREND_SOURCES:
+            result = report.results.get(source)
+            value = report.extracts.get(source)
+            if result is None or result.status != "ok" or value is None:
+                continue
+            fresh.extend(value if isinstance(value, list) else [value])
+        if fresh:
+            self.trends.ingest(fresh)
+
+
+# --- Stub extraction service (offline testing) ---
+
+def _stub_payload(source: DataSource, handle: str) -> Any:
+    meta = {"source": source.value}
+    if source == DataSource.github:
+        languages = ["Python", "TypeScript", "Go", "Rust"]
+        return {
+            "username": handle,
+            "public_repos": 3,
+            "repositories": [
+                {
+                    "name": f"{handle}-repo-{i}",
+                    "description": f"Demo repository {i}",
+                    "url": f"https://github.com/{handle}/{handle}-repo-{i}",
+                    "primary_language": languages[i % len(languages)],
+                    "metrics": {"stars": 10 * i, "forks": i},
+                }
+                for i in range(3)
+            ],
+            "meta": meta,
+        }
+    if source == DataSource.linkedin:
+        return {
+            "username": handle,
+            "headline": "Software Engineer",
+            "skills": ["Python", "SQL", "Docker"],
+            "certifications": ["AWS Certified Cloud Practitioner"],
+            "meta": meta,
+        }
+    if source == DataSource.huggingface:
+        return [{"model_id": f"{handle}/demo-model", "task": "text-classification", "tags": ["pytorch"], "meta": meta}]
+    if source == DataSource.stack_overflow:
+        return {"display_name": handle, "reputation": 120, "top_tags": ["python"], "meta": meta}
+    if source in (DataSource.google_scholar, DataSource.arxiv):
+        return [{"title": f"A paper by {handle}", "authors": [handle], "categories": ["cs.LG"], "meta": meta}]
+    if source == DataSource.medium:
+        return [{"title": "Notes on FastAPI", "url": "https://medium.com/@demo/notes", "tags": ["fastapi"], "meta": meta}]
+    if source == DataSource.x:
+        return [{"content": "Shipped a new release today #Python", "meta": meta}]
+    return {"handle": handle, "source": source.value}
+
+
+def stub_app(latency: Optional[Dict[str, float]] = None, fail_rate: Optional[Dict[str, float]] = None, seed: int = 0):
+    """FastAPI app serving synthetic extracts at /{source}/{handle}.
+
+    `latency` adds a delay per source (seconds); `fail_rate` makes that fraction
+    of requests answer 503, which the ingestion stage retries.
+    """
+    from fastapi import FastAPI, HTTPException
+
+    latency = latency or {}
+    fail_rate = fail_rate or {}
+    rng = random.Random(seed)
+    app = FastAPI(title="LakshSetu stub extraction service")
+
+    # :path so an escaped "/" in a website handle still matches after the server decodes it
+    @app.get("/{source}/{handle:path}")
+    async def extract(source: DataSource, handle: str):
+        await asyncio.sleep(latency.get(source.value, 0.0))
+        if rng.random() < fail_rate.get(source.value, 0.0):
+            raise HTTPException(status_code=503, detail="stub failure")
+        return _stub_payload(source, handle)
+
+    return app
+
+
+def _parse_per_source(values: List[str]) -> Dict[str, float]:
+    parsed = {}
+    for item in values:
+        name, _, value = item.partition("=")
+        parsed[DataSource(name).value] = float(value)
+    return parsed
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))] if ordered else 0.0
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the ingestion stage against the stub extraction service")
+    parser.add_argument("--serve-stub", type=int, metavar="PORT", help="serve the stub over HTTP instead")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--sources", default=",".join(INGEST_SOURCES))
+    parser.add_argument("--latency", nargs="*", default=[], help="per-source delay, e.g. github=0.3")
+    parser.add_argument("--fail", nargs="*", default=[], help="per-source 503 rate, e.g. linkedin=0.5")
+    parser.add_argument("--timeout", type=float, default=INGEST_TIMEOUT)
+    parser.add_argument("--retries", type=int, default=INGEST_RETRIES)
+    args = parser.parse_args(argv)
+
+    app = stub_app(_parse_per_source(args.latency), _parse_per_source(args.fail))
+    if args.serve_stub:
+        import uvicorn
+
+        uvicorn.run(app, host="127.0.0.1", port=args.serve_stub, log_level="warning")
+        return
+
+    sources = [DataSource(s.strip()) for s in args.sources.split(",") if s.strip()]
+    ingestion = Ingestion(
+        [HttpSourceFetcher(SOURCE_SPECS[s], "http://stub") for s in sources],
+        default_timeout=args.timeout,
+        retries=args.retries,
+        transport=httpx.ASGITransport(app=app),
+    )
+    users = [
+        UserProfile(id=i, email=f"user{i}@example.com", name=f"User {i}", github=f"user{i}", linkedin=f"user{i}", huggingface=f"user{i}", x=f"user{i}")
+        for i in range(1, args.users + 1)
+    ]
+
+    async def run_all() -> List[IngestionReport]:
+        return await asyncio.gather(*(ingestion.ingest(u) for u in users))
+
+    t0 = time.perf_counter()
+    reports = run_coroutine(run_all)
+    elapsed = time.perf_counter() - t0
+
+    print(f"users={len(users)} wall={elapsed:.2f}s user cycle p50={_percentile([r.seconds for r in reports], 50) * 1000:.0f}ms")
+    print(f"{'source':<16}{'ok':>5}{'cached':>8}{'failed':>8}{'skipped':>9}{'p50 ms':>9}{'p95 ms':>9}{'attempts':>10}")
+    for source in sources:
+        results = [r.results[source] for r in reports]
+        counts = {status: sum(1 for r in results if r.status == status) for status in ("ok", "cached", "failed", "skipped")}
+        secs = [r.seconds for r in results if r.status != "skipped"]
+        print(
+            f"{source.value:<16}{counts['ok']:>5}{counts['cached']:>8}{counts['failed']:>8}{counts['skipped']:>9}"
+            f"{_percentile(secs, 50) * 1000:>9.0f}{_percentile(secs, 95) * 1000:>9.0f}{sum(r.attempts for r in results):>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
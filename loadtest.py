@@ -0,0 +1,346 @@
+"""Repeatable HTTP load test for server.app.
+
+Drives the API either in-process (ASGI transport, no sockets) or against a
+local uvicorn it starts itself, always on a throwaway SQLite file, so it runs
+fully offline. Prints (or writes) a JSON report with throughput, p50/p95/p99
+latency and error rates per scenario, suitable for tracking over time.
+
+Scenarios (weights set with --mix):
+  root       GET /                                      expects 200
+  register   POST /registration, new synthetic profile  expects 200
+  duplicate  POST /registration, already-used email     expects 400
+  invalid    POST /registration, malformed payload      expects 422
+
+Usage:
+  python loadtest.py --requests 5000 --concurrency 64
+  python loadtest.py --uvicorn --workers 4 --duration 30 --mix root=1,register=5,duplicate=3,invalid=1 --output report.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+REPO_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_MIX = {"root": 1, "register": 6, "duplicate": 2, "invalid": 1}
+EXPECTED_STATUS = {"root": 200, "register": 200, "duplicate": 400, "invalid": 422}
+
+SKILL_POOL = [
+    "Python", "SQL", "Machine Learning", "Deep Learning", "FastAPI", "Docker", "Kubernetes",
+    "React", "TypeScript", "Data Engineering", "MLOps", "Generative AI", "Go", "Rust", "AWS",
+]
+CITY_POOL = ["Bengaluru", "Pune", "Hyderabad", "Chennai", "Delhi", "Mumbai", "Kolkata"]
+
+
+# --- Synthetic payloads ---
+
+def synthetic_profile(rng: random.Random, index: int, max_skills: int = 8, max_projects: int = 5) -> Dict[str, Any]:
+    """A valid UserProfile payload with a unique email."""
+    return {
+        "email": f"load-{index}-{rng.getrandbits(32):08x}@example.com",
+        "name": f"Load User {index}",
+        "age": rng.randint(18, 40),
+        "location": rng.choice(CITY_POOL),
+        "github": f"load-user-{index}",
+        "skills": rng.sample(SKILL_POOL, rng.randint(0, max_skills)),
+        "projects": [f"Project {index}-{p}" for p in range(rng.randint(0, max_projects))],
+        "certifications": [f"Certification {c}" for c in range(rng.randint(0, 2))],
+    }
+
+
+def invalid_profile(rng: random.Random, index: int) -> Dict[str, Any]:
+    """A payload /registration must reject with 422."""
+    broken = [
+        {"name": f"No Email {index}"},                                   # missing required field
+        {"email": f"bad-age-{index}@example.com", "name": "x", "age": -3},  # ge=0 violated
+        {"email": f"bad-skills-{index}@example.com", "name": "x", "skills": "not-a-list"},
+    ]
+    return rng.choice(broken)
+
+
+# --- Targets ---
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _use_temp_database() -> str:
+    db_path = os.path.join(tempfile.mkdtemp(prefix="lakshsetu-loadtest-"), "loadtest.db")
+    os.environ["LAKSHSETU_DB_PATH"] = db_path
+    # Keep server.py's per-request log lines out of the report
+    os.environ.setdefault("LAKSHSETU_LOG_LEVEL", "WARNING")
+    return db_path
+
+
+def in_process_client() -> Tuple[httpx.AsyncClient, Callable[[], Any]]:
+    """AsyncClient bound to server.app over ASGI. Must run before anything imports table.py."""
+    if "table" in sys.modules:
+        raise RuntimeError("table.py was already imported; the in-process target needs LAKSHSETU_DB_PATH set first")
+    _use_temp_database()
+    sys.path.insert(0, REPO_ROOT)
+    import server
+    from table import async_engine
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://loadtest", timeout=60)
+
+    async def close() -> None:
+        await client.aclose()
+        await server.registration_writer.stop()
+        await async_engine.dispose()
+
+    return client, close
+
+
+def start_uvicorn(workers: int) -> Tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = dict(os.environ, LAKSHSETU_DB_PATH=_use_temp_database())
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=REPO_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(base_url + "/").status_code == 200:
+                return proc, base_url
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("uvicorn did not come up within 30s")
+
+
+# --- Load generation ---
+
+def parse_mix(spec: Optional[str]) -> Dict[str, float]:
+    if not spec:
+        return dict(DEFAULT_MIX)
+    mix: Dict[str, float] = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in EXPECTED_STATUS:
+            raise ValueError(f"Unknown scenario {name!r}; expected one of {sorted(EXPECTED_STATUS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+class LoadTest:
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        concurrency: int = 32,
+        requests: Optional[int] = 2000,
+        duration: Optional[float] = None,
+        mix: Optional[Dict[str, float]] = None,
+        seed_users: int = 100,
+        seed: int = 7,
+    ):
+        self.client = client
+        self.concurrency = concurrency
+        self.requests = requests
+        self.duration = duration
+        self.mix = mix or dict(DEFAULT_MIX)
+        self.seed_users = seed_users
+        self.rng = random.Random(seed)
+        self._next_index = 0
+        self._known_emails: List[str] = []
+        self.latencies: Dict[str, List[float]] = {name: [] for name in self.mix}
+        self.errors: Dict[str, int] = {name: 0 for name in self.mix}
+        self.status_codes: Dict[str, Dict[str, int]] = {name: {} for name in self.mix}
+
+    def _index(self) -> int:
+        self._next_index += 1
+        return self._next_index
+
+    async def seed(self) -> None:
+        """Register `seed_users` profiles up front so `duplicate` has emails to reuse."""
+        if not self.seed_users:
+            return
+        profiles = [synthetic_profile(self.rng, self._index()) for _ in range(self.seed_users)]
+        body = "\n".join(json.dumps(p) for p in profiles)
+        resp = await self.client.post("/registration/batch", content=body, headers={"content-type": "application/x-ndjson"})
+        resp.raise_for_status()
+        self._known_emails.extend(p["email"] for p in profiles)
+
+    async def _one(self, scenario: str) -> None:
+        if scenario == "root":
+            request = self.client.get("/")
+        elif scenario == "register":
+            payload = synthetic_profile(self.rng, self._index())
+            request = self.client.post("/registration", json=payload)
+        elif scenario == "duplicate":
+            email = self.rng.choice(self._known_emails) if self._known_emails else "missing@example.com"
+            request = self.client.post("/registration", json={"email": email, "name": "Duplicate"})
+        else:
+            request = self.client.post("/registration", json=invalid_profile(self.rng, self._index()))
+
+        t0 = time.perf_counter()
+        try:
+            resp = await request
+            status = str(resp.status_code)
+            ok = resp.status_code == EXPECTED_STATUS[scenario]
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+            ok = False
+        self.latencies[scenario].append(time.perf_counter() - t0)
+        codes = self.status_codes[scenario]
+        codes[status] = codes.get(status, 0) + 1
+        if not ok:
+            self.errors[scenario] += 1
+        if scenario == "register" and ok:
+            self._known_emails.append(payload["email"])
+
+    async def run(self) -> Dict[str, Any]:
+        await self.seed()
+        names = list(self.mix)
+        weights = [self.mix[n] for n in names]
+        issued = 0
+        stop_at = time.perf_counter() + self.duration if self.duration else None
+
+        def next_scenario() -> Optional[str]:
+            nonlocal issued
+            if stop_at is not None:
+                if time.perf_counter() >= stop_at:
+                    return None
+            elif issued >= self.requests:
+                return None
+            issued += 1
+            return self.rng.choices(names, weights)[0]
+
+        async def worker() -> None:
+            while True:
+                scenario = next_scenario()
+                if scenario is None:
+                    return
+                await self._one(scenario)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return self.report(time.perf_counter() - t0)
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        scenarios = {}
+        for name, samples in self.latencies.items():
+            scenarios[name] = {
+                "count": len(samples),
+                "errors": self.errors[name],
+                "error_rate": round(self.errors[name] / len(samples), 4) if samples else 0.0,
+                "p50_ms": round(_percentile(samples, 50) * 1000, 3),
+                "p95_ms": round(_percentile(samples, 95) * 1000, 3),
+                "p99_ms": round(_percentile(samples, 99) * 1000, 3),
+                "status_codes": self.status_codes[name],
+            }
+        all_samples = [s for samples in self.latencies.values() for s in samples]
+        total_errors = sum(self.errors.values())
+        return {
+            "config": {
+                "concurrency": self.concurrency,
+                "requests": self.requests if not self.duration else None,
+                "duration_s": self.duration,
+                "mix": self.mix,
+                "seed_users": self.seed_users,
+            },
+            "totals": {
+                "requests": len(all_samples),
+                "elapsed_s": round(elapsed, 3),
+                "throughput_rps": round(len(all_samples) / elapsed, 1) if elapsed else 0.0,
+                "errors": total_errors,
+                "error_rate": round(total_errors / len(all_samples), 4) if all_samples else 0.0,
+                "p50_ms": round(_percentile(all_samples, 50) * 1000, 3),
+                "p95_ms": round(_percentile(all_samples, 95) * 1000, 3),
+                "p99_ms": round(_percentile(all_samples, 99) * 1000, 3),
+            },
+            "scenarios": scenarios,
+        }
+
+
+async def _run(args: argparse.Namespace) -> Dict[str, Any]:
+    proc = None
+    if args.url:
+        client, close = httpx.AsyncClient(base_url=args.url, timeout=60), None
+        target = args.url
+    elif args.uvicorn:
+        proc, base_url = start_uvicorn(args.workers)
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        client, close = httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60), None
+        target = f"uvicorn x{args.workers}"
+    else:
+        client, close = in_process_client()
+        target = "in-process"
+
+    try:
+        test = LoadTest(
+            client,
+            concurrency=args.concurrency,
+            requests=args.requests,
+            duration=args.duration,
+            mix=parse_mix(args.mix),
+            seed_users=args.seed_users,
+            seed=args.seed,
+        )
+        report = await test.run()
+    finally:
+        if close is not None:
+            await close()
+        else:
+            await client.aclose()
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    report["config"]["target"] = target
+    report["generated_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Load test the LakshSetu API (offline, temp SQLite)")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--uvicorn", action="store_true", help="start a local uvicorn instead of running in-process")
+    target.add_argument("--url", help="drive an already running server (its own DB is used)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers (with --uvicorn)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--duration", type=float, help="run for N seconds instead of a fixed request count")
+    parser.add_argument("--mix", help="scenario weights, e.g. root=1,register=6,duplicate=2,invalid=1")
+    parser.add_argument("--seed-users", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write the JSON report here as well as stdout")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(_run(args))
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import atexit
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+# Non-blocking logging: callers only enqueue the record; a single listener thread
+# formats it and writes to stderr, so a slow terminal or pipe never stalls the event loop.
+
+LOG_LEVEL = os.getenv("LAKSHSETU_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+_listener: Optional[QueueListener] = None
+
+
+def start_logging() -> None:
+    """Route the `lakshsetu` logger tree through a queue. Idempotent."""
+    global _listener
+    if _listener is not None:
+        return
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    root = logging.getLogger("lakshsetu")
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(QueueHandler(log_queue))
+    root.propagate = False
+
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    start_logging()
+    return logging.getLogger(f"lakshsetu.{name}")
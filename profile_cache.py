@@ -0,0 +1,275 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Protocol
+
+from schemas import UserProfile
+
+
+# In-process cache sizing; a profile costs roughly its JSON length in the byte budget
+PROFILE_CACHE_TTL_SECONDS = float(os.getenv("LAKSHSETU_PROFILE_CACHE_TTL", "300"))
+PROFILE_CACHE_MAX_ENTRIES = int(os.getenv("LAKSHSETU_PROFILE_CACHE_MAX_ENTRIES", "10000"))
+PROFILE_CACHE_MAX_BYTES = int(os.getenv("LAKSHSETU_PROFILE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Set to share cached profiles between uvicorn workers (e.g. redis://localhost:6379/0)
+PROFILE_CACHE_REDIS_URL = os.getenv("LAKSHSETU_PROFILE_CACHE_REDIS_URL")
+# With a shared backend, how long a worker may serve its local copy before re-checking
+PROFILE_CACHE_LOCAL_TTL_SECONDS = float(os.getenv("LAKSHSETU_PROFILE_CACHE_LOCAL_TTL", "5"))
+
+
+# --- Shared backends (multi-worker deployments) ---
+
+class SharedCacheBackend(Protocol):
+    """Minimal key/value store shared by all workers: bytes in, bytes out, per-key TTL."""
+
+    def get(self, key: str) -> Optional[bytes]: ...
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None: ...
+
+    def delete(self, *keys: str) -> None: ...
+
+
+class InMemorySharedBackend:
+    """Local stand-in for a shared cache (tests, single-process runs)."""
+
+    def __init__(self):
+        self._data: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl_seconds)
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+
+class RedisSharedBackend:
+    """Shared backend on Redis. Calls are short blocking round-trips with tight socket timeouts."""
+
+    def __init__(self, url: str, timeout_seconds: float = 0.05):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError(
+                "redis is required for the shared profile cache. Install with: pip install redis"
+            ) from e
+        self._client = redis.Redis.from_url(url, socket_timeout=timeout_seconds, socket_connect_timeout=timeout_seconds)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        self._client.set(key, value, px=max(1, int(ttl_seconds * 1000)))
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self._client.delete(*keys)
+
+
+# --- Profile cache ---
+
+class _Entry:
+    __slots__ = ("profile", "email", "size", "expires_at")
+
+    def __init__(self, profile: UserProfile, email: str, size: int, expires_at: float):
+        self.profile = profile
+        self.email = email
+        self.size = size
+        self.expires_at = expires_at
+
+
+class ProfileCache:
+    """LRU + TTL cache of validated UserProfile objects, keyed by user id and email.
+
+    Bounded by both entry count and an approximate byte budget. Callers do the
+    read-through (generation -> get -> load from `users` -> put) and call
+    `invalidate()` after every write. Passing the generation taken before the DB
+    read to `put()` drops the put if a write was invalidated in between, so a row
+    read just before a commit is never cached for the full TTL. With a `shared` backend, misses fall through to it before the DB
+    and local copies are kept only for `local_ttl_seconds`, which bounds how long
+    another worker's write can go unseen. Cached profiles are shared objects:
+    treat them as read-only.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = PROFILE_CACHE_TTL_SECONDS,
+        max_entries: int = PROFILE_CACHE_MAX_ENTRIES,
+        max_bytes: int = PROFILE_CACHE_MAX_BYTES,
+        shared: Optional[SharedCacheBackend] = None,
+        local_ttl_seconds: float = PROFILE_CACHE_LOCAL_TTL_SECONDS,
+    ):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self.local_ttl = min(ttl_seconds, local_ttl_seconds) if shared is not None else ttl_seconds
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._by_email: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._generation = 0  # bumped by every invalidate()/clear()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_puts = 0
+
+    # Lookups
+
+    def generation(self) -> int:
+        """Token for put(): take it before reading the DB."""
+        with self._lock:
+            return self._generation
+
+    def get_by_id(self, user_id: int) -> Optional[UserProfile]:
+        with self._lock:
+            profile = self._get_local(user_id)
+        if profile is None:
+            profile = self._get_shared(f"profile:id:{user_id}")
+        return profile
+
+    def get_by_email(self, email: str) -> Optional[UserProfile]:
+        with self._lock:
+            user_id = self._by_email.get(email)
+            profile = self._get_local(user_id) if user_id is not None else None
+            if user_id is None:
+                self.misses += 1
+        if profile is None and self.shared is not None:
+            raw_id = self.shared.get(f"profile:email:{email}")
+            if raw_id is not None:
+                profile = self._get_shared(f"profile:id:{int(raw_id)}")
+        return profile
+
+    def _get_local(self, user_id: int) -> Optional[UserProfile]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(user_id)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry.profile
+
+    def _get_shared(self, key: str) -> Optional[UserProfile]:
+        if self.shared is None:
+            return None
+        raw = self.shared.get(key)
+        if raw is None:
+            return None
+        profile = UserProfile.model_validate_json(raw)
+        with self._lock:
+            self.shared_hits += 1
+            self._put_local(profile, len(raw))
+        return profile
+
+    # Writes
+
+    def put(self, profile: UserProfile, generation: Optional[int] = None) -> None:
+        """Cache a freshly loaded profile (must carry its `id`).
+
+        With `generation` (from generation() before the load), the put is skipped
+        if any invalidation happened since, as the loaded row may predate that write.
+        """
+        if profile.id is None:
+            return
+        raw = profile.model_dump_json().encode()
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                self.stale_puts += 1
+                return
+            self._put_local(profile, len(raw))
+        if self.shared is not None:
+            self.shared.set(f"profile:id:{profile.id}", raw, self.ttl)
+            self.shared.set(f"profile:email:{profile.email}", str(profile.id).encode(), self.ttl)
+
+    def _put_local(self, profile: UserProfile, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        if profile.id in self._entries:
+            self._remove(profile.id)
+        self._entries[profile.id] = _Entry(profile, profile.email, size, time.monotonic() + self.local_ttl)
+        self._by_email[profile.email] = profile.id
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, user_id: Optional[int] = None, email: Optional[str] = None) -> None:
+        """Drop a user from the cache (local and shared) by id and/or email."""
+        with self._lock:
+            if user_id is None and email is not None:
+                user_id = self._by_email.get(email)
+            if user_id is not None and user_id in self._entries:
+                email = email or self._entries[user_id].email
+                self._remove(user_id)
+            elif email is not None:
+                self._by_email.pop(email, None)
+            self._generation += 1
+            self.invalidations += 1
+        if self.shared is not None:
+            if user_id is None and email is not None:
+                raw_id = self.shared.get(f"profile:email:{email}")
+                user_id = int(raw_id) if raw_id is not None else None
+            keys = []
+            if user_id is not None:
+                keys.append(f"profile:id:{user_id}")
+            if email is not None:
+                keys.append(f"profile:email:{email}")
+            self.shared.delete(*keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_email.clear()
+            self._bytes = 0
+            self._generation += 1
+
+    def _remove(self, user_id: int) -> None:
+        entry = self._entries.pop(user_id)
+        if self._by_email.get(entry.email) == user_id:
+            del self._by_email[entry.email]
+        self._bytes -= entry.size
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "stale_puts": self.stale_puts,
+            }
+
+
+def _default_shared_backend() -> Optional[SharedCacheBackend]:
+    return RedisSharedBackend(PROFILE_CACHE_REDIS_URL) if PROFILE_CACHE_REDIS_URL else None
+
+
+# Process-wide cache used by server.py handlers and profile_index.save_user_profile
+profile_cache = ProfileCache(shared=_default_shared_backend())
@@ -0,0 +1,137 @@
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional, Union
+
+from sqlalchemy.types import Text, TypeDecorator
+
+try:
+    import orjson
+except ImportError:  # stdlib json fallback
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # only needed for LAKSHSETU_PROFILE_CODEC=msgpack
+    msgpack = None
+
+
+# --- Codecs for users.profile_data ---
+#
+# Stored formats:
+#   JSON text (no header)      - what the SQLAlchemy JSON column always wrote; SQLite's
+#                                json_extract() still works on it (GET /users projection)
+#   BINARY_MAGIC, codec id, .. - versioned binary payloads (msgpack)
+# BINARY_MAGIC is 0xC1, a byte msgpack never emits and that can't start JSON/UTF-8 text,
+# so every stored value identifies its own codec and rows written under an older
+# setting keep decoding after LAKSHSETU_PROFILE_CODEC changes.
+
+BINARY_MAGIC = 0xC1
+
+
+def dumps_json(obj: Any) -> bytes:
+    """Fast JSON encode (orjson when installed) to UTF-8 bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":"), default=str).encode()
+
+
+def loads_json(data: Union[bytes, str]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class ProfileCodec(ABC):
+    """A profile_data storage format; subclasses must implement encode and decode."""
+
+    name = ""
+    binary = False
+    codec_id = 0
+
+    @abstractmethod
+    def encode(self, obj: Dict[str, Any]) -> Union[str, bytes]: ...
+
+    @abstractmethod
+    def decode(self, payload: bytes) -> Dict[str, Any]: ...
+
+
+class JsonProfileCodec(ProfileCodec):
+    """Plain JSON text, encoded with orjson when available."""
+
+    name = "json"
+
+    def encode(self, obj: Dict[str, Any]) -> str:
+        return dumps_json(obj).decode()
+
+    def decode(self, payload: Union[bytes, str]) -> Dict[str, Any]:
+        return loads_json(payload)
+
+
+class MsgpackProfileCodec(ProfileCodec):
+    """Compact binary msgpack, prefixed with the version header."""
+
+    name = "msgpack"
+    binary = True
+    codec_id = 1
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("msgpack is required for LAKSHSETU_PROFILE_CODEC=msgpack. Install with: pip install msgpack")
+
+    def encode(self, obj: Dict[str, Any]) -> bytes:
+        return bytes((BINARY_MAGIC, self.codec_id)) + msgpack.packb(obj, use_bin_type=True, default=str)
+
+    def decode(self, payload: bytes) -> Dict[str, Any]:
+        return msgpack.unpackb(payload[2:], raw=False)
+
+
+PROFILE_CODECS: Dict[str, Callable[[], ProfileCodec]] = {
+    JsonProfileCodec.name: JsonProfileCodec,
+    MsgpackProfileCodec.name: MsgpackProfileCodec,
+}
+_BINARY_CODECS: Dict[int, Callable[[], ProfileCodec]] = {MsgpackProfileCodec.codec_id: MsgpackProfileCodec}
+
+
+def get_codec(name: str) -> ProfileCodec:
+    if name not in PROFILE_CODECS:
+        raise ValueError(f"Unknown profile codec {name!r}; expected one of {sorted(PROFILE_CODECS)}")
+    return PROFILE_CODECS[name]()
+
+
+_json_codec = JsonProfileCodec()
+_binary_codec_instances: Dict[int, ProfileCodec] = {}
+
+
+def decode_profile(payload: Optional[Union[bytes, str]]) -> Optional[Dict[str, Any]]:
+    """Decode a stored profile_data value whatever codec wrote it."""
+    if payload is None:
+        return None
+    if isinstance(payload, (bytes, memoryview)) and len(payload) > 1 and payload[0] == BINARY_MAGIC:
+        payload = bytes(payload)
+        codec_id = payload[1]
+        if codec_id not in _binary_codec_instances:
+            if codec_id not in _BINARY_CODECS:
+                raise ValueError(f"profile_data written by unknown codec id {codec_id}")
+            _binary_codec_instances[codec_id] = _BINARY_CODECS[codec_id]()
+        return _binary_codec_instances[codec_id].decode(payload)
+    return _json_codec.decode(payload)
+
+
+# Codec used for new writes
+PROFILE_CODEC = get_codec(os.getenv("LAKSHSETU_PROFILE_CODEC", "json"))
+
+
+class ProfileData(TypeDecorator):
+    """Column type for users.profile_data: encodes with PROFILE_CODEC, decodes any stored format."""
+
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return PROFILE_CODEC.encode(value)
+
+    def process_result_value(self, value, dialect):
+        return decode_profile(value)
@@ -0,0 +1,275 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import Table, delete, exists, func, insert, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from log_queue import get_logger
+from profile_cache import profile_cache
+from schemas import UserProfile
+from skill_vocab import VOCABULARY, skill_key
+from table import IndexMetaDB, SessionLocal, UserCertificationDB, UserDB, UserProjectDB, UserSkillDB
+
+logger = get_logger("profile_index")
+
+
+# --- Side-table maintenance ---
+#
+# `users.profile_data` stays the source of truth; user_skill / user_project /
+# user_certification are derived from it on every write, in the same transaction.
+
+SKILL_TABLE: Table = UserSkillDB.__table__
+PROJECT_TABLE: Table = UserProjectDB.__table__
+CERTIFICATION_TABLE: Table = UserCertificationDB.__table__
+SIDE_TABLES = (SKILL_TABLE, PROJECT_TABLE, CERTIFICATION_TABLE)
+
+
+def normalize_key(value: Any) -> str:
+    """Lookup key for projects/certifications: trimmed, single-spaced, lowercase (skills use skill_vocab.skill_key)."""
+    return " ".join(str(value).split()).lower()
+
+
+def _field(entry: Any, name: str) -> Optional[str]:
+    # Profile lists hold plain strings from registration, or dumped Skills/Projects/
+    # Certifications dicts once a profile has been through alignment.
+    if isinstance(entry, str):
+        return entry if name in ("skill_name", "name", "title") else None
+    if isinstance(entry, dict):
+        return entry.get(name)
+    return getattr(entry, name, None)
+
+
+def profile_side_rows(user_id: int, profile_data: Dict[str, Any]) -> Dict[Table, List[Dict[str, Any]]]:
+    """Derive the skill/project/certification rows for one user's profile_data."""
+    rows: Dict[Table, List[Dict[str, Any]]] = {table: [] for table in SIDE_TABLES}
+
+    seen = set()
+    for entry in profile_data.get("skills") or []:
+        name = _field(entry, "skill_name")
+        key = skill_key(name) if name else ""
+        if key and key not in seen:
+            seen.add(key)
+            rows[SKILL_TABLE].append({"user_id": user_id, "skill": key, "skill_name": name})
+
+    seen = set()
+    for entry in profile_data.get("projects") or []:
+        name = _field(entry, "name")
+        key = normalize_key(name) if name else ""
+        if key and key not in seen:
+            seen.add(key)
+            rows[PROJECT_TABLE].append({"user_id": user_id, "project": key, "name": name, "link": _field(entry, "link")})
+
+    seen = set()
+    for entry in profile_data.get("certifications") or []:
+        title = _field(entry, "title")
+        key = normalize_key(title) if title else ""
+        if key and key not in seen:
+            seen.add(key)
+            rows[CERTIFICATION_TABLE].append(
+                {"user_id": user_id, "certification": key, "title": title, "issuer": _field(entry, "issuer")}
+            )
+
+    return rows
+
+
+def side_table_writes(profiles: Dict[int, Dict[str, Any]], replace: bool = False) -> List[Tuple[Any, Any]]:
+    """Statements that write the side-table rows for `profiles` ({user_id: profile_data}).
+
+    Returns (statement, params) pairs so sync and async callers can execute them on
+    whatever connection/session holds their transaction. With `replace=True` the
+    users' existing rows are deleted first (profile updates).
+    """
+    writes: List[Tuple[Any, Any]] = []
+    if replace and profiles:
+        user_ids = list(profiles)
+        for table in SIDE_TABLES:
+            writes.append((delete(table).where(table.c.user_id.in_(user_ids)), None))
+
+    batched: Dict[Table, List[Dict[str, Any]]] = {table: [] for table in SIDE_TABLES}
+    for user_id, profile_data in profiles.items():
+        for table, rows in profile_side_rows(user_id, profile_data or {}).items():
+            batched[table].extend(rows)
+    for table, rows in batched.items():
+        if rows:
+            writes.append((insert(table), rows))
+    return writes
+
+
+# --- Save hooks ---
+#
+# In-memory indexes derived from profile_data (skill_matrix.SkillBitMatrix) register a
+# callable here. Every writer calls notify_profiles_saved({user_id: profile_data})
+# after its transaction commits, next to the profile_cache invalidation.
+
+PROFILE_SAVE_HOOKS: List[Callable[[Dict[int, Dict[str, Any]]], None]] = []
+
+
+def notify_profiles_saved(profiles: Dict[int, Dict[str, Any]]) -> None:
+    """Run the save hooks for committed profiles; a failing hook never fails the write."""
+    if not profiles:
+        return
+    for hook in PROFILE_SAVE_HOOKS:
+        try:
+            hook(profiles)
+        except Exception:
+            logger.exception("Profile save hook %r failed", hook)
+
+
+def save_user_profile(user: UserProfile, db: Optional[Session] = None) -> int:
+    """Upsert `user` into `users` and rewrite its side-table rows in one transaction.
+
+    Matches an existing row on `user.id`, else on email. Returns the user id.
+    Fits `run_interaction(save_profile=...)` / `agent.SAVE_PROFILE_CB` directly.
+    """
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        profile_data = user.model_dump(warnings=False)
+        db_user = db.get(UserDB, user.id) if user.id is not None else None
+        if db_user is None:
+            db_user = db.query(UserDB).filter(UserDB.email == user.email).first()
+        if db_user is None:
+            db_user = UserDB(id=user.id)
+            db.add(db_user)
+        previous_email = db_user.email
+        db_user.name = user.name
+        db_user.email = user.email
+        db_user.profile_data = profile_data
+        db.flush()
+
+        for stmt, params in side_table_writes({db_user.id: profile_data}, replace=True):
+            db.execute(stmt, params)
+        db.commit()
+        profile_cache.invalidate(user_id=db_user.id, email=user.email)
+        if previous_email and previous_email != user.email:
+            profile_cache.invalidate(email=previous_email)
+        notify_profiles_saved({db_user.id: profile_data})
+        return db_user.id
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if own_session:
+            db.close()
+
+
+def rebuild_profile_index(db: Session, chunk_size: int = 500) -> int:
+    """Backfill/repair the side tables from profile_data for every user. Returns users processed."""
+    processed = 0
+    last_id = 0
+    while True:
+        chunk = db.execute(
+            select(UserDB.id, UserDB.profile_data).where(UserDB.id > last_id).order_by(UserDB.id).limit(chunk_size)
+        ).all()
+        if not chunk:
+            break
+        profiles = {row.id: row.profile_data for row in chunk}
+        for stmt, params in side_table_writes(profiles, replace=True):
+            db.execute(stmt, params)
+        db.commit()
+        notify_profiles_saved(profiles)
+        processed += len(chunk)
+        last_id = chunk[-1].id
+    return processed
+
+
+SKILL_VOCABULARY_KEY = "skill_vocabulary"
+
+
+def ensure_skill_index_current(db: Optional[Session] = None) -> bool:
+    """Re-key the side tables if they were written under another skill vocabulary.
+
+    user_skill.skill holds skill_vocab keys, so an alias table change leaves old rows
+    unreachable by the new keys. Cheap (one lookup) when the stored version matches.
+    Run at start-up by the server, batch_runner, scheduler and extract_stream.
+    Returns True if a rebuild ran.
+    """
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        stored = db.get(IndexMetaDB, SKILL_VOCABULARY_KEY)
+        if stored is not None and stored.value == VOCABULARY.version:
+            return False
+        rebuilt = stored is not None or db.execute(select(UserSkillDB.id).limit(1)).first() is not None
+        if rebuilt:
+            users = rebuild_profile_index(db)
+            logger.info("Re-keyed side tables of %d users for skill vocabulary %s", users, VOCABULARY.version)
+        db.merge(IndexMetaDB(key=SKILL_VOCABULARY_KEY, value=VOCABULARY.version))
+        db.commit()
+        return rebuilt
+    finally:
+        if own_session:
+            db.close()
+
+
+# --- Query API ---
+#
+# Builders return Core selects of (id, name, email) so the same query runs on a sync
+# Session (`db.execute(q).all()`) or an AsyncSession (`(await db.execute(q)).all()`).
+# Lookups walk the (key, user_id) indexes, so cost scales with matching rows.
+
+def _user_columns() -> Select:
+    return select(UserDB.id, UserDB.name, UserDB.email)
+
+
+def users_with_skill_query(skill: str) -> Select:
+    return (
+        _user_columns()
+        .join(UserSkillDB, UserSkillDB.user_id == UserDB.id)
+        .where(UserSkillDB.skill == skill_key(skill))
+        .order_by(UserDB.id)
+    )
+
+
+def users_with_all_skills_query(skills: Iterable[str]) -> Select:
+    keys = sorted({skill_key(s) for s in skills if str(s).strip()})
+    matching = (
+        select(UserSkillDB.user_id)
+        .where(UserSkillDB.skill.in_(keys))
+        .group_by(UserSkillDB.user_id)
+        .having(func.count() == len(keys))
+    )
+    return _user_columns().where(UserDB.id.in_(matching)).order_by(UserDB.id)
+
+
+def users_missing_skill_query(skill: str) -> Select:
+    has_skill = exists().where(UserSkillDB.user_id == UserDB.id, UserSkillDB.skill == skill_key(skill))
+    return _user_columns().where(~has_skill).order_by(UserDB.id)
+
+
+def users_with_certification_query(title: str) -> Select:
+    return (
+        _user_columns()
+        .join(UserCertificationDB, UserCertificationDB.user_id == UserDB.id)
+        .where(UserCertificationDB.certification == normalize_key(title))
+        .order_by(UserDB.id)
+    )
+
+
+def users_missing_certifications_query() -> Select:
+    has_cert = exists().where(UserCertificationDB.user_id == UserDB.id)
+    return _user_columns().where(~has_cert).order_by(UserDB.id)
+
+
+def users_missing_projects_query() -> Select:
+    has_project = exists().where(UserProjectDB.user_id == UserDB.id)
+    return _user_columns().where(~has_project).order_by(UserDB.id)
+
+
+def skill_counts_query(limit: int = 50) -> Select:
+    """Most common skills across all users: (skill, users)."""
+    users = func.count(UserSkillDB.user_id).label("users")
+    return (
+        select(UserSkillDB.skill, users)
+        .group_by(UserSkillDB.skill)
+        .order_by(users.desc(), UserSkillDB.skill)
+        .limit(limit)
+    )
+
+
+def find_users_with_skill(db: Session, skill: str) -> List[Any]:
+    return db.execute(users_with_skill_query(skill)).all()
+
+
+def find_users_missing_certifications(db: Session) -> List[Any]:
+    return db.execute(users_missing_certifications_query()).all()
@@ -0,0 +1,166 @@
+"""Columnar analytics over a GitHub account's repositories.
+
+RepoFrame loads each GitHubRepoExtract's last_updated, stars, forks,
+impressions and primary language into NumPy arrays in one pass. From there:
+- top-k by any of those is one argpartition plus a sort of the k winners;
+- the language distribution is one bincount;
+- activity histograms are one bincount over age buckets.
+
+Nothing per repo is built beyond the arrays. Projects objects (with their
+interaction strings) are materialized only for the featured repos: the top-k
+that feed profile.projects. trend_scrapping_node switches to this path for
+accounts with more than PROFILE_REPO_LIMIT repositories.
+"""
+import weakref
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError("numpy is required for repository analytics. Install with: pip install numpy") from e
+
+from schemas import GitHubRepoExtract, GitHubUserExtract, Projects
+from trend_engine import to_epoch
+from trend_scrapping_node import _project_from_github_repo
+
+RANK_KEYS = ("recency", "stars", "forks", "impressions")
+
+
+class RepoFrame:
+    """Per-repo columns for one account; row i is repos[i]."""
+
+    def __init__(self, repos: Sequence[GitHubRepoExtract]):
+        # A snapshot, so the rows can't drift from the arrays if the source list grows
+        self.repos: Tuple[GitHubRepoExtract, ...] = tuple(repos)
+        updated: List[float] = []
+        stars: List[int] = []
+        forks: List[int] = []
+        impressions: List[int] = []
+        codes: List[int] = []
+        self._language_codes: Dict[str, int] = {}
+        self.languages: List[str] = []  # code -> name, in first-appearance order
+        for r in self.repos:
+            updated.append(to_epoch(r.last_updated) if r.last_updated else -np.inf)
+            m = r.metrics
+            stars.append(m.stars)
+            forks.append(m.forks)
+            impressions.append(m.impressions)
+            lang = r.primary_language
+            if lang:
+                code = self._language_codes.get(lang)
+                if code is None:
+                    code = self._language_codes[lang] = len(self.languages)
+                    self.languages.append(lang)
+                codes.append(code)
+            else:
+                codes.append(-1)
+        # Undated repos sit at -inf, so they never rank by recency
+        self.updated = np.array(updated, dtype=np.float64)
+        self.columns: Dict[str, np.ndarray] = {
+            "recency": self.updated,
+            "stars": np.array(stars, dtype=np.int64),
+            "forks": np.array(forks, dtype=np.int64),
+            "impressions": np.array(impressions, dtype=np.int64),
+        }
+        self.language = np.array(codes, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.repos)
+
+    def top(self, by: str, k: int) -> np.ndarray:
+        """Indices of the k largest repos by `by` (a RANK_KEYS name), best first.
+
+        Ties keep repository order. Repos with nothing to rank (undated, zero
+        count) are left out, so fewer than k can come back.
+        """
+        values = self.columns[by]
+        candidates = np.flatnonzero(values > (-np.inf if by == "recency" else 0))
+        if len(candidates) > k:
+            # argpartition finds the k-th value in O(n); everything tied with it is kept
+            kth = values[candidates[np.argpartition(-values[candidates], k - 1)[k - 1]]]
+            candidates = candidates[values[candidates] >= kth]
+        order = np.lexsort((candidates, -values[candidates]))
+        return candidates[order[:k]]
+
+    def most_recent(self) -> Optional[GitHubRepoExtract]:
+        """Latest-updated repo (the first one on a tie), or None if none is dated."""
+        if not len(self.repos):
+            return None
+        i = int(np.argmax(self.updated))
+        return self.repos[i] if self.updated[i] > -np.inf else None
+
+    def featured(self, k: int) -> List[int]:
+        """Up to k repo indices taken round-robin from the top-k by each RANK_KEYS.
+
+        Topped up in repository order if the rankings run out. Returned in
+        repository order.
+        """
+        if len(self.repos) <= k:
+            return list(range(len(self.repos)))
+        rankings = [self.top(key, k).tolist() for key in RANK_KEYS]
+        chosen: Dict[int, None] = {}
+        for rank in range(k):
+            for ranking in rankings:
+                if rank < len(ranking):
+                    chosen.setdefault(ranking[rank], None)
+            if len(chosen) >= k:
+                break
+        picked = list(chosen)[:k]
+        if len(picked) < k:
+            taken = set(picked)
+            picked += [i for i in range(len(self.repos)) if i not in taken][: k - len(picked)]
+        return sorted(picked)
+
+    def projects(self, k: int) -> List[Projects]:
+        """Projects for the featured repos only."""
+        return [_project_from_github_repo(self.repos[i]) for i in self.featured(k)]
+
+    def language_names(self, indices: Optional[Sequence[int]] = None) -> List[str]:
+        """Distinct primary languages (of `indices`, default all repos) in first-appearance order."""
+        if indices is None:
+            return list(self.languages)
+        codes = self.language[np.asarray(indices, dtype=np.intp)]
+        codes = codes[codes >= 0]
+        first = np.unique(codes, return_index=True)[1]
+        return [self.languages[c] for c in codes[np.sort(first)].tolist()]
+
+    def language_distribution(self) -> Dict[str, int]:
+        """Repos per primary language, most common first."""
+        coded = self.language[self.language >= 0]
+        counts = np.bincount(coded, minlength=len(self.languages))
+        order = np.argsort(-counts, kind="stable")
+        return {self.languages[i]: int(counts[i]) for i in order.tolist() if counts[i]}
+
+    def activity_histogram(self, days: float = 30.0, periods: int = 12, now: Optional[datetime] = None) -> np.ndarray:
+        """Repos last updated in each `days`-wide period, newest period first."""
+        ref = to_epoch(now) if now is not None else datetime.now(timezone.utc).timestamp()
+        age = ref - self.updated[np.isfinite(self.updated)]
+        buckets = np.floor_divide(age, days * 86400.0).astype(np.int64)
+        buckets = buckets[(buckets >= 0) & (buckets < periods)]
+        return np.bincount(buckets, minlength=periods)
+
+    def updated_since(self, since: Optional[datetime]) -> np.ndarray:
+        """Indices of repos updated after `since`, undated ones included (all repos when None)."""
+        if since is None:
+            return np.arange(len(self.repos))
+        return np.flatnonzero((self.updated > to_epoch(since)) | np.isneginf(self.updated))
+
+    def nbytes(self) -> int:
+        return self.updated.nbytes + sum(c.nbytes for k, c in self.columns.items() if k != "recency") + self.language.nbytes
+
+
+# Frames by extract identity: extracts are normally not edited after fetching, so
+# alignment, delta diffs and recommendations of one cycle share a single frame. A
+# repository list that has grown since (an append) gets a fresh frame.
+_frames: Dict[int, Tuple[weakref.ref, RepoFrame]] = {}
+
+
+def repo_frame(github: GitHubUserExtract) -> RepoFrame:
+    cached = _frames.get(id(github))
+    if cached is not None and cached[0]() is github and len(cached[1]) == len(github.repositories or ()):
+        return cached[1]
+    frame = RepoFrame(github.repositories or [])
+    key = id(github)
+    _frames[key] = (weakref.ref(github, lambda _, key=key: _frames.pop(key, None)), frame)
+    return frame
@@ -0,0 +1,586 @@
+"""Recommendation rules as data, compiled into an evaluation plan.
+
+A rule set is a JSON document:
+
+    {"version": "2025-06",
+     "max_recommendations": null,
+     "rules": [
+        {"id": "linkedin_network",
+         "when": {"all": ["has_linkedin", ["linkedin_connections", "<", 200]]},
+         "priority": 3,
+         "title": "Grow your network",
+         "description": "...",
+         "reason": "Under 200 connections typically limits reach",
+         "suggested_actions": ["..."]},
+        ...]}
+
+Conditions are a feature name (truthy), [feature, op, value], or
+{"all": [...]} / {"any": [...]} / {"not": cond}. The text fields are templates:
+"{feature}", "{feature|first}" and "{feature|join:3}" are substituted.
+
+compile_ruleset() compiles the whole rule set, once, into a single Python
+function: conditions are inline and/or/not expressions, and each feature is a
+local computed on first use, so a feature no firing path needs is never
+computed. Each rule is also kept as a condition closure plus template renderers
+(CompiledRule), which cohort_recs evaluates rule by rule. Rules fire in file
+order; `priority` is the recommendation's priority.
+
+RuleEngine holds the live plan. With LAKSHSETU_RULES_FILE set, it re-reads the
+file when its mtime changes (checked at most every LAKSHSETU_RULES_CHECK_SECONDS).
+The plan's version id is part of the recommendation memo key
+(trend_scrapping_node), so a reload drops memoized recommendations. Per-rule
+evaluation/hit counters are exported as metrics for tuning.
+
+Usage: python rule_engine.py [--dump] [--check FILE]
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from log_queue import get_logger
+from metrics import REGISTRY
+from schemas import CareerActionRecommendation, GitHubUserExtract, LinkedInProfileExtract, UserProfile
+from skill_vocab import skill_key
+
+logger = get_logger("rule_engine")
+
+RULES_FILE = os.getenv("LAKSHSETU_RULES_FILE")
+RULES_CHECK_SECONDS = float(os.getenv("LAKSHSETU_RULES_CHECK_SECONDS", "5"))
+
+
+class RuleSetError(ValueError):
+    """A rule set that doesn't compile (unknown feature/operator, bad template, ...)."""
+
+
+# --- Features ---
+#
+# Each feature is one Python expression over the per-call context ({user},
+# {github}, {linkedin}, {trending}) and other {features}. The same expression is
+# compiled twice: into FEATURES (closures over a Features mapping, for per-rule
+# tests and cohort_recs) and inline into each plan's evaluation function.
+
+# Above this many repos the columnar argmax (repo_analytics, frame shared with alignment)
+# beats the linear scan; both pick the same repo
+COLUMNAR_REPO_SCAN = 50
+
+
+def most_recent_repo(github: Optional[GitHubUserExtract]) -> Optional[str]:
+    """Name of the latest-updated repo (the first one on a tie), or None if none is dated."""
+    repos = (github.repositories if github else None) or []
+    if len(repos) > COLUMNAR_REPO_SCAN:
+        from repo_analytics import repo_frame
+
+        most_recent = repo_frame(github).most_recent()
+        return most_recent.name if most_recent else None
+    most_recent = None
+    for r in repos:
+        if r.last_updated and (most_recent is None or r.last_updated > most_recent.last_updated):
+            most_recent = r
+    return most_recent.name if most_recent else None
+
+
+def trending_gaps(user: UserProfile, trending: Sequence[str]) -> List[str]:
+    """Trending skills (in rank order) the user doesn't list."""
+    have = {skill_key(s.skill_name) for s in user.skills or []}
+    return [t for t in trending if skill_key(t) not in have]
+
+
+CONTEXT = ("user", "github", "linkedin", "trending")
+
+FEATURE_EXPRESSIONS: Dict[str, str] = {
+    "has_skills": "bool({user}.skills)",
+    "skill_count": "len({user}.skills or ())",
+    "has_projects": "bool({user}.projects)",
+    "project_count": "len({user}.projects or ())",
+    "has_certifications": "bool({user}.certifications)",
+    "certification_count": "len({user}.certifications or ())",
+    "trending_gaps": "trending_gaps({user}, {trending})",
+    "trending_gap_count": "len({trending_gaps})",
+    "has_github": "{github} is not None",
+    "repo_count": "len(({github}.repositories if {github} else None) or ())",
+    "most_recent_repo": "most_recent_repo({github})",
+    "has_linkedin": "{linkedin} is not None",
+    "linkedin_posts": "({linkedin}.post_count or 0) if {linkedin} else 0",
+    "linkedin_connections": "({linkedin}.connections or 0) if {linkedin} else 0",
+}
+
+_NAME = re.compile(r"\{(\w+)\}")
+
+# Names the feature expressions (and generated plan code) may call
+_NAMESPACE: Dict[str, Any] = {"most_recent_repo": most_recent_repo, "trending_gaps": trending_gaps}
+
+
+def _substitute(expr: str, ref: Callable[[str], str]) -> str:
+    return _NAME.sub(lambda m: ref(m.group(1)), expr)
+
+
+FEATURES: Dict[str, Callable[["Features"], Any]] = {
+    name: eval("lambda f: " + _substitute(expr, lambda ref: f"f[{ref!r}]"), dict(_NAMESPACE))
+    for name, expr in FEATURE_EXPRESSIONS.items()
+}
+
+
+class Features(dict):
+    """Per-call feature values, computed on first access."""
+
+    __slots__ = ()
+
+    def __missing__(self, name: str) -> Any:
+        value = self[name] = FEATURES[name](self)
+        return value
+
+
+# --- Compilation ---
+
+Test = Callable[[Features], Any]
+
+# [feature, op, value] -> closure with the operator inlined (no operator.* call per test)
+OPERATORS: Dict[str, Callable[[str, Any], Test]] = {
+    "==": lambda name, v: lambda f: f[name] == v,
+    "!=": lambda name, v: lambda f: f[name] != v,
+    "<": lambda name, v: lambda f: f[name] < v,
+    "<=": lambda name, v: lambda f: f[name] <= v,
+    ">": lambda name, v: lambda f: f[name] > v,
+    ">=": lambda name, v: lambda f: f[name] >= v,
+    "in": lambda name, v: lambda f: f[name] in v,
+    "not in": lambda name, v: lambda f: f[name] not in v,
+}
+
+
+def _feature(name: Any, rule_id: str) -> str:
+    if name not in FEATURES:
+        raise RuleSetError(f"Rule {rule_id!r}: unknown feature {name!r}")
+    return name
+
+
+def compile_condition(cond: Any, rule_id: str = "?") -> Test:
+    """Closure for one condition tree (result is tested for truth); all/any return at the first deciding term."""
+    if isinstance(cond, str):
+        name = _feature(cond, rule_id)
+        return lambda f: f[name]
+    if isinstance(cond, list):
+        if len(cond) != 3 or cond[1] not in OPERATORS:
+            raise RuleSetError(f"Rule {rule_id!r}: expected [feature, op, value] with op in {sorted(OPERATORS)}, got {cond!r}")
+        return OPERATORS[cond[1]](_feature(cond[0], rule_id), cond[2])
+    if isinstance(cond, dict) and len(cond) == 1:
+        (kind, arg), = cond.items()
+        if kind == "not":
+            inner = compile_condition(arg, rule_id)
+            return lambda f: not inner(f)
+        if kind in ("all", "any") and isinstance(arg, list) and arg:
+            tests = tuple(compile_condition(c, rule_id) for c in arg)
+            if len(tests) == 1:
+                return tests[0]
+            if len(tests) == 2:
+                a, b = tests
+                return (lambda f: a(f) and b(f)) if kind == "all" else (lambda f: a(f) or b(f))
+            if kind == "all":
+                def all_(f: Features) -> bool:
+                    for test in tests:
+                        if not test(f):
+                            return False
+                    return True
+                return all_
+
+            def any_(f: Features) -> bool:
+                for test in tests:
+                    if test(f):
+                        return True
+                return False
+            return any_
+    raise RuleSetError(f"Rule {rule_id!r}: bad condition {cond!r}")
+
+
+_FIELD = re.compile(r"\{(\w+)(?:\|(\w+)(?::(\d+))?)?\}")
+
+FILTERS: Dict[str, Callable[[Any, Optional[int]], str]] = {
+    "first": lambda v, _: str(v[0]) if v else "",
+    "join": lambda v, n: ", ".join(map(str, v[:n] if n is not None else v)),
+}
+
+Template = Union[str, Callable[[Features], str]]
+Field = Tuple[str, Optional[str], Optional[int]]
+
+
+def _getter(name: str, filt: Optional[Callable[[Any, Optional[int]], str]], arg: Optional[int]) -> Callable[[Features], Any]:
+    if filt is None:
+        return lambda f: f[name]
+    return lambda f: filt(f[name], arg)
+
+
+def parse_template(text: str, rule_id: str = "?") -> Tuple[str, List[Field]]:
+    """(str.format pattern with positional fields, [(feature, filter, arg)]) for one template string."""
+    pattern: List[str] = []
+    fields: List[Field] = []
+    pos = 0
+    for m in _FIELD.finditer(text):
+        pattern.append(text[pos:m.start()].replace("{", "{{").replace("}", "}}"))
+        name, filt, arg = _feature(m.group(1), rule_id), m.group(2), m.group(3)
+        if filt is not None and filt not in FILTERS:
+            raise RuleSetError(f"Rule {rule_id!r}: unknown template filter {filt!r}")
+        pattern.append("{%d}" % len(fields))
+        fields.append((name, filt, int(arg) if arg else None))
+        pos = m.end()
+    pattern.append(text[pos:].replace("{", "{{").replace("}", "}}"))
+    return "".join(pattern), fields
+
+
+def compile_template(text: str, rule_id: str = "?") -> Template:
+    """Renderer for one template string, or the string itself when it has no fields.
+
+    The template becomes one str.format pattern with positional fields, so a
+    render is a single format() call.
+    """
+    pattern, fields = parse_template(text, rule_id)
+    if not fields:
+        return text
+    fmt = pattern.format
+    getters = [_getter(name, FILTERS[filt] if filt else None, arg) for name, filt, arg in fields]
+    if len(getters) == 1:
+        get = getters[0]
+        return lambda f: fmt(get(f))
+    return lambda f: fmt(*[get(f) for get in getters])
+
+
+class CompiledRule:
+    __slots__ = ("id", "spec", "when", "test", "fields", "dynamic", "actions", "static_actions")
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.id = rule_id = str(spec.get("id") or "")
+        if not rule_id:
+            raise RuleSetError(f"Rule without an id: {spec!r}")
+        self.spec = spec
+        # No "when": the rule always fires. The raw tree is kept for vectorized evaluation (cohort_recs)
+        self.when = spec.get("when")
+        self.test = compile_condition(spec["when"], rule_id) if "when" in spec else (lambda f: True)
+        priority = int(spec.get("priority", 3))
+        if not 1 <= priority <= 5:
+            raise RuleSetError(f"Rule {rule_id!r}: priority must be 1..5")
+        if "title" not in spec or "description" not in spec:
+            raise RuleSetError(f"Rule {rule_id!r}: title and description are required")
+        # Literal fields are rendered once here; only templated ones are rendered per hit
+        self.fields: Dict[str, Any] = {"priority": priority, "reason": None}
+        self.dynamic: List[Tuple[str, Callable[[Features], str]]] = []
+        for name in ("title", "description", "reason"):
+            if spec.get(name) is not None:
+                template = compile_template(str(spec[name]), rule_id)
+                if isinstance(template, str):
+                    self.fields[name] = template
+                else:
+                    self.dynamic.append((name, template))
+        self.actions = tuple(compile_template(str(a), rule_id) for a in spec.get("suggested_actions") or [])
+        self.static_actions = all(isinstance(a, str) for a in self.actions)
+
+    def render(self, f: Features) -> CareerActionRecommendation:
+        fields = dict(self.fields)
+        for name, template in self.dynamic:
+            fields[name] = template(f)
+        if self.static_actions:
+            fields["suggested_actions"] = list(self.actions)
+        else:
+            fields["suggested_actions"] = [a if isinstance(a, str) else a(f) for a in self.actions]
+        return CareerActionRecommendation(**fields)
+
+
+_UNSET = object()
+
+
+class _PlanSource:
+    """Python source for one plan's evaluate(user, github, linkedin, trending).
+
+    Conditions become inline and/or/not expressions and each feature a local,
+    computed by its FEATURE_EXPRESSIONS expression on first use. Rule text and
+    non-literal values go through the constant table `_k`, never into the source.
+    """
+
+    def __init__(self) -> None:
+        self.consts: List[Any] = []
+        self.features: List[str] = []
+
+    def const(self, value: Any) -> str:
+        self.consts.append(value)
+        return f"_k[{len(self.consts) - 1}]"
+
+    def literal(self, value: Any) -> str:
+        if value is None or type(value) in (bool, int, str):
+            return repr(value)
+        return self.const(value)
+
+    def feature(self, name: str) -> str:
+        if name in CONTEXT:
+            return name
+        if name not in self.features:
+            self.features.append(name)
+        expr = _substitute(FEATURE_EXPRESSIONS[name], self.feature)
+        return f"(f_{name} if f_{name} is not _UNSET else (f_{name} := {expr}))"
+
+    def condition(self, cond: Any) -> str:
+        # The tree has already been validated by compile_condition
+        if isinstance(cond, str):
+            return self.feature(cond)
+        if isinstance(cond, list):
+            name, op, value = cond
+            return f"({self.feature(name)} {op} {self.literal(value)})"
+        (kind, arg), = cond.items()
+        if kind == "not":
+            return f"(not {self.condition(arg)})"
+        joiner = " and " if kind == "all" else " or "
+        return "(" + joiner.join(self.condition(c) for c in arg) + ")"
+
+    def template(self, text: str) -> str:
+        pattern, fields = parse_template(text)
+        if not fields:
+            return self.const(text)
+        args = [
+            self.feature(name) if filt is None else f"{self.const(FILTERS[filt])}({self.feature(name)}, {arg!r})"
+            for name, filt, arg in fields
+        ]
+        return f"{self.const(pattern.format)}({', '.join(args)})"
+
+    def recommendation(self, rule: CompiledRule) -> str:
+        spec = rule.spec
+        kwargs = [f"priority={rule.fields['priority']!r}"]
+        for name in ("title", "description", "reason"):
+            if spec.get(name) is not None:
+                kwargs.append(f"{name}={self.template(str(spec[name]))}")
+        actions = [self.template(str(a)) for a in spec.get("suggested_actions") or []]
+        kwargs.append(f"suggested_actions=[{', '.join(actions)}]")
+        return f"_Rec({', '.join(kwargs)})"
+
+    def function(self, rules: Sequence[CompiledRule], limit: Optional[int]) -> str:
+        body: List[str] = []
+        for i, rule in enumerate(rules):
+            body.append(f"    _evaluated[{i}] += 1")
+            body.append(f"    if {self.condition(rule.when) if 'when' in rule.spec else 'True'}:")
+            body.append(f"        _hits[{i}] += 1")
+            body.append(f"        recs.append({self.recommendation(rule)})")
+            if limit is not None:
+                body.append(f"        if len(recs) >= {limit!r}:")
+                body.append("            return recs")
+        head = ["def evaluate(user, github, linkedin, trending):", "    recs = []"]
+        if self.features:
+            head.append("    " + " = ".join(f"f_{name}" for name in self.features) + " = _UNSET")
+        return "\n".join(head + body + ["    return recs", ""])
+
+
+class RulePlan:
+    """A compiled rule set: rules in firing order, its version id, and hit counters.
+
+    evaluate() is one generated function for the whole plan (see _PlanSource),
+    so a call costs about what the equivalent hand-written if-blocks do.
+    """
+
+    def __init__(self, ruleset: Dict[str, Any]):
+        if not isinstance(ruleset, dict) or not isinstance(ruleset.get("rules"), list):
+            raise RuleSetError("A rule set is an object with a 'rules' list")
+        self.rules: Tuple[CompiledRule, ...] = tuple(CompiledRule(spec) for spec in ruleset["rules"])
+        ids = [rule.id for rule in self.rules]
+        if len(set(ids)) != len(ids):
+            raise RuleSetError(f"Duplicate rule ids in {ids}")
+        limit = ruleset.get("max_recommendations")
+        self.max_recommendations: Optional[int] = int(limit) if limit is not None else None
+        # Label plus content hash, so an edit without a version bump still gets a new id
+        digest = hashlib.blake2b(json.dumps(ruleset, sort_keys=True).encode(), digest_size=4).hexdigest()
+        self.version = f"{ruleset.get('version', 'rules')}+{digest}"
+        # Plain ints bumped without a lock: approximate under threads, which is fine for tuning
+        self.evaluated = [0] * len(self.rules)
+        self.hits = [0] * len(self.rules)
+        plan = _PlanSource()
+        self.source = plan.function(self.rules, self.max_recommendations)
+        namespace = dict(
+            _NAMESPACE, _UNSET=_UNSET, _Rec=CareerActionRecommendation,
+            _k=tuple(plan.consts), _evaluated=self.evaluated, _hits=self.hits,
+        )
+        exec(compile(self.source, f"<rules {self.version}>", "exec"), namespace)
+        self.evaluate: Callable[..., List[CareerActionRecommendation]] = namespace["evaluate"]
+
+
+def compile_ruleset(ruleset: Dict[str, Any]) -> RulePlan:
+    return RulePlan(ruleset)
+
+
+# The rules suggest_next_steps has always applied
+DEFAULT_RULESET: Dict[str, Any] = {
+    "version": "1",
+    "max_recommendations": None,
+    "rules": [
+        {
+            "id": "skill_gaps",
+            "when": {"all": ["has_skills", ["trending_gap_count", ">", 0]]},
+            "priority": 1,
+            "title": "Close top skill gaps",
+            "description": "Focus on: {trending_gaps|join:3}",
+            "reason": "In-demand skills not present in profile",
+            "suggested_actions": [
+                "Take a short course on {trending_gaps|first}",
+                "Build a weekend project demonstrating the skill",
+                "Share a LinkedIn post about what you learned",
+            ],
+        },
+        {
+            "id": "recent_repo",
+            "when": ["most_recent_repo", "!=", None],
+            "priority": 2,
+            "title": "Polish your most recent repo",
+            "description": "Improve README and add a demo to {most_recent_repo}",
+            "reason": "Recent work is easiest to showcase for quick wins",
+            "suggested_actions": [
+                "Add a clear README with setup, features, and screenshots",
+                "Publish a short demo video (GIF or Loom) and link it",
+                "Pin the repo and share on LinkedIn",
+            ],
+        },
+        {
+            "id": "linkedin_posts",
+            "when": {"all": ["has_linkedin", ["linkedin_posts", "==", 0]]},
+            "priority": 2,
+            "title": "Post on LinkedIn",
+            "description": "Write a short post summarizing a recent learning or project",
+            "reason": "Zero posts — build visibility",
+            "suggested_actions": [
+                "Share a 150–200 word post with a screenshot",
+                "Add relevant hashtags",
+                "Cross-link to your GitHub project",
+            ],
+        },
+        {
+            "id": "linkedin_network",
+            "when": {"all": ["has_linkedin", ["linkedin_connections", "<", 200]]},
+            "priority": 3,
+            "title": "Grow your network",
+            "description": "Connect with alumni and peers in your field",
+            "reason": "Under 200 connections typically limits reach",
+            "suggested_actions": [
+                "Send 5 personalized connection requests to alumni",
+                "Join 1–2 relevant LinkedIn groups",
+            ],
+        },
+        {
+            "id": "certification_project",
+            "when": {"all": ["has_certifications", {"not": "has_projects"}]},
+            "priority": 2,
+            "title": "Turn a certification into a project",
+            "description": "Build a small project applying your certified skill",
+            "reason": "Projects demonstrate practical ability",
+            "suggested_actions": [
+                "Scope a 1–2 week build",
+                "Write a blog/README on the approach and results",
+            ],
+        },
+    ],
+}
+
+
+# --- Engine ---
+
+class RuleEngine:
+    """The live plan, optionally hot-reloaded from a JSON file."""
+
+    def __init__(self, ruleset: Optional[Dict[str, Any]] = None, path: Optional[str] = None, check_interval: float = RULES_CHECK_SECONDS):
+        self.path = path
+        self.check_interval = check_interval
+        self.reloads = 0
+        self.reload_errors = 0
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.plan = compile_ruleset(ruleset if ruleset is not None else DEFAULT_RULESET)
+        if path:
+            self.maybe_reload(force=True)
+
+    @classmethod
+    def from_env(cls) -> "RuleEngine":
+        return cls(path=RULES_FILE)
+
+    @property
+    def version(self) -> str:
+        return self.plan.version
+
+    def load(self, ruleset: Dict[str, Any]) -> str:
+        """Compile and swap in a rule set; returns its version id. Raises RuleSetError."""
+        plan = compile_ruleset(ruleset)
+        self.plan = plan
+        logger.info("Loaded rule set %s (%d rules)", plan.version, len(plan.rules))
+        return plan.version
+
+    def maybe_reload(self, force: bool = False) -> bool:
+        """Re-read the rules file if its mtime changed. A file that fails to load keeps the current plan."""
+        if not self.path:
+            return False
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return False
+        with self._lock:
+            self._next_check = now + self.check_interval
+            try:
+                mtime = os.stat(self.path).st_mtime
+                if not force and mtime == self._mtime:
+                    return False
+                with open(self.path, encoding="utf-8") as fh:
+                    ruleset = json.load(fh)
+                self._mtime = mtime
+                self.load(ruleset)
+            except (OSError, ValueError) as e:
+                self.reload_errors += 1
+                logger.error("Rule file %s not loaded, keeping %s: %s", self.path, self.plan.version, e)
+                return False
+            self.reloads += 1
+            return True
+
+    def evaluate(
+        self,
+        user: UserProfile,
+        github: Optional[GitHubUserExtract] = None,
+        linkedin: Optional[LinkedInProfileExtract] = None,
+        trending: Sequence[str] = (),
+    ) -> List[CareerActionRecommendation]:
+        if self.path and time.monotonic() >= self._next_check:
+            self.maybe_reload()
+        return self.plan.evaluate(user, github, linkedin, trending)
+
+    def hit_counts(self) -> Dict[str, Dict[str, int]]:
+        """{rule id: {"evaluated": n, "hits": n}} for the current plan."""
+        plan = self.plan
+        return {rule.id: {"evaluated": e, "hits": h} for rule, e, h in zip(plan.rules, plan.evaluated, plan.hits)}
+
+    def _collect(self):
+        plan = self.plan
+        yield (
+            "lakshsetu_rule_evaluations_total", "counter", "Recommendation rule evaluations by rule",
+            [({"rule": rule.id, "version": plan.version}, n) for rule, n in zip(plan.rules, plan.evaluated)],
+        )
+        yield (
+            "lakshsetu_rule_hits_total", "counter", "Recommendation rules fired by rule",
+            [({"rule": rule.id, "version": plan.version}, n) for rule, n in zip(plan.rules, plan.hits)],
+        )
+        yield (
+            "lakshsetu_rule_reloads_total", "counter", "Rule file reloads by outcome",
+            [({"result": "ok"}, self.reloads), ({"result": "error"}, self.reload_errors)],
+        )
+
+
+RULES = RuleEngine.from_env()
+# Once per process, for the live engine only; engines built for tests/tools don't export
+REGISTRY.register_collector(RULES._collect)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Inspect recommendation rule sets")
+    parser.add_argument("--dump", action="store_true", help="print the built-in rule set as JSON (a starting point for LAKSHSETU_RULES_FILE)")
+    parser.add_argument("--check", metavar="FILE", help="compile a rule file and print its version id")
+    args = parser.parse_args(argv)
+    if args.check:
+        with open(args.check, encoding="utf-8") as fh:
+            plan = compile_ruleset(json.load(fh))
+        print(f"{args.check}: {len(plan.rules)} rules, version {plan.version}")
+    if args.dump or not args.check:
+        print(json.dumps(DEFAULT_RULESET, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+"""Multi-tenant agent scheduler.
+
+Holds many users' AgentStates and runs agent.run_cycle for each user when its
+next_user_processing_at comes due, on a bounded thread pool. Due times live in a
+min-heap, so the dispatcher sleeps until the earliest one instead of polling
+every user; rescheduling pushes a new entry and stale ones are skipped on pop.
+
+Usage: python scheduler.py [--workers 4] [--interval-days 7] [--limit N]
+                           [--synthetic N] [--duration S] [--metrics-port P] [--ingest]
+"""
+import argparse
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from agent import AgentState, initial_state, run_cycle
+from log_queue import get_logger
+from metrics import REGISTRY
+from schemas import Skills, UserProfile
+
+logger = get_logger("scheduler")
+
+SCHEDULER_DISPATCH_LAG = REGISTRY.histogram(
+    "lakshsetu_scheduler_dispatch_lag_seconds",
+    "Delay between a user's next_user_processing_at and the start of its cycle",
+    buckets=(0.001, 0.01, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0),
+)
+SCHEDULER_CYCLE_SECONDS = REGISTRY.histogram(
+    "lakshsetu_scheduler_cycle_duration_seconds",
+    "Wall time of one scheduled agent cycle",
+    ("outcome",),
+)
+
+# Retry a failed cycle after this long rather than waiting a whole interval
+FAILURE_RETRY_SECONDS = 300.0
+
+
+@dataclass
+class _Entry:
+    state: AgentState
+    generation: int = 0
+    running: bool = False
+    # wake() while the cycle runs: applied when it finishes, since run_cycle sets its own next time
+    wake_at: Optional[datetime] = None
+
+
+class AgentScheduler:
+    """Dispatch due users' agent cycles to at most `workers` concurrent threads.
+
+    `run_cycle(state) -> state` must set state["next_user_processing_at"] for the
+    next run (agent.run_cycle does). Users are keyed by id, else email.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        run_cycle: Callable[[AgentState], AgentState] = run_cycle,
+        clock: Callable[[], datetime] = datetime.now,
+    ):
+        self.workers = workers
+        self.run_cycle = run_cycle
+        self.clock = clock
+        self._users: Dict[Any, _Entry] = {}
+        # (due timestamp, tie-breaker, user key, generation)
+        self._heap: List[Tuple[float, int, Any, int]] = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._stopping = False
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.cycles_completed = 0
+        self.cycles_failed = 0
+
+    # --- Tenants ---
+
+    @staticmethod
+    def user_key(user: UserProfile) -> Any:
+        return user.id if user.id is not None else user.email
+
+    def add_user(self, user: UserProfile, schedule_interval_days: int = 7, state: Optional[AgentState] = None) -> Any:
+        """Register a user (or replace its state). New users are due immediately."""
+        state = state if state is not None else initial_state(user, schedule_interval_days)
+        key = self.user_key(state["user"])
+        with self._cond:
+            entry = self._users.get(key)
+            if entry is None:
+                entry = self._users[key] = _Entry(state)
+            else:
+                entry.state = state
+            if not entry.running:
+                self._push(key, entry)
+            self._cond.notify()
+        return key
+
+    def remove_user(self, key: Any) -> Optional[AgentState]:
+        with self._cond:
+            entry = self._users.pop(key, None)
+            # Its heap entries go stale and are dropped when popped
+            return entry.state if entry else None
+
+    def wake(self, key: Any, at: Optional[datetime] = None) -> None:
+        """Move a user's next run to `at` (default: now), e.g. after a profile edit."""
+        with self._cond:
+            entry = self._users.get(key)
+            if entry is None:
+                raise KeyError(key)
+            at = at or self.clock()
+            if entry.running:
+                # Re-queued no later than this when the current cycle finishes
+                entry.wake_at = at if entry.wake_at is None else min(entry.wake_at, at)
+            else:
+                entry.state["next_user_processing_at"] = at
+                self._push(key, entry)
+            self._cond.notify()
+
+    def get_state(self, key: Any) -> Optional[AgentState]:
+        entry = self._users.get(key)
+        return entry.state if entry else None
+
+    # --- Heap ---
+
+    def _push(self, key: Any, entry: _Entry) -> None:
+        # Caller holds self._cond
+        entry.generation += 1
+        due = entry.state.get("next_user_processing_at") or self.clock()
+        heapq.heappush(self._heap, (due.timestamp(), next(self._seq), key, entry.generation))
+
+    def _pop_due(self, now_ts: float) -> Optional[Tuple[Any, _Entry, float]]:
+        # Caller holds self._cond; discards stale entries on the way
+        while self._heap:
+            due_ts, _, key, generation = self._heap[0]
+            entry = self._users.get(key)
+            if entry is None or entry.generation != generation or entry.running:
+                heapq.heappop(self._heap)
+                continue
+            if due_ts > now_ts:
+                return None
+            heapq.heappop(self._heap)
+            return key, entry, due_ts
+        return None
+
+    def _next_due_ts(self) -> Optional[float]:
+        while self._heap:
+            _, _, key, generation = self._heap[0]
+            entry = self._users.get(key)
+            if entry is None or entry.generation != generation or entry.running:
+                heapq.heappop(self._heap)
+                continue
+            return self._heap[0][0]
+        return None
+
+    # --- Dispatch ---
+
+    def _dispatch_due(self) -> int:
+        """Submit due users until the pool is full. Returns how many were dispatched."""
+        dispatched = 0
+        with self._cond:
+            now_ts = self.clock().timestamp()
+            while self._in_flight < self.workers:
+                item = self._pop_due(now_ts)
+                if item is None:
+                    break
+                key, entry, due_ts = item
+                entry.running = True
+                self._in_flight += 1
+                SCHEDULER_DISPATCH_LAG.observe(max(0.0, now_ts - due_ts))
+                self._executor.submit(self._run_one, key, entry)
+                dispatched += 1
+        return dispatched
+
+    def _run_one(self, key: Any, entry: _Entry) -> None:
+        t0 = time.perf_counter()
+        outcome = "ok"
+        started = entry.state
+        result = started
+        try:
+            result = self.run_cycle(started)
+        except Exception:
+            outcome = "error"
+            logger.exception("Agent cycle failed for user %s", key)
+        SCHEDULER_CYCLE_SECONDS.observe(time.perf_counter() - t0, outcome)
+
+        with self._cond:
+            entry.running = False
+            self._in_flight -= 1
+            if outcome == "ok":
+                self.cycles_completed += 1
+            else:
+                self.cycles_failed += 1
+            # add_user() may have installed a new state while the cycle ran; that one
+            # wins and is scheduled by its own next_user_processing_at
+            if entry.state is started:
+                entry.state = result
+                if outcome != "ok":
+                    retry_at = datetime.fromtimestamp(self.clock().timestamp() + FAILURE_RETRY_SECONDS)
+                    entry.state["next_user_processing_at"] = retry_at
+            if entry.wake_at is not None:
+                due = entry.state.get("next_user_processing_at")
+                entry.state["next_user_processing_at"] = entry.wake_at if due is None else min(entry.wake_at, due)
+                entry.wake_at = None
+            if self._users.get(key) is entry:
+                self._push(key, entry)
+            self._cond.notify()
+
+    def run(self, stop: Optional[threading.Event] = None, max_idle_wait: float = 60.0) -> None:
+        """Dispatch loop; blocks until `stop` is set or stop() is called. Exports metrics while running."""
+        self._stopping = False
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="agent-worker")
+        REGISTRY.register_collector(self._collect)
+        try:
+            while not self._stopping and not (stop is not None and stop.is_set()):
+                self._dispatch_due()
+                with self._cond:
+                    if self._stopping:
+                        break
+                    if self._in_flight >= self.workers:
+                        timeout = max_idle_wait  # woken when a worker finishes
+                    else:
+                        next_ts = self._next_due_ts()
+                        now_ts = self.clock().timestamp()
+                        timeout = max_idle_wait if next_ts is None else min(max_idle_wait, max(0.0, next_ts - now_ts))
+                    if timeout > 0:
+                        # Bounded wait so an external `stop` event is noticed promptly
+                        self._cond.wait(timeout=min(timeout, 1.0) if stop is not None else timeout)
+        finally:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            REGISTRY.unregister_collector(self._collect)
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+
+    # --- Metrics ---
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            now_ts = self.clock().timestamp()
+            due = [ts for ts, _, key, gen in self._heap if ts <= now_ts and self._is_live(key, gen)]
+            return {
+                "users": len(self._users),
+                "queued": sum(1 for _, _, key, gen in self._heap if self._is_live(key, gen)),
+                "due": len(due),
+                "in_flight": self._in_flight,
+                "max_lag_seconds": round(now_ts - min(due), 3) if due else 0.0,
+                "cycles_completed": self.cycles_completed,
+                "cycles_failed": self.cycles_failed,
+            }
+
+    def _is_live(self, key: Any, generation: int) -> bool:
+        entry = self._users.get(key)
+        return entry is not None and entry.generation == generation and not entry.running
+
+    def _collect(self):
+        stats = self.stats()
+        yield ("lakshsetu_scheduler_users", "gauge", "Users registered with the scheduler", [({}, stats["users"])])
+        yield (
+            "lakshsetu_scheduler_queue_depth", "gauge", "Scheduled users waiting in the heap, total and already due",
+            [({"state": "queued"}, stats["queued"]), ({"state": "due"}, stats["due"])],
+        )
+        yield ("lakshsetu_scheduler_in_flight", "gauge", "Agent cycles currently running", [({}, stats["in_flight"])])
+        yield (
+            "lakshsetu_scheduler_max_lag_seconds", "gauge", "How overdue the oldest waiting user is",
+            [({}, stats["max_lag_seconds"])],
+        )
+        yield (
+            "lakshsetu_scheduler_cycles_total", "counter", "Finished agent cycles by outcome",
+            [({"outcome": "ok"}, stats["cycles_completed"]), ({"outcome": "error"}, stats["cycles_failed"])],
+        )
+
+
+# --- CLI ---
+
+def load_users(limit: Optional[int] = None, chunk_size: int = 1000) -> List[UserProfile]:
+    """Validated UserProfiles for the rows in users.db (invalid profiles are skipped)."""
+    from pydantic import ValidationError
+    from sqlalchemy import select
+
+    from table import SessionLocal, UserDB
+
+    users: List[UserProfile] = []
+    last_id = 0
+    with SessionLocal() as db:
+        while limit is None or len(users) < limit:
+            rows = db.execute(
+                select(UserDB.id, UserDB.profile_data).where(UserDB.id > last_id).order_by(UserDB.id).limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            for row in rows:
+                try:
+                    users.append(UserProfile.model_validate({**(row.profile_data or {}), "id": row.id}))
+                except ValidationError as e:
+                    logger.warning("Skipping user %s: invalid profile_data (%s)", row.id, e.errors()[0]["msg"])
+            last_id = rows[-1].id
+    return users[:limit] if limit is not None else users
+
+
+def synthetic_users(count: int) -> List[UserProfile]:
+    return [
+        UserProfile(
+            id=i,
+            email=f"user{i}@example.com",
+            name=f"User {i}",
+            skills=[Skills(skill_name="Python", skill_strength="Medium"), Skills(skill_name="SQL", skill_strength="Low")],
+            projects=[],
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def serve_metrics(port: int) -> None:
+    """Expose REGISTRY on http://127.0.0.1:<port>/metrics from a daemon thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = REGISTRY.render().encode()
+            self.send_response(200 if self.path == "/metrics" else 404)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics-http").start()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run agent cycles for every user on a shared worker pool")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--interval-days", type=int, default=7, help="schedule_interval_days for each user")
+    parser.add_argument("--limit", type=int, help="only schedule the first N users from the database")
+    parser.add_argument("--synthetic", type=int, help="schedule N generated users instead of reading users.db")
+    parser.add_argument("--ingest", action="store_true", help="fetch fresh extracts per cycle (ingestion.Ingestion.from_env); feeds the trend engine")
+    parser.add_argument("--save", action="store_true", help="persist profiles after each cycle (profile_index.save_user_profile)")
+    parser.add_argument("--checkpoint", action="store_true", help="restore AgentStates at startup and checkpoint them after every node")
+    parser.add_argument("--duration", type=float, help="stop after N seconds (default: run until interrupted)")
+    parser.add_argument("--report-every", type=float, default=10.0, help="log scheduler stats every N seconds")
+    parser.add_argument("--metrics-port", type=int, help="serve /metrics on this port")
+    parser.add_argument("--trace", metavar="FILE", help="record per-node spans and write them as Chrome trace JSON on exit")
+    args = parser.parse_args(argv)
+
+    if args.trace:
+        import tracing
+
+        tracing.enable()
+
+    if args.ingest:
+        import agent
+        from ingestion import Ingestion
+
+        agent.INGESTION = Ingestion.from_env()
+
+    if args.save:
+        import agent
+        from profile_index import ensure_skill_index_current, save_user_profile
+
+        ensure_skill_index_current()
+        agent.SAVE_PROFILE_CB = save_user_profile
+
+    restored: Dict[str, AgentState] = {}
+    if args.checkpoint:
+        import agent
+        from checkpoint_store import AgentCheckpointStore
+
+        agent.CHECKPOINT_STORE = AgentCheckpointStore()
+        restored = agent.CHECKPOINT_STORE.restore_all()
+        logger.info("Restored %d agent states: %s", len(restored), agent.CHECKPOINT_STORE.stats())
+
+    users = synthetic_users(args.synthetic) if args.synthetic else load_users(args.limit)
+    scheduler = AgentScheduler(workers=args.workers)
+    for user in users:
+        state = restored.get(str(AgentScheduler.user_key(user)))
+        scheduler.add_user(user, schedule_interval_days=args.interval_days, state=state)
+    logger.info("Scheduling %d users on %d workers", len(users), args.workers)
+
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+
+    stop = threading.Event()
+    loop = threading.Thread(target=scheduler.run, kwargs={"stop": stop}, name="agent-scheduler")
+    loop.start()
+    deadline = time.monotonic() + args.duration if args.duration else None
+    try:
+        while loop.is_alive():
+            wait = args.report_every if deadline is None else min(args.report_every, deadline - time.monotonic())
+            if wait <= 0:
+                break
+            loop.join(timeout=wait)
+            logger.info("Scheduler stats: %s", scheduler.stats())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        scheduler.stop()
+        loop.join()
+    stats = scheduler.stats()
+    logger.info("Scheduler stopped: %s", stats)
+    if args.checkpoint:
+        agent.CHECKPOINT_STORE.close()
+    if args.trace:
+        spans = tracing.get_tracer().export(args.trace)
+        logger.info("Wrote %d spans to %s", spans, args.trace)
+    print(stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
-from pydantic import BaseModel, Field, HttpUrl
-from typing import List, Optional
+from pydantic import BaseModel, Field, HttpUrl, field_validator
+from typing import Any, List, Optional
 from enum import Enum
 from datetime import datetime
 
+from skill_vocab import skill_key
+
 class Certifications(BaseModel):
     title: str
     issuer: str
@@ -59,9 +61,10 @@ class UserProfile(BaseModel):
     huggingface: Optional[str] = Field(default=None)
     x: Optional[str] = Field(default=None)
     website: Optional[str] = Field(default=None)
-    certifications: Optional[List[str]] = Field(default=None)
-    skills: Optional[List[str]] = Field(default=None)
-    projects: List[str] = Field(default_factory=list)
+    # Registration may send plain strings; they are stored and read back as the models (see _plain_entries)
+    certifications: Optional[List[Certifications]] = Field(default=None)
+    skills: Optional[List[Skills]] = Field(default=None)
+    projects: List[Projects] = Field(default_factory=list)
     blogs: Optional[List[str]] = Field(default=None)
     achievements: Optional[List[str]] = Field(default=None)
     trending_skills: Optional[List[str]] = Field(default=None, description="Skills currently trending in the tech industry")
@@ -69,10 +72,27 @@ class UserProfile(BaseModel):
     recommendations: Optional[List[str]] = Field(default=None, description="Personalized career suggestions")
     network_opportunities: Optional[List[str]] = Field(default=None, description="Suggested people or communities to connect with")
 
+    @field_validator("skills", "projects", "certifications", mode="before")
+    @classmethod
+    def _plain_entries(cls, value: Any, info) -> Any:
+        # Plain-string entries (registration payloads, rows stored before alignment) become models
+        if not isinstance(value, list):
+            return value
+        build = PLAIN_ENTRY_FIELDS[info.field_name]
+        return [build(v.strip()) if isinstance(v, str) else v for v in value if not isinstance(v, str) or v.strip()]
+
+
+# Model fields a plain-string UserProfile entry is expanded into
+PLAIN_ENTRY_FIELDS = {
+    "skills": lambda name: {"skill_name": name, "skill_strength": "Medium"},
+    "projects": lambda name: {"name": name, "description": ""},
+    "certifications": lambda title: {"title": title, "issuer": "Unknown", "issued_date": "Unknown"},
+}
+
 def analyze_skill_gaps(user_skills, trending_skills):
-    user_skill_names = {skill.skill_name for skill in user_skills}
-    missing_skills = set(trending_skills) - user_skill_names
-    return list(missing_skills)
+    # Compared by canonical key (skill_vocab), so "ML" or "AI/ML" on a profile covers "Machine Learning"
+    user_skill_keys = {skill_key(skill.skill_name) for skill in user_skills}
+    return [t for t in dict.fromkeys(trending_skills) if skill_key(t) not in user_skill_keys]
 
 
 
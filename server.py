@@ -1,16 +1,69 @@
 # main.py
-from typing import Union
-from fastapi import FastAPI, HTTPException,Depends
+import asyncio
+import itertools
+import json
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
+from fastapi import FastAPI, HTTPException,Depends, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import ValidationError
 from schemas import UserProfile
 import uvicorn
-from table import UserDB,SessionLocal
-from sqlalchemy.orm import Session
+from table import UserDB,AsyncSessionLocal,GROUP_COMMIT_ENABLED
+from write_queue import DuplicateEmailError, GroupCommitWriter
+from profile_index import ensure_skill_index_current, notify_profiles_saved, side_table_writes
+from profile_cache import profile_cache
+from profile_codec import PROFILE_CODEC, dumps_json, loads_json
+from metrics import REGISTRY, MetricsMiddleware
+from log_queue import get_logger
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = get_logger("server")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with profile_codec's encoder (orjson when installed)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+
+# Single writer that group-commits /registration inserts (LAKSHSETU_GROUP_COMMIT=0 to disable)
+registration_writer = GroupCommitWriter()
+
+
+# In-memory skill bit-matrix behind /skills/gaps (LAKSHSETU_SKILL_MATRIX=0 to disable; needs numpy)
+SKILL_MATRIX_ENABLED = os.getenv("LAKSHSETU_SKILL_MATRIX", "1") == "1"
+skill_matrix = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global skill_matrix
+    # Re-key user_skill if the skill vocabulary changed since it was written
+    await asyncio.to_thread(ensure_skill_index_current)
+    if SKILL_MATRIX_ENABLED:
+        from skill_matrix import SkillBitMatrix
+
+        # Built off the event loop; saves from here on keep it current
+        skill_matrix = (await asyncio.to_thread(SkillBitMatrix.from_db)).attach()
+    yield
+    await registration_writer.stop()
+    if skill_matrix is not None:
+        skill_matrix.detach()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="User Registration API",
     description="API for user profile registration",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # Add CORS middleware - IMPORTANT for frontend communication
@@ -22,63 +75,414 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Added last so it is outermost: latency covers CORS handling and the whole streamed body
+app.add_middleware(MetricsMiddleware)
 
-def get_db():
-    db = SessionLocal()
-    try:
+
+async def get_db():
+    # Async session so DB round-trips never block the event loop
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 
+def _app_metrics():
+    stats = profile_cache.stats()
+    yield (
+        "lakshsetu_profile_cache_events_total", "counter", "Profile cache lookups and evictions by outcome",
+        [({"event": k}, stats[k]) for k in ("hits", "shared_hits", "misses", "evictions", "expirations", "invalidations", "stale_puts")],
+    )
+    yield (
+        "lakshsetu_profile_cache_entries", "gauge", "Profiles held in the local cache",
+        [({}, stats["entries"])],
+    )
+    yield (
+        "lakshsetu_group_commit_total", "counter", "Group-commit transactions and rows written by /registration",
+        [({"kind": "commits"}, registration_writer.commits), ({"kind": "rows"}, registration_writer.rows_written)],
+    )
+
+
+REGISTRY.register_collector(_app_metrics)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    # Prometheus text exposition format 0.0.4
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.get("/")
 async def root():
     return {"message": " API is running!", "status": "healthy"}
 
 
 @app.post("/registration")
-async def user_registration(user_data: UserProfile, db: Session = Depends(get_db)):
+async def user_registration(user_data: UserProfile, db: AsyncSession = Depends(get_db)):
   
     try:
-        print(f"Received registration for: {user_data.name}")
-        print(f"Email: {user_data.email}")
-        # print(f"Skills: {user_data.skills}")
+        logger.debug("Received registration for: %s <%s>", user_data.name, user_data.email)
 
-        existing_user = db.query(UserDB).filter(UserDB.email == user_data.email).first()
-        if existing_user:
+        result = await db.execute(select(UserDB.id).where(UserDB.email == user_data.email).limit(1))
+        existing_user = result.scalar_one_or_none()
+        if existing_user is not None:
             raise HTTPException(status_code=400, detail="User with this email already exists")
         
         # Create new user in database
-        db_user = UserDB(
-            name=user_data.name,
-            email=user_data.email,
-            profile_data=user_data.model_dump()  # Store complete profile as JSON
-        )
-        
-        db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        if GROUP_COMMIT_ENABLED:
+            # Hand the pooled connection back before waiting on the writer, which needs one too
+            await db.close()
+            user_id = await registration_writer.submit({
+                "name": user_data.name,
+                "email": user_data.email,
+                "profile_data": user_data.model_dump(),  # Store complete profile as JSON
+            })
+        else:
+            db_user = UserDB(
+                name=user_data.name,
+                email=user_data.email,
+                profile_data=user_data.model_dump()  # Store complete profile as JSON
+            )
+            db.add(db_user)
+            await db.flush()
+            user_id = db_user.id
+            for stmt, params in side_table_writes({user_id: db_user.profile_data}):
+                await db.execute(stmt, params)
+            await db.commit()
 
-        print(f"User saved to database with ID: {db_user.id}")
+        profile_cache.invalidate(user_id=user_id, email=user_data.email)
+        if not GROUP_COMMIT_ENABLED:
+            notify_profiles_saved({user_id: db_user.profile_data})
+        logger.info("User saved to database with ID: %s", user_id)
         
         return {
             "message": "Registration successful",
-            "user_id": db_user.id,
-            "user_name": db_user.name,
-            "user_email": db_user.email
+            "user_id": user_id,
+            "user_name": user_data.name,
+            "user_email": user_data.email
         }
         
     except HTTPException:
         raise
+    except (IntegrityError, DuplicateEmailError):
+        # Lost a race with a concurrent registration for the same email
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="User with this email already exists")
     except Exception as e:
-        print(f"Registration error: {str(e)}")
+        logger.exception("Registration error: %s", e)
         raise HTTPException(status_code=500, detail=f"Registration failed: {str(e)}")
+
+
+# --- Bulk registration ---
+
+# Rows per INSERT/commit in /registration/batch (also the email IN (...) lookup size)
+BATCH_CHUNK_SIZE = 500
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+def _iter_batch_rows(body: bytes, content_type: str) -> Iterator[Any]:
+    """Yield raw rows from a JSON array body, or line by line from an NDJSON body.
+
+    The body is read up front: Starlette's StreamingResponse also listens on
+    `receive`, so the request stream can't be consumed while results stream out.
+    """
+    if content_type in NDJSON_MEDIA_TYPES:
+        start = 0
+        while start < len(body):
+            end = body.find(b"\n", start)
+            if end == -1:
+                end = len(body)
+            line = body[start:end]
+            start = end + 1
+            if line.strip():
+                yield line
+        return
+
+    try:
+        rows = loads_json(body)
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of user profiles")
+    yield from rows
+
+
+def _parse_batch_row(row: Any) -> UserProfile:
+    if isinstance(row, bytes):
+        row = loads_json(row)
+    return UserProfile.model_validate(row)
+
+
+async def _register_chunk(
+    db: AsyncSession,
+    chunk: List[tuple],
+    seen_emails: set,
+) -> List[Dict[str, Any]]:
+    """Register one chunk: one IN (...) lookup, one multi-row INSERT, one commit."""
+    results: Dict[int, Dict[str, Any]] = {}
+    valid: List[tuple] = []
+    for index, row in chunk:
+        try:
+            profile = _parse_batch_row(row)
+        except ValidationError as e:
+            err = e.errors()[0]
+            loc = ".".join(str(part) for part in err["loc"]) or "row"
+            results[index] = {"index": index, "status": "invalid", "error": f"{loc}: {err['msg']}"}
+            continue
+        except ValueError as e:
+            results[index] = {"index": index, "status": "invalid", "error": str(e)}
+            continue
+        valid.append((index, profile))
+
+    # Two passes at most: if a concurrent writer takes one of our emails between the
+    # lookup and the INSERT, roll back and redo the lookup once.
+    for attempt in range(2):
+        emails = {p.email for _, p in valid}
+        existing = set()
+        if emails:
+            rows = await db.execute(select(UserDB.email).where(UserDB.email.in_(emails)))
+            existing = set(rows.scalars())
+
+        to_insert: List[tuple] = []
+        batch_emails = set()
+        for index, profile in valid:
+            if profile.email in existing or profile.email in seen_emails or profile.email in batch_emails:
+                results[index] = {"index": index, "status": "duplicate", "email": profile.email}
+                continue
+            batch_emails.add(profile.email)
+            to_insert.append((index, profile))
+
+        if not to_insert:
+            break
+        params = [
+            {"name": p.name, "email": p.email, "profile_data": p.model_dump()}
+            for _, p in to_insert
+        ]
+        try:
+            inserted = await db.execute(insert(UserDB).returning(UserDB.id, UserDB.email), params)
+            ids_by_email = {email: user_id for user_id, email in inserted}
+            profiles = {ids_by_email[row["email"]]: row["profile_data"] for row in params}
+            for stmt, side_params in side_table_writes(profiles):
+                await db.execute(stmt, side_params)
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            if attempt:
+                raise
+            continue
+        seen_emails.update(batch_emails)
+        for email, user_id in ids_by_email.items():
+            profile_cache.invalidate(user_id=user_id, email=email)
+        notify_profiles_saved(profiles)
+        for index, profile in to_insert:
+            results[index] = {
+                "index": index,
+                "status": "created",
+                "email": profile.email,
+                "user_id": ids_by_email.get(profile.email),
+            }
+        break
+
+    return [results[index] for index, _ in chunk]
+
+
+async def _stream_batch_registration(rows: Iterator[Any]) -> AsyncIterator[bytes]:
+    counts = {"created": 0, "duplicate": 0, "invalid": 0}
+    seen_emails: set = set()
+    chunk: List[tuple] = []
+    index = 0
+    async with AsyncSessionLocal() as db:
+        for row in rows:
+            chunk.append((index, row))
+            index += 1
+            if len(chunk) >= BATCH_CHUNK_SIZE:
+                for result in await _register_chunk(db, chunk, seen_emails):
+                    counts[result["status"]] += 1
+                    yield dumps_json(result) + b"\n"
+                chunk = []
+        if chunk:
+            for result in await _register_chunk(db, chunk, seen_emails):
+                counts[result["status"]] += 1
+                yield dumps_json(result) + b"\n"
+    logger.info("Batch registration finished: %s", counts)
+
+
+@app.post("/registration/batch")
+async def user_registration_batch(request: Request):
+    """Register many users from a JSON array or NDJSON body.
+
+    Streams one NDJSON result per input row, in input order:
+    {"index", "status": "created" | "duplicate" | "invalid", ...}
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    rows = _iter_batch_rows(await request.body(), content_type)
+    # Pull the first row eagerly so a malformed JSON body still gets a proper 400
+    try:
+        first = next(rows)
+    except StopIteration:
+        return StreamingResponse(iter(()), media_type="application/x-ndjson")
+
+    return StreamingResponse(_stream_batch_registration(itertools.chain([first], rows)), media_type="application/x-ndjson")
                 
        
 
 
 
+# --- User listing ---
+
+# Columns served straight from `users`; every other field is pulled out of profile_data
+USER_COLUMNS = {"id": UserDB.id, "name": UserDB.name, "email": UserDB.email}
+DEFAULT_USER_FIELDS = ("id", "name", "email")
+USERS_PAGE_MAX = 1000
+USERS_EXPORT_CHUNK = 1000
+
+
+def _parse_user_fields(fields: Optional[str]) -> List[str]:
+    if not fields:
+        return list(DEFAULT_USER_FIELDS)
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in names if f not in USER_COLUMNS and f not in UserProfile.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(["id", *names]))
+
+
+def _user_listing_query(fields: List[str], after_id: int, limit: int):
+    if PROFILE_CODEC.binary:
+        # Binary profile_data can't be json_extract()ed; fetch the blob and project in Python
+        columns = [UserDB.id, UserDB.name, UserDB.email, UserDB.profile_data]
+    else:
+        # json_extract per requested key: SQLite hands back only those fragments, so the
+        # rest of the profile blob is never decoded in Python
+        columns = [
+            USER_COLUMNS[f].label(f) if f in USER_COLUMNS
+            else func.json_quote(func.json_extract(UserDB.profile_data, f'$."{f}"')).label(f)
+            for f in fields
+        ]
+    return select(*columns).where(UserDB.id > after_id).order_by(UserDB.id).limit(limit)
+
+
+async def _fetch_user_page(db: AsyncSession, fields: List[str], after_id: int, limit: int) -> List[Dict[str, Any]]:
+    rows = (await db.execute(_user_listing_query(fields, after_id, limit))).mappings().all()
+    if PROFILE_CODEC.binary:
+        items = []
+        for row in rows:
+            profile = row["profile_data"] or {}
+            items.append({f: row[f] if f in USER_COLUMNS else profile.get(f) for f in fields})
+        return items
+    return [
+        {f: row[f] if f in USER_COLUMNS else loads_json(row[f]) for f in fields}
+        for row in rows
+    ]
+
+
+async def _stream_users(fields: List[str], after_id: int, limit: Optional[int]) -> AsyncIterator[bytes]:
+    remaining = limit
+    while remaining is None or remaining > 0:
+        chunk = USERS_EXPORT_CHUNK if remaining is None else min(USERS_EXPORT_CHUNK, remaining)
+        # Fresh session per chunk: no connection is held while the client drains the stream
+        async with AsyncSessionLocal() as db:
+            items = await _fetch_user_page(db, fields, after_id, chunk)
+        if not items:
+            break
+        yield b"".join(dumps_json(item) + b"\n" for item in items)
+        after_id = items[-1]["id"]
+        if remaining is not None:
+            remaining -= len(items)
+        if len(items) < chunk:
+            break
+
+
+@app.get("/users")
+async def list_users(
+    after_id: int = Query(0, ge=0, description="Keyset cursor: return users with id > after_id"),
+    limit: Optional[int] = Query(None, ge=1, description="Page size (default 100, max 1000); caps the export for ndjson"),
+    fields: Optional[str] = Query(None, description="Comma-separated UserProfile fields, e.g. name,skills,projects"),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    db: AsyncSession = Depends(get_db),
+):
+    """List users in id order with keyset pagination and field projection.
+
+    format=json returns one page plus `next_after_id` (null on the last page);
+    format=ndjson streams every matching user, one JSON object per line.
+    """
+    selected = _parse_user_fields(fields)
+    if format == "ndjson":
+        return StreamingResponse(_stream_users(selected, after_id, limit), media_type="application/x-ndjson")
+
+    page_size = min(limit or 100, USERS_PAGE_MAX)
+    items = await _fetch_user_page(db, selected, after_id, page_size)
+    return {
+        "items": items,
+        "next_after_id": items[-1]["id"] if len(items) == page_size else None,
+    }
+
+
+# --- Single profile reads (read-through profile_cache) ---
+
+async def _load_profile(db: AsyncSession, user_id: Optional[int] = None, email: Optional[str] = None) -> Optional[UserProfile]:
+    # Taken before the read: a write invalidated meanwhile makes put() skip this (possibly stale) row
+    generation = profile_cache.generation()
+    cached = profile_cache.get_by_id(user_id) if user_id is not None else profile_cache.get_by_email(email)
+    if cached is not None:
+        return cached
+    condition = UserDB.id == user_id if user_id is not None else UserDB.email == email
+    row = (await db.execute(select(UserDB.id, UserDB.profile_data).where(condition))).first()
+    if row is None:
+        return None
+    # profile_data from /registration carries id=None; the row id is authoritative
+    profile = UserProfile.model_validate({**(row.profile_data or {}), "id": row.id})
+    profile_cache.put(profile, generation)
+    return profile
+
+
+@app.get("/users/by-email/{email}")
+async def get_user_by_email(email: str, db: AsyncSession = Depends(get_db)):
+    profile = await _load_profile(db, email=email)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return profile
+
+
+@app.get("/users/{user_id}")
+async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
+    profile = await _load_profile(db, user_id=user_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return profile
+
+
+# --- Skill gaps across the user base (skill_matrix.SkillBitMatrix) ---
+
+def _require_skill_matrix():
+    if skill_matrix is None:
+        raise HTTPException(status_code=503, detail="Skill matrix is not enabled")
+    return skill_matrix
+
+
+def _parse_skills(skills: Optional[str]) -> Optional[List[str]]:
+    return [s.strip() for s in skills.split(",") if s.strip()] if skills else None
+
+
+@app.get("/skills/gaps")
+async def skill_gaps(skills: Optional[str] = Query(None, description="Comma-separated skills (default: trending skills)")):
+    """How many users lack each skill."""
+    matrix = _require_skill_matrix()
+    return {"users": matrix.users, "missing": matrix.gap_counts(_parse_skills(skills))}
+
+
+@app.get("/skills/{skill}/missing")
+async def users_missing_skill(
+    skill: str,
+    after_id: int = Query(0, ge=0, description="Keyset cursor: return user ids > after_id"),
+    limit: int = Query(1000, ge=1, le=USERS_PAGE_MAX * 10),
+):
+    """Ids of users lacking `skill`, in id order with keyset pagination."""
+    ids = _require_skill_matrix().users_missing(skill)
+    page = ids[ids > after_id][:limit].tolist()
+    return {"user_ids": page, "next_after_id": page[-1] if len(page) == limit else None}
+
+
 # Run the application
 if __name__ == "__main__":
     uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True)
\ No newline at end of file
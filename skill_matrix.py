@@ -0,0 +1,317 @@
+"""Whole-user-base skill gaps as bit operations.
+
+SkillBitMatrix gives every skill_vocab key a column and stores each user's
+skills as a packed row of uint64 words (64 skills per word). Rows are handed
+out in arrival order and found through an id -> row dict, with a row -> id
+array for turning query results back into ids, so storage follows the number
+of users rather than the largest id (deleted or sparse ids cost nothing).
+Rows freed by remove_user() are reused. The cost is 8 bytes per word, two flag
+bytes (active, has any skill) and an 8-byte id per row, plus the dict.
+
+"Does user u have skill s" is one AND against the word holding s's column.
+So "which trending skills is each user missing" and "how many users lack
+skill X" are single vectorized passes over one uint64 column. No per-user
+set is built.
+
+The matrix stays current through profile_index.PROFILE_SAVE_HOOKS (attach()).
+from_db() builds it from the user_skill side table rather than decoding
+profile_data.
+"""
+import sys
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError("numpy is required for the skill bit-matrix. Install with: pip install numpy") from e
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import trend_scrapping_node
+from metrics import REGISTRY
+from profile_index import PROFILE_SAVE_HOOKS, SKILL_TABLE, _field
+from skill_vocab import CANONICAL_SKILLS, canonical_skill, skill_key
+from table import SessionLocal, UserDB
+
+WORD_BITS = 64
+WORD_MASK = (1 << WORD_BITS) - 1
+NAME_CACHE_SIZE = 200_000
+
+
+class SkillBitMatrix:
+    """Packed user x skill membership matrix with vectorized gap queries."""
+
+    def __init__(self, skills: Iterable[str] = CANONICAL_SKILLS, capacity: int = 1024):
+        self._lock = threading.Lock()
+        self.columns: Dict[str, int] = {}  # skill_vocab key -> column
+        self.names: List[str] = []  # canonical display name per column
+        self._by_name: Dict[str, int] = {}
+        for name in skills:
+            self._column(name, create=True)
+        words = max(1, -(-len(self.names) // WORD_BITS))
+        self.bits = np.zeros((capacity, words), dtype=np.uint64)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.has_skills = np.zeros(capacity, dtype=bool)  # row has any bit set
+        self.row_ids = np.zeros(capacity, dtype=np.int64)  # row -> user id
+        self._rows: Dict[int, int] = {}  # user id -> row
+        self._free: List[int] = []  # rows released by remove_user
+        self._next_row = 0
+        self._ids_ascending = True  # row_ids increase with row, so row order is id order
+        self.users = 0
+        self.updates = 0
+        self._attached = False
+
+    # --- Columns and storage ---
+
+    def _column(self, name: str, create: bool = False) -> Optional[int]:
+        col = self._by_name.get(name)
+        if col is not None:
+            return col
+        key = skill_key(name)
+        col = self.columns.get(key)
+        if col is None:
+            if not create:
+                return None
+            col = self.columns[key] = len(self.names)
+            self.names.append(canonical_skill(name))
+        # Raw spelling -> column, so bulk loads skip skill_vocab after the first sighting
+        if len(self._by_name) >= NAME_CACHE_SIZE:
+            self._by_name.clear()
+        self._by_name[name] = col
+        return col
+
+    def _reserve(self, new_users: int) -> None:
+        # Caller holds self._lock; room for `new_users` more rows (doubling) and words as columns appear
+        rows, words = self.bits.shape
+        need_rows = self._next_row + max(0, new_users - len(self._free))
+        need_words = max(words, -(-len(self.names) // WORD_BITS))
+        if need_rows <= rows and need_words == words:
+            return
+        new_rows = max(rows, 1)
+        while new_rows < need_rows:
+            new_rows *= 2
+        bits = np.zeros((new_rows, need_words), dtype=np.uint64)
+        bits[:rows, :words] = self.bits
+        active = np.zeros(new_rows, dtype=bool)
+        active[:rows] = self.active
+        has_skills = np.zeros(new_rows, dtype=bool)
+        has_skills[:rows] = self.has_skills
+        row_ids = np.zeros(new_rows, dtype=np.int64)
+        row_ids[:rows] = self.row_ids
+        self.bits, self.active, self.has_skills, self.row_ids = bits, active, has_skills, row_ids
+
+    def _row_indices(self, user_ids: Iterable[int]) -> np.ndarray:
+        # Caller holds self._lock and has reserved room; assigns rows to unseen ids
+        index = self._rows
+        out = []
+        for user_id in user_ids:
+            row = index.get(user_id)
+            if row is None:
+                if self._free:
+                    row = self._free.pop()
+                    self._ids_ascending = False
+                else:
+                    row = self._next_row
+                    self._next_row += 1
+                    if row and user_id < self.row_ids[row - 1]:
+                        self._ids_ascending = False
+                index[user_id] = row
+                self.row_ids[row] = user_id
+            out.append(row)
+        return np.array(out, dtype=np.intp)
+
+    def _set_rows(self, rows: Dict[int, Iterable[str]]) -> None:
+        # rows: user_id -> raw skill names; unseen skills get a new column
+        if not rows:
+            return
+        with self._lock:
+            column = self._column
+            masks = []
+            for skills in rows.values():
+                mask = 0
+                for name in skills:
+                    mask |= 1 << column(name, create=True)
+                masks.append(mask)
+            self._reserve(sum(1 for user_id in rows if user_id not in self._rows))
+            ids = self._row_indices(rows)
+            words = self.bits.shape[1]
+            if words == 1:
+                packed = np.array(masks, dtype=np.uint64).reshape(-1, 1)
+            else:
+                packed = np.array(
+                    [[(m >> (WORD_BITS * w)) & WORD_MASK for w in range(words)] for m in masks], dtype=np.uint64
+                )
+            self.users += len(rows) - int(np.count_nonzero(self.active[ids]))
+            self.bits[ids] = packed
+            self.active[ids] = True
+            self.has_skills[ids] = [m != 0 for m in masks]
+            self.updates += len(rows)
+
+    # --- Updates ---
+
+    def set_user(self, user_id: int, skills: Iterable[str]) -> None:
+        """Replace one user's skills (raw names; skill_vocab folds the spellings)."""
+        self._set_rows({user_id: [s for s in skills if s]})
+
+    def update_profiles(self, profiles: Dict[int, Dict[str, Any]]) -> None:
+        """Replace the rows for {user_id: profile_data}; this is the profile save hook."""
+        rows: Dict[int, List[str]] = {}
+        for user_id, profile_data in profiles.items():
+            names = (_field(entry, "skill_name") for entry in (profile_data or {}).get("skills") or [])
+            rows[user_id] = [name for name in names if name]
+        self._set_rows(rows)
+
+    def remove_user(self, user_id: int) -> None:
+        with self._lock:
+            row = self._rows.pop(user_id, None)
+            if row is not None:
+                self.bits[row] = 0
+                self.active[row] = False
+                self.has_skills[row] = False
+                self._free.append(row)
+                self.users -= 1
+
+    def attach(self) -> "SkillBitMatrix":
+        """Keep the matrix current on every committed profile write and export its metrics."""
+        if not self._attached:
+            PROFILE_SAVE_HOOKS.append(self.update_profiles)
+            REGISTRY.register_collector(self._collect)
+            self._attached = True
+        return self
+
+    def detach(self) -> None:
+        if self._attached:
+            PROFILE_SAVE_HOOKS.remove(self.update_profiles)
+            REGISTRY.unregister_collector(self._collect)
+            self._attached = False
+
+    @classmethod
+    def from_db(cls, db: Optional[Session] = None, chunk_size: int = 50_000) -> "SkillBitMatrix":
+        """Build from users + user_skill, keyset-paged by user id."""
+        matrix = cls()
+        own_session = db is None
+        db = db or SessionLocal()
+        try:
+            last_id = 0
+            while True:
+                ids = db.execute(
+                    select(UserDB.id).where(UserDB.id > last_id).order_by(UserDB.id).limit(chunk_size)
+                ).scalars().all()
+                if not ids:
+                    break
+                rows: Dict[int, List[str]] = {user_id: [] for user_id in ids}
+                skills = db.execute(
+                    select(SKILL_TABLE.c.user_id, SKILL_TABLE.c.skill_name)
+                    .where(SKILL_TABLE.c.user_id > last_id, SKILL_TABLE.c.user_id <= ids[-1])
+                )
+                for user_id, name in skills:
+                    if name:
+                        rows[user_id].append(name)
+                matrix._set_rows(rows)
+                last_id = ids[-1]
+        finally:
+            if own_session:
+                db.close()
+        return matrix
+
+    # --- Queries ---
+
+    def _gather(self, skills: Sequence[str], with_skills_only: bool = False) -> Tuple[np.ndarray, List[Optional[np.ndarray]], List[int]]:
+        # Active user ids (row order), plus their copy of each word the skills live in (None for unknown skills)
+        cols = [self._column(skill) for skill in skills]
+        with self._lock:
+            rows = np.flatnonzero(self.has_skills if with_skills_only else self.active)
+            ids = self.row_ids[rows]
+            words = {col // WORD_BITS: self.bits[rows, col // WORD_BITS] for col in cols if col is not None}
+        return ids, [None if col is None else words[col // WORD_BITS] for col in cols], cols
+
+    @staticmethod
+    def _lacks(word: Optional[np.ndarray], col: Optional[int], n: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+        if word is None:
+            if out is None:
+                return np.ones(n, dtype=bool)
+            out[:] = True
+            return out
+        return np.equal(word & np.uint64(1 << (col % WORD_BITS)), 0, out=out)
+
+    def has_skill(self, user_id: int, skill: str) -> bool:
+        col = self._column(skill)
+        row = self._rows.get(user_id)
+        if col is None or row is None:
+            return False
+        word, bit = divmod(col, WORD_BITS)
+        return bool(int(self.bits[row, word]) >> bit & 1)
+
+    def user_skills(self, user_id: int) -> List[str]:
+        row = self._rows.get(user_id)
+        if row is None:
+            return []
+        words = self.bits[row].tolist()
+        return [name for col, name in enumerate(self.names) if words[col // WORD_BITS] >> (col % WORD_BITS) & 1]
+
+    def missing(self, skills: Optional[Sequence[str]] = None, with_skills_only: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """(user_ids, missing) where missing[i, j] is True if user_ids[i] lacks skills[j].
+
+        `skills` defaults to the published trending skills. With `with_skills_only`
+        users who list no skills at all are left out (the suggest_next_steps gap
+        rule only fires for users with skills).
+        """
+        skills = tuple(skills if skills is not None else trend_scrapping_node.TRENDING_SKILLS)
+        ids, words, cols = self._gather(skills, with_skills_only)
+        # Column-major so each skill's pass writes contiguous memory
+        out = np.empty((len(skills), len(ids)), dtype=bool)
+        for j, (word, col) in enumerate(zip(words, cols)):
+            self._lacks(word, col, len(ids), out=out[j])
+        return ids, out.T
+
+    def count_missing(self, skill: str) -> int:
+        """How many users lack `skill`."""
+        col = self._column(skill)
+        with self._lock:
+            if col is None:
+                return self.users
+            # Inactive rows are all zero, so counting holders needs no active mask
+            held = np.count_nonzero(self.bits[:, col // WORD_BITS] & np.uint64(1 << (col % WORD_BITS)))
+            return self.users - int(held)
+
+    def gap_counts(self, skills: Optional[Sequence[str]] = None) -> Dict[str, int]:
+        """Users lacking each skill (default: the trending skills)."""
+        skills = skills if skills is not None else trend_scrapping_node.TRENDING_SKILLS
+        return {skill: self.count_missing(skill) for skill in skills}
+
+    def users_missing(self, skill: str) -> np.ndarray:
+        """Ids of the users lacking `skill`, ascending."""
+        ids, (word,), (col,) = self._gather((skill,))
+        ids = ids[self._lacks(word, col, len(ids))]
+        return ids if self._ids_ascending else np.sort(ids)
+
+    def skill_counts(self) -> Dict[str, int]:
+        """Users holding each column's skill."""
+        with self._lock:
+            bits = self.bits
+            return {
+                name: int(np.count_nonzero(bits[:, col // WORD_BITS] & np.uint64(1 << (col % WORD_BITS))))
+                for col, name in enumerate(self.names)
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            nbytes = self.bits.nbytes + self.active.nbytes + self.has_skills.nbytes + self.row_ids.nbytes
+            nbytes += sys.getsizeof(self._rows)  # the dict's table, not its int keys
+            return {
+                "users": self.users,
+                "skills": len(self.names),
+                "words_per_user": self.bits.shape[1],
+                "capacity": len(self.active),
+                "nbytes": nbytes,
+                "bytes_per_user": nbytes / self.users if self.users else 0.0,
+                "updates": self.updates,
+            }
+
+    def _collect(self):
+        stats = self.stats()
+        yield ("lakshsetu_skill_matrix_users", "gauge", "Users indexed in the skill bit-matrix", [({}, stats["users"])])
+        yield ("lakshsetu_skill_matrix_bytes", "gauge", "Memory held by the skill bit-matrix", [({}, stats["nbytes"])])
+        yield ("lakshsetu_skill_matrix_updates_total", "counter", "User rows written to the skill bit-matrix", [({}, stats["updates"])])
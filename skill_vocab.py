@@ -0,0 +1,142 @@
+"""Canonical skill vocabulary: "ML", "machine-learning" and "Machine Learning" are one skill.
+
+Raw skill strings (GitHub languages, LinkedIn skills, Hugging Face tasks/tags,
+trend tables) are folded to a lookup key: casefolded, with whitespace, "-", "_",
+"." and "/" dropped ("Node.js" -> "nodejs", "CI/CD" -> "cicd"). Every alias of
+every canonical skill is compiled into one dict from key to canonical name, so a
+lookup is one normalization plus one hash probe. Skills outside the vocabulary
+keep their own spelling and key.
+
+Results are cached per raw string, which is where the time goes for the large,
+highly repetitive inputs alignment and indexing see.
+
+`version` fingerprints the compiled keys; user_skill rows written under another
+version are re-keyed at start-up (profile_index.ensure_skill_index_current).
+"""
+import hashlib
+import re
+from typing import Dict, Iterable, Optional, Tuple
+
+# canonical name -> aliases (the canonical name itself is always an alias).
+# Aliases are other spellings or abbreviations of the same skill only: no
+# umbrella terms ("cloud", "security") and no member-of mappings (AWS is not
+# "Cloud Computing", text-classification is not "NLP"). Two profile skills
+# with one key are merged, so a loose alias deletes information.
+CANONICAL_SKILLS: Dict[str, Tuple[str, ...]] = {
+    # Languages (GitHub primary_language spellings)
+    "Python": ("py", "python3", "python 3"),
+    "JavaScript": ("js", "ecmascript"),
+    "TypeScript": ("ts",),
+    "C++": ("cpp", "cplusplus", "c plus plus"),
+    "C#": ("csharp", "c sharp"),
+    "Go": ("golang",),
+    "Rust": ("rustlang",),
+    "Java": (),
+    "Kotlin": (),
+    "Swift": (),
+    "R": ("r language", "rlang"),
+    "SQL": ("structured query language",),
+    "Shell": ("shell scripting", "shell script"),
+    "HTML": ("html5",),
+    "CSS": ("css3",),
+    "Jupyter Notebook": ("jupyter", "jupyter notebooks", "ipynb"),
+    # Frameworks / libraries / platforms
+    "Node.js": ("node", "nodejs"),
+    "React": ("react.js", "reactjs"),
+    "Django": (),
+    "FastAPI": (),
+    "PyTorch": ("torch",),
+    "TensorFlow": (),
+    "Transformers": ("hugging face transformers", "huggingface transformers"),
+    "scikit-learn": ("sklearn", "scikit learn"),
+    "Pandas": (),
+    "NumPy": (),
+    "Docker": (),
+    "Kubernetes": ("k8s",),
+    "AWS": ("amazon web services",),
+    "GCP": ("google cloud platform",),
+    "Azure": ("microsoft azure",),
+    "Git": (),
+    # Fields (LinkedIn skills, trend tables)
+    "Machine Learning": ("ml", "machine learning (ml)", "ai/ml", "ai & ml"),
+    "Deep Learning": ("dl",),
+    "Generative AI": ("genai", "gen ai", "generative artificial intelligence"),
+    "Large Language Models": ("llm", "llms"),
+    "NLP": ("natural language processing",),
+    "Computer Vision": (),
+    "MLOps": ("ml ops", "machine learning operations"),
+    "Data Engineering": (),
+    "Data Science": (),
+    "Cloud-Native": ("cloud native",),
+    "Cloud Computing": (),
+    "DevOps": ("dev ops",),
+    "CI/CD": ("continuous integration and continuous delivery",),
+    "Cybersecurity": ("cyber security",),
+    "Information Security": ("infosec",),
+    "Distributed Systems": (),
+    "Software Engineering": (),
+}
+
+_DROP = re.compile(r"[\s\-_./]+")
+
+
+def normalize(raw: str) -> str:
+    """Lookup key for a raw skill string (no vocabulary applied)."""
+    return _DROP.sub("", str(raw).casefold())
+
+
+class SkillVocabulary:
+    """Compiled alias index over a canonical vocabulary."""
+
+    def __init__(self, canonical: Dict[str, Iterable[str]], cache_size: int = 200_000):
+        self.index: Dict[str, str] = {}
+        for name, aliases in canonical.items():
+            for alias in (name, *aliases):
+                key = normalize(alias)
+                other = self.index.setdefault(key, name)
+                if other != name:
+                    raise ValueError(f"Skill alias {alias!r} maps to both {other!r} and {name!r}")
+        self.version = hashlib.blake2b(
+            repr((_DROP.pattern, sorted(self.index.items()))).encode(), digest_size=8
+        ).hexdigest()
+        self.cache_size = cache_size
+        # raw string -> (key, display name)
+        self._cache: Dict[str, Tuple[str, str]] = {}
+
+    def _resolve(self, raw: str) -> Tuple[str, str]:
+        hit = self._cache.get(raw)
+        if hit is not None:
+            return hit
+        key = normalize(raw)
+        name = self.index.get(key)
+        if name is not None:
+            hit = (normalize(name), name)
+        else:
+            hit = (key, " ".join(str(raw).split()))
+        if len(self._cache) >= self.cache_size:
+            self._cache.clear()
+        self._cache[raw] = hit
+        return hit
+
+    def key(self, raw: str) -> str:
+        """Match key: equal for any two spellings of the same skill."""
+        return self._resolve(raw)[0]
+
+    def canonical(self, raw: str) -> str:
+        """Display name: the canonical spelling, or the raw string tidied if unknown."""
+        return self._resolve(raw)[1]
+
+    def lookup(self, raw: str) -> Optional[str]:
+        """Canonical name if `raw` is in the vocabulary, else None."""
+        return self.index.get(normalize(raw))
+
+
+VOCABULARY = SkillVocabulary(CANONICAL_SKILLS)
+
+
+def skill_key(raw: str) -> str:
+    return VOCABULARY.key(raw)
+
+
+def canonical_skill(raw: str) -> str:
+    return VOCABULARY.canonical(raw)
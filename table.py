@@ -1,13 +1,82 @@
-from sqlalchemy import create_engine, Column, Integer, String, JSON
+import os
+
+from sqlalchemy import create_engine, event, Column, DateTime, ForeignKey, Index, Integer, LargeBinary, String
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+from metrics import instrument_engine
+from profile_codec import ProfileData
+
+
+# Point at another SQLite file (e.g. a temp DB for benchmarks) with LAKSHSETU_DB_PATH
+DATABASE_PATH = os.getenv("LAKSHSETU_DB_PATH", "./users.db")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
+ASYNC_SQLALCHEMY_DATABASE_URL = f"sqlite+aiosqlite:///{DATABASE_PATH}"
+
+# Async pool for the API server; each pooled aiosqlite connection runs on its own thread.
+# SQLite allows a single writer, so a small pool queues waiters in asyncio instead of
+# leaving them in SQLite's sleeping busy handler.
+ASYNC_POOL_SIZE = int(os.getenv("LAKSHSETU_DB_POOL_SIZE", "4"))
+ASYNC_MAX_OVERFLOW = int(os.getenv("LAKSHSETU_DB_MAX_OVERFLOW", "0"))
+
+# SQLite storage profile applied to every new connection (sync and async engines).
+#   "default": SQLite's stock settings (rollback journal, synchronous=FULL)
+#   "wal":     WAL journal so readers don't wait on the writer, synchronous=NORMAL
+#              (fsync at checkpoints, not every commit), memory-mapped reads and a larger page cache
+SQLITE_PROFILES = {
+    "default": {},
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,  # negative = KiB, i.e. 64 MiB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+SQLITE_PROFILE = os.getenv("LAKSHSETU_SQLITE_PROFILE", "wal")
+if SQLITE_PROFILE not in SQLITE_PROFILES:
+    raise ValueError(f"Unknown LAKSHSETU_SQLITE_PROFILE {SQLITE_PROFILE!r}; expected one of {sorted(SQLITE_PROFILES)}")
+
+# Group commit for /registration (see write_queue.py): an insert waits at most
+# GROUP_COMMIT_WINDOW_MS so concurrent inserts can share one commit (up to GROUP_COMMIT_MAX_BATCH rows)
+GROUP_COMMIT_ENABLED = os.getenv("LAKSHSETU_GROUP_COMMIT", "1") == "1"
+GROUP_COMMIT_WINDOW_MS = float(os.getenv("LAKSHSETU_GROUP_COMMIT_WINDOW_MS", "5"))
+GROUP_COMMIT_MAX_BATCH = int(os.getenv("LAKSHSETU_GROUP_COMMIT_MAX_BATCH", "256"))
+
+
+def _apply_sqlite_profile(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma, value in SQLITE_PROFILES[SQLITE_PROFILE].items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+    finally:
+        cursor.close()
 
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./users.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+event.listen(engine, "connect", _apply_sqlite_profile)
+instrument_engine(engine, "sync")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Non-blocking path used by the FastAPI handlers (server.get_db)
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    pool_size=ASYNC_POOL_SIZE,
+    max_overflow=ASYNC_MAX_OVERFLOW,
+)
+
+event.listen(async_engine.sync_engine, "connect", _apply_sqlite_profile)
+instrument_engine(async_engine.sync_engine, "async")
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 
 
 Base = declarative_base()
@@ -17,7 +86,73 @@ class UserDB(Base):
     id = Column(Integer, primary_key=True)
     name = Column(String)
     email = Column(String, unique=True)
-    profile_data = Column(JSON) 
+    profile_data = Column(ProfileData)  # codec set by LAKSHSETU_PROFILE_CODEC (profile_codec.py)
+
+
+# Normalized child tables kept in sync with profile_data on every save (see profile_index.py),
+# so "who has skill X" / "who lacks certifications" are index lookups instead of JSON scans.
+
+class UserSkillDB(Base):
+    __tablename__ = 'user_skill'
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    skill = Column(String, nullable=False)  # lookup key (normalized)
+    skill_name = Column(String)  # as written in the profile
+    __table_args__ = (Index('ix_user_skill_skill_user', 'skill', 'user_id'),)
+
+
+class UserProjectDB(Base):
+    __tablename__ = 'user_project'
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    project = Column(String, nullable=False)  # lookup key (normalized)
+    name = Column(String)
+    link = Column(String)
+    __table_args__ = (Index('ix_user_project_project_user', 'project', 'user_id'),)
+
+
+class UserCertificationDB(Base):
+    __tablename__ = 'user_certification'
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    certification = Column(String, nullable=False)  # lookup key (normalized)
+    title = Column(String)
+    issuer = Column(String)
+    __table_args__ = (Index('ix_user_certification_certification_user', 'certification', 'user_id'),)
+
+
+# Durable AgentState (see checkpoint_store.py): one row per user per state field,
+# rewritten only when the field's content hash changes.
+
+class AgentStateFieldDB(Base):
+    __tablename__ = 'agent_state_field'
+    user_key = Column(String, primary_key=True)
+    field = Column(String, primary_key=True)
+    digest = Column(String, nullable=False)  # blake2b-128 of payload, hex
+    payload = Column(LargeBinary, nullable=False)  # JSON
+
+
+# Progress of batch_runner.py runs; last_user_id is the resume point after a crash
+# (every user with a smaller id has been processed and written back).
+
+class BatchRunDB(Base):
+    __tablename__ = 'batch_run'
+    id = Column(Integer, primary_key=True)
+    started_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime)
+    last_user_id = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+
+
+# Versions of data derived from profile_data, e.g. the skill vocabulary user_skill.skill
+# keys were written with (see profile_index.ensure_skill_index_current).
+
+class IndexMetaDB(Base):
+    __tablename__ = 'index_meta'
+    key = Column(String, primary_key=True)
+    value = Column(String, nullable=False)
 
 
 Base.metadata.create_all(bind=engine)
@@ -0,0 +1,23 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# table.py creates its SQLite file on import: point it at a throwaway one before any
+# test module imports the repo (the flat modules live in the repo root)
+os.environ["LAKSHSETU_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="lakshsetu-tests-"), "users.db")
+os.environ.setdefault("LAKSHSETU_LOG_LEVEL", "WARNING")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def client():
+    """TestClient for server.app with its lifespan run (the tests share one temp DB: use unique emails)."""
+    from fastapi.testclient import TestClient
+
+    import server
+
+    with TestClient(server.app) as test_client:
+        yield test_client
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+
+from agent import agent_config, build_agent, resume_agent, run_steps, suspended_until
+from metrics import AGENT_NODE_SECONDS
+from schemas import UserProfile
+
+CITY_QUESTION = "What's your current city and country?"
+
+
+def test_idle_user_suspends_until_next_run():
+    user = UserProfile(id=101, email="graph@example.com", name="Graph", projects=[])
+    app, state = build_agent(user, schedule_interval_days=7)
+    config = agent_config(user)
+
+    state = app.invoke(state, config)
+    resume_at = suspended_until(app, config)
+    assert resume_at == state["next_user_processing_at"]
+    assert resume_at > datetime.now() + timedelta(days=6)
+
+    processed = AGENT_NODE_SECONDS.count("user_processing")
+    interactions = AGENT_NODE_SECONDS.count("user_interaction")
+    state = resume_agent(app, config, {"type": "answer", "answers": {CITY_QUESTION: "Pune, India"}})
+    assert state["user"].location == "Pune, India"
+    # An answer re-runs only the interaction, then the user is suspended again
+    assert AGENT_NODE_SECONDS.count("user_processing") == processed
+    assert AGENT_NODE_SECONDS.count("user_interaction") == interactions + 1
+    assert suspended_until(app, config) == resume_at
+
+
+def test_timer_before_due_does_not_reprocess():
+    user = UserProfile(id=102, email="timer@example.com", name="Timer", projects=[])
+    app, state = build_agent(user)
+    config = agent_config(user)
+    run_steps(app, state, config=config)
+    processed = AGENT_NODE_SECONDS.count("user_processing")
+
+    resume_agent(app, config)  # early timer: nothing is due yet
+    assert AGENT_NODE_SECONDS.count("user_processing") == processed
+    assert suspended_until(app, config) is not None
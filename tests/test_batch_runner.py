@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+import tracing
+from batch_runner import BatchRunner
+
+
+@pytest.fixture
+def users(client):
+    for i in range(4):
+        resp = client.post("/registration", json={"email": f"pool{i}@example.com", "name": f"Pool {i}", "skills": ["Python"]})
+        assert resp.status_code == 200
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    path = tmp_path / "trace-{pid}.json"
+    # Both, so spawned workers (which re-import tracing) and forked ones trace alike
+    monkeypatch.setenv("LAKSHSETU_TRACE_FILE", str(path))
+    monkeypatch.setattr(tracing, "TRACE_FILE", str(path))
+    tracing.enable()
+    yield tmp_path
+    tracing.disable()
+
+
+def test_pool_workers_write_their_spans(users, trace_file):
+    summary = BatchRunner(workers=2, chunk_size=1).run()
+    assert summary["processed"] >= 4 and summary["failed"] == 0
+
+    files = list(trace_file.glob("trace-*.json"))
+    assert 1 <= len(files) <= 2
+    spans = [e for f in files for e in json.loads(f.read_text())["traceEvents"] if e["ph"] == "X"]
+    assert sum(1 for e in spans if e["name"] == "user_processing") == summary["processed"]
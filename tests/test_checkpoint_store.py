@@ -0,0 +1,41 @@
+import httpx
+import pytest
+
+import agent
+from checkpoint_store import FIELD_DECODERS, AgentCheckpointStore, state_key
+from ingestion import SOURCE_SPECS, HttpSourceFetcher, Ingestion, stub_app
+from schemas import UserProfile
+
+
+@pytest.fixture
+def cycle_state(monkeypatch):
+    # A real run_cycle with stub ingestion, so extracts/ingestion/aligned_through are all populated
+    store = AgentCheckpointStore()
+    ingestion = Ingestion(
+        [HttpSourceFetcher(spec, "http://stub") for spec in SOURCE_SPECS.values()],
+        transport=httpx.ASGITransport(app=stub_app()),
+    )
+    monkeypatch.setattr(agent, "INGESTION", ingestion)
+    monkeypatch.setattr(agent, "CHECKPOINT_STORE", store)
+    user = UserProfile(id=41, email="ckpt@example.com", name="Ckpt", github="ckpt", linkedin="ckpt", x="ckpt", skills=["Python"])
+    state = agent.run_cycle(agent.initial_state(user))
+    yield store, state
+    store.close()
+
+
+def test_run_cycle_state_round_trips(cycle_state):
+    store, state = cycle_state
+    state["pending_event"] = {"type": "profile_edit", "user": state["user"]}
+    store.save(state)
+
+    restored = store.load(state_key(state))
+    assert set(state) <= set(FIELD_DECODERS)
+    assert restored == state
+    assert restored["extracts"] and restored["ingestion"]
+    assert isinstance(restored["pending_event"]["user"], UserProfile)
+
+    # Nothing changed, so nothing is rewritten; restore_all decodes the same way
+    assert store.save(restored) == 0
+    fresh = AgentCheckpointStore()
+    assert fresh.restore_all()[state_key(state)] == state
+    fresh.close()
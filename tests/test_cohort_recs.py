@@ -0,0 +1,46 @@
+import pytest
+
+import trend_scrapping_node
+from cohort_recs import CohortFrame, suggest_next_steps_batch, synthetic_cohort
+from rule_engine import RULES, RuleEngine
+from trend_scrapping_node import suggest_next_steps
+
+# Exercises the per-user fallback ("in" on a string column), "not", "any" and a recommendation cap
+CUSTOM_RULESET = {
+    "version": "test",
+    "max_recommendations": 2,
+    "rules": [
+        {"id": "busy", "when": {"any": [["repo_count", ">=", 3], ["linkedin_connections", ">", 500]]}, "title": "Busy", "description": "busy"},
+        {"id": "named", "when": ["most_recent_repo", "in", ["repo-0", "repo-1"]], "title": "Named {most_recent_repo}", "description": "named"},
+        {"id": "quiet", "when": {"not": "has_linkedin"}, "title": "Quiet", "description": "quiet"},
+        {"id": "gaps", "when": ["trending_gap_count", ">=", 2], "title": "Gaps: {trending_gaps|join:2}", "description": "gaps"},
+    ],
+}
+
+
+@pytest.fixture(scope="module")
+def users():
+    return [list(col) for col in zip(*synthetic_cohort(300, repos=5, seed=3))]
+
+
+def test_default_rules_match_suggest_next_steps(users):
+    profiles, githubs, linkedins = users
+    expected = [suggest_next_steps(u, g, l) for u, g, l in zip(profiles, githubs, linkedins)]
+    assert suggest_next_steps_batch(profiles, githubs, linkedins) == expected
+    frame = CohortFrame(profiles, githubs, linkedins)
+    assert frame.plan is RULES.plan
+    assert [frame.recommendations_for(i) for i in range(len(profiles))] == expected
+
+
+def test_custom_rules_match_engine(users):
+    profiles, githubs, linkedins = users
+    engine = RuleEngine(ruleset=CUSTOM_RULESET)
+    trending = trend_scrapping_node.TRENDING_SKILLS
+    expected = [engine.evaluate(u, g, l, trending=trending) for u, g, l in zip(profiles, githubs, linkedins)]
+    assert any(len(recs) == 2 for recs in expected)
+
+    frame = CohortFrame(profiles, githubs, linkedins, engine=engine)
+    assert frame.recommendations() == expected
+    # Descriptions are the rule ids
+    fired = [r.description for recs in expected for r in recs]
+    assert frame.rule_counts() == {rule["id"]: fired.count(rule["id"]) for rule in CUSTOM_RULESET["rules"]}
@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from ingestion import _stub_payload
+from schemas import DataSource, GitHubUserExtract, HuggingFaceModelExtract, LinkedInProfileExtract, UserProfile
+from trend_scrapping_node import PROFILE_REPO_LIMIT, align_extractions_with_profile, diff_extractions
+
+T0 = datetime(2026, 1, 1)
+LANGUAGES = ["Python", "Go", "Rust", "Haskell", None]
+
+
+def github_extract(repo_count, fetched_at=T0, updated=None):
+    payload = _stub_payload(DataSource.github, "octo")
+    payload["meta"]["fetched_at"] = fetched_at
+    payload["repositories"] = [
+        {
+            "name": f"repo-{i}",
+            "description": f"Repository {i}",
+            "url": f"https://github.com/octo/repo-{i}",
+            "primary_language": LANGUAGES[i % len(LANGUAGES)],
+            "last_updated": (updated or {}).get(i, T0 - timedelta(days=i)),
+            "metrics": {"stars": i, "forks": i % 3},
+        }
+        for i in range(repo_count)
+    ]
+    return GitHubUserExtract.model_validate(payload)
+
+
+def extracts():
+    linkedin = LinkedInProfileExtract.model_validate(_stub_payload(DataSource.linkedin, "octo"))
+    hf_models = [HuggingFaceModelExtract.model_validate(m) for m in _stub_payload(DataSource.huggingface, "octo")]
+    return linkedin, hf_models
+
+
+@pytest.fixture
+def user():
+    return UserProfile(
+        id=5, email="delta@example.com", name="Delta", skills=["python", "Kubernetes"],
+        projects=[{"name": "Repo-1", "description": "Existing", "technologies": ["Docker"]}],
+    )
+
+
+@pytest.mark.parametrize("repo_count", [3, PROFILE_REPO_LIMIT + 5])
+def test_first_delta_matches_full_alignment(user, repo_count):
+    github = github_extract(repo_count)
+    linkedin, hf_models = extracts()
+    full = align_extractions_with_profile(user, github=github, linkedin=linkedin, hf_models=hf_models)
+
+    delta = user.model_copy(deep=True)
+    diff_extractions(delta, github=github, linkedin=linkedin, hf_models=hf_models).apply(delta)
+    assert delta.model_dump() == full.model_dump()
+
+
+@pytest.mark.parametrize("repo_count", [3, PROFILE_REPO_LIMIT + 5])
+def test_later_delta_matches_realigning(user, repo_count):
+    first = align_extractions_with_profile(user, github=github_extract(repo_count))
+    # Next fetch: repo 0 switched language and repo 2 was touched
+    later = github_extract(repo_count, T0 + timedelta(days=1), updated={0: T0 + timedelta(hours=1), 2: T0 + timedelta(hours=2)})
+    later.repositories[0].primary_language = "Elixir"
+
+    full = align_extractions_with_profile(first, github=later)
+    delta = first.model_copy(deep=True)
+    patch = diff_extractions(delta, github=later, since={"github": T0})
+    patch.apply(delta)
+    assert delta.model_dump() == full.model_dump()
+    assert patch.fetched_at["github"] == T0 + timedelta(days=1)
@@ -0,0 +1,61 @@
+import gzip
+import json
+
+from extract_stream import ExtractStreamIngestor, StreamStats, group_by_user, read_lines, validate_chunks
+from ingestion import _stub_payload
+from profile_index import save_user_profile
+from schemas import DataSource, UserProfile
+from table import SessionLocal, UserDB
+
+
+def record(key, source, extract=None):
+    extract = _stub_payload(DataSource(source), f"u{key}") if extract is None else extract
+    envelope = {"email": key} if isinstance(key, str) else {"user_id": key}
+    return json.dumps({**envelope, "source": source, "extract": extract}, default=str).encode()
+
+
+def test_chunks_keep_valid_records_next_to_invalid_ones():
+    lines = [
+        record(1, "github"),
+        b"{not json",
+        record(1, "github", {"repositories": []}),  # no username/meta
+        record(1, "x"),  # not used by alignment
+        record(2, "huggingface"),
+        json.dumps({"source": "github", "extract": {}}).encode(),  # no user
+        record(2, "linkedin"),
+    ]
+    stats = StreamStats()
+    chunks = list(validate_chunks(lines, chunk_size=3, stats=stats))
+    assert [[(key, source.value) for key, source, _ in chunk] for chunk in chunks] == [
+        [(1, "github")],
+        [(2, "huggingface")],
+        [(2, "linkedin")],
+    ]
+    assert (stats.records, stats.invalid, stats.skipped) == (7, 3, 1)
+
+
+def test_groups_span_chunk_boundaries():
+    lines = [record(1, "github"), record(1, "huggingface"), record(1, "huggingface"), record("b@example.com", "linkedin")]
+    groups = list(group_by_user(validate_chunks(lines, chunk_size=2)))
+    assert [g.key for g in groups] == [1, "b@example.com"]
+    assert groups[0].github.username == "u1" and len(groups[0].hf_models) == 2
+    assert groups[1].linkedin is not None
+
+
+def test_ingestor_aligns_gzip_dump(tmp_path):
+    user_id = save_user_profile(UserProfile(email="stream@example.com", name="Stream", skills=["SQL"]))
+    dump = tmp_path / "dump.jsonl"
+    with gzip.open(dump, "wb") as f:
+        f.write(b"\n".join([record(user_id, "github"), record("stream@example.com", "linkedin"), record(10**9, "github")]) + b"\n")
+    assert list(read_lines([str(dump)]))[0].startswith(b'{"user_id"')
+
+    dry = ExtractStreamIngestor(chunk_size=2, dry_run=True).run([str(dump)])
+    assert (dry["users"], dry["unknown_users"], dry["written"]) == (2, 1, 0)
+
+    summary = ExtractStreamIngestor(chunk_size=2).run([str(dump)])
+    # The id and email records are the same user: written once, with both extracts
+    assert (summary["users"], summary["written"], summary["failed"]) == (2, 1, 0)
+    with SessionLocal() as db:
+        profile = UserProfile.model_validate(db.get(UserDB, user_id).profile_data)
+    assert {p.name for p in profile.projects} == {f"u{user_id}-repo-{i}" for i in range(3)}
+    assert {s.skill_name for s in profile.skills} >= {"SQL", "Python", "Docker"}
@@ -0,0 +1,86 @@
+import asyncio
+
+import httpx
+import pytest
+
+from ingestion import SOURCE_SPECS, HttpSourceFetcher, Ingestion, account_handle, stub_app
+from schemas import DataSource, UserProfile
+
+
+class CrashingFetcher:
+    source = DataSource.x
+
+    async def fetch(self, client, handle):
+        raise KeyError("fetcher bug")
+
+
+@pytest.fixture
+def ingestion():
+    fetchers = [HttpSourceFetcher(SOURCE_SPECS[s], "http://stub") for s in (DataSource.github, DataSource.linkedin)]
+    return Ingestion(fetchers + [CrashingFetcher()], transport=httpx.ASGITransport(app=stub_app()))
+
+
+@pytest.fixture
+def user():
+    return UserProfile(id=1, email="ingest@example.com", name="Ingest", github="gh", linkedin="li", x="xh")
+
+
+def test_fetcher_crash_only_fails_its_source(ingestion, user):
+    state = ingestion.run({"user": user})
+    assert state["github"].username and state["linkedin"].username
+    assert state["ingestion"]["github"]["status"] == "ok"
+    assert state["ingestion"]["x"]["status"] == "failed"
+    assert "KeyError" in state["ingestion"]["x"]["error"]
+
+
+def test_crashed_source_keeps_cached_extract(ingestion, user):
+    cached = ["previous posts"]
+    state = ingestion.run({"user": user, "extracts": {"x": cached}})
+    assert state["ingestion"]["x"]["status"] == "cached"
+    assert state["extracts"]["x"] == cached
+
+
+def test_run_inside_event_loop(ingestion, user):
+    async def handler():
+        # Sync run() from a coroutine (FastAPI handler, notebook) and the async variant
+        return ingestion.run({"user": user}), await ingestion.arun({"user": user})
+
+    synced, awaited = asyncio.run(handler())
+    assert synced["github"].username == awaited["github"].username == "gh"
+    assert synced["ingestion"]["linkedin"]["status"] == awaited["ingestion"]["linkedin"]["status"] == "ok"
+
+
+@pytest.mark.parametrize(
+    "value, handle",
+    [
+        ("octo", "octo"),
+        ("@octo", "octo"),
+        ("https://github.com/octo", "octo"),
+        ("https://github.com/octo/hello-world", "octo"),
+        ("linkedin.com/in/octo/", "octo"),
+        ("https://x.com/@octo?ref=bio", "octo"),
+        ("https://github.com/", None),
+        ("", None),
+    ],
+)
+def test_account_handle(value, handle):
+    assert account_handle(value) == handle
+
+
+def test_fetch_uses_username_and_escapes_handles():
+    seen = []
+
+    def handler(request):
+        seen.append(request.url.raw_path.decode())
+        return httpx.Response(404)
+
+    user = UserProfile(
+        email="o c@example.com", name="Octo Cat", github="https://github.com/octo", website="https://octo.dev/a b"
+    )
+    fetchers = [HttpSourceFetcher(SOURCE_SPECS[s], "http://svc") for s in (DataSource.github, DataSource.website, DataSource.medium)]
+    Ingestion(fetchers, transport=httpx.MockTransport(handler)).run({"user": user})
+    assert sorted(seen) == [
+        "/github/octo",
+        "/medium/o%20c%40example.com",
+        "/website/https%3A%2F%2Focto.dev%2Fa%20b",
+    ]
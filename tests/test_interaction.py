@@ -0,0 +1,40 @@
+import pytest
+
+import User_interaction_node
+from User_interaction_node import ApprovalDecision, run_interaction
+from schemas import UserProfile
+from trend_scrapping_node import process_extractions_and_recommend
+
+
+@pytest.fixture
+def user():
+    return UserProfile(id=9, email="interact@example.com", name="Interact", skills=["Python", "SQL"])
+
+
+def approve_all(prompt):
+    return ApprovalDecision.APPROVED
+
+
+def test_passed_alignment_and_recs_are_reused(user, monkeypatch):
+    aligned, recs = process_extractions_and_recommend(user)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("alignment re-ran")
+
+    monkeypatch.setattr(User_interaction_node, "process_extractions_and_recommend", fail)
+    result = run_interaction(
+        user, ask=lambda q: "Pune, India", confirm=approve_all, aligned=aligned, recs=recs
+    )
+    assert result["updated_profile"] is aligned
+    assert result["recommendations"] is recs
+    assert aligned.location == "Pune, India"
+    assert {d for _, d in result["decisions"]} == {ApprovalDecision.APPROVED}
+
+
+def test_reapproved_tasks_add_one_planned_project(user):
+    first = run_interaction(user, ask=lambda q: "", confirm=approve_all)
+    planned = [p.name for p in first["updated_profile"].projects if p.name.startswith("Planned: ")]
+    assert planned and len(planned) == len(set(planned))
+
+    again = run_interaction(first["updated_profile"], ask=lambda q: "", confirm=approve_all)
+    assert [p.name for p in again["updated_profile"].projects if p.name.startswith("Planned: ")] == planned
@@ -0,0 +1,38 @@
+import asyncio
+
+import httpx
+import pytest
+
+import server
+from loadtest import LoadTest, _percentile, in_process_client, parse_mix
+from table import async_engine
+
+
+def test_parse_mix_and_percentile():
+    assert parse_mix("root=1,register") == {"root": 1.0, "register": 1.0}
+    with pytest.raises(ValueError):
+        parse_mix("delete=1")
+    assert _percentile([], 99) == 0.0
+    assert _percentile([3.0, 1.0, 2.0], 50) == 2.0
+
+
+def test_in_process_target_needs_fresh_import():
+    # table.py is already bound to the test DB here
+    with pytest.raises(RuntimeError):
+        in_process_client()
+
+
+def test_mixed_run_meets_expected_statuses():
+    async def run():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            report = await LoadTest(client, concurrency=4, requests=40, seed_users=5, seed=11).run()
+        await server.registration_writer.stop()
+        await async_engine.dispose()
+        return report
+
+    report = asyncio.run(run())
+    assert report["totals"]["requests"] == 40
+    assert report["totals"]["errors"] == 0
+    assert sum(s["count"] for s in report["scenarios"].values()) == 40
+    assert set(report["scenarios"]["invalid"]["status_codes"]) <= {"422"}
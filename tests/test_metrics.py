@@ -0,0 +1,59 @@
+from metrics import AGENT_NODE_SECONDS, DB_STATEMENT_SECONDS, HTTP_REQUEST_SECONDS, Counter, Histogram, Registry, timed
+
+
+def test_counter_and_histogram_exposition():
+    requests = Counter("demo_requests_total", "Requests", ("path",))
+    requests.inc('/a"b')
+    requests.inc('/a"b', amount=2)
+    assert requests.render() == [
+        "# HELP demo_requests_total Requests",
+        "# TYPE demo_requests_total counter",
+        'demo_requests_total{path="/a\\"b"} 3',
+    ]
+
+    latency = Histogram("demo_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.observe(value)
+    lines = latency.render()
+    assert lines[2:] == [
+        'demo_seconds_bucket{le="0.1"} 1',
+        'demo_seconds_bucket{le="1.0"} 3',
+        'demo_seconds_bucket{le="+Inf"} 4',
+        "demo_seconds_sum 4.05",
+        "demo_seconds_count 4",
+    ]
+
+
+def test_registry_reuses_metrics_and_renders_collectors():
+    registry = Registry()
+    assert registry.counter("demo_total", "x") is registry.counter("demo_total", "x")
+    registry.register_collector(lambda: [("demo_queue_depth", "gauge", "Queue depth", [({"queue": "q1"}, 4)])])
+    text = registry.render()
+    assert "# TYPE demo_queue_depth gauge\ndemo_queue_depth{queue=\"q1\"} 4\n" in text
+
+
+def test_timed_keeps_name_and_records():
+    def node(state):
+        """Doc."""
+        return state
+
+    before = AGENT_NODE_SECONDS.count("test_node")
+    wrapped = timed("test_node", node)
+    assert wrapped({"k": 1}) == {"k": 1}
+    assert wrapped.__name__ == "node" and wrapped.__doc__ == "Doc."
+    assert AGENT_NODE_SECONDS.count("test_node") == before + 1
+
+
+def test_http_and_db_metrics_served(client):
+    before = HTTP_REQUEST_SECONDS.count("GET", "/users/{user_id}", "404")
+    db_before = DB_STATEMENT_SECONDS.count("async", "SELECT")
+    assert client.get("/users/987654").status_code == 404
+    assert HTTP_REQUEST_SECONDS.count("GET", "/users/{user_id}", "404") == before + 1
+    assert DB_STATEMENT_SECONDS.count("async", "SELECT") > db_before
+
+    resp = client.get("/metrics")
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'lakshsetu_http_request_duration_seconds_count{method="GET",route="/users/{user_id}",status="404"}' in resp.text
+    assert "# TYPE lakshsetu_profile_cache_events_total counter" in resp.text
+    client.get("/no/such/path")
+    assert HTTP_REQUEST_SECONDS.count("GET", "unmatched", "404") >= 1
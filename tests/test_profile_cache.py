@@ -0,0 +1,74 @@
+import time
+
+from profile_cache import InMemorySharedBackend, ProfileCache, profile_cache
+from profile_index import save_user_profile
+from schemas import UserProfile
+
+
+def profile(user_id, email=None, **fields):
+    return UserProfile(id=user_id, email=email or f"cache{user_id}@example.com", name=f"User {user_id}", **fields)
+
+
+def test_lookup_by_id_and_email_then_invalidate():
+    cache = ProfileCache()
+    cache.put(profile(1))
+    assert cache.get_by_id(1).name == "User 1"
+    assert cache.get_by_email("cache1@example.com").id == 1
+    cache.invalidate(email="cache1@example.com")
+    assert cache.get_by_id(1) is None and cache.get_by_email("cache1@example.com") is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_lru_and_byte_budget():
+    cache = ProfileCache(max_entries=2)
+    for i in (1, 2):
+        cache.put(profile(i))
+    cache.get_by_id(1)  # 2 is now least recently used
+    cache.put(profile(3))
+    assert cache.get_by_id(2) is None and cache.get_by_id(1) is not None
+    assert cache.stats()["evictions"] == 1
+
+    tiny = ProfileCache(max_bytes=50)
+    tiny.put(profile(4))
+    assert tiny.get_by_id(4) is None
+
+
+def test_ttl_expiry():
+    cache = ProfileCache(ttl_seconds=0.01)
+    cache.put(profile(5))
+    time.sleep(0.02)
+    assert cache.get_by_id(5) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_shared_backend_fills_other_worker():
+    shared = InMemorySharedBackend()
+    writer, reader = ProfileCache(shared=shared), ProfileCache(shared=shared)
+    writer.put(profile(6, skills=["Go"]))
+    assert reader.get_by_email("cache6@example.com").skills[0].skill_name == "Go"
+    assert reader.stats()["shared_hits"] == 1
+    writer.invalidate(user_id=6)
+    reader.clear()
+    assert reader.get_by_id(6) is None
+
+
+def test_put_after_concurrent_invalidation_is_dropped():
+    cache = ProfileCache()
+    generation = cache.generation()
+    stale = profile(7, location="old")  # read from the DB ...
+    cache.invalidate(user_id=7)  # ... while a write commits and invalidates
+    cache.put(stale, generation)
+    assert cache.get_by_id(7) is None
+    assert cache.stats()["stale_puts"] == 1
+
+    cache.put(profile(7, location="new"), cache.generation())
+    assert cache.get_by_id(7).location == "new"
+
+
+def test_read_through_sees_saves(client):
+    user_id = save_user_profile(UserProfile(email="cache-rt@example.com", name="Before"))
+    assert client.get(f"/users/{user_id}").json()["name"] == "Before"
+    assert profile_cache.get_by_id(user_id) is not None
+    save_user_profile(UserProfile(id=user_id, email="cache-rt@example.com", name="After"))
+    assert client.get("/users/by-email/cache-rt@example.com").json()["name"] == "After"
+    assert client.get("/users/999999").status_code == 404
@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import select
+
+import profile_codec
+from profile_codec import BINARY_MAGIC, JsonProfileCodec, MsgpackProfileCodec, ProfileCodec, decode_profile, get_codec
+from profile_index import save_user_profile
+from schemas import UserProfile
+from table import SessionLocal, UserDB
+
+PROFILE = {
+    "email": "codec@example.com",
+    "name": "Codec Ü",
+    "skills": [{"skill_name": "Python", "skill_strength": "High"}],
+    "age": 31,
+    "location": None,
+}
+
+
+@pytest.mark.parametrize("name", ["json", "msgpack"])
+def test_round_trip(name):
+    codec = get_codec(name)
+    payload = codec.encode(PROFILE)
+    assert isinstance(payload, bytes if codec.binary else str)
+    assert codec.decode(payload) == PROFILE
+    # Every stored format decodes without knowing which codec wrote it
+    assert decode_profile(payload.encode() if isinstance(payload, str) else payload) == PROFILE
+
+
+def test_binary_header():
+    payload = MsgpackProfileCodec().encode(PROFILE)
+    assert payload[:2] == bytes((BINARY_MAGIC, MsgpackProfileCodec.codec_id))
+    with pytest.raises(ValueError):
+        decode_profile(bytes((BINARY_MAGIC, 99)) + payload[2:])
+    assert decode_profile(None) is None
+
+
+def test_incomplete_codec_fails_at_creation():
+    class EncodeOnly(ProfileCodec):
+        name = "half"
+
+        def encode(self, obj):
+            return ""
+
+    with pytest.raises(TypeError):
+        EncodeOnly()
+    with pytest.raises(ValueError):
+        get_codec("nope")
+
+
+def test_rows_written_under_either_codec_load(monkeypatch):
+    # A codec switch leaves older rows readable
+    ids = []
+    for codec in (JsonProfileCodec(), MsgpackProfileCodec()):
+        monkeypatch.setattr(profile_codec, "PROFILE_CODEC", codec)
+        ids.append(save_user_profile(UserProfile(email=f"codec-{codec.name}@example.com", name=codec.name, skills=["Go"])))
+    db = SessionLocal()
+    try:
+        rows = dict(db.execute(select(UserDB.id, UserDB.profile_data).where(UserDB.id.in_(ids))).all())
+    finally:
+        db.close()
+    assert [rows[i]["name"] for i in ids] == ["json", "msgpack"]
+    assert all(rows[i]["skills"][0]["skill_name"] == "Go" for i in ids)
@@ -0,0 +1,53 @@
+from profile_index import (
+    CERTIFICATION_TABLE,
+    PROJECT_TABLE,
+    SKILL_TABLE,
+    find_users_missing_certifications,
+    find_users_with_skill,
+    profile_side_rows,
+    save_user_profile,
+    users_missing_projects_query,
+    users_with_all_skills_query,
+    users_with_certification_query,
+)
+from schemas import Certifications, UserProfile
+from table import SessionLocal
+
+
+def ids(rows):
+    return {row.id for row in rows}
+
+
+def test_side_rows_dedupe_by_key():
+    rows = profile_side_rows(1, {
+        "skills": ["Python", {"skill_name": "python "}, "", "SQL"],
+        "projects": [{"name": "My  App"}, "my app"],
+        "certifications": [{"title": "AWS SAA", "issuer": "AWS"}],
+    })
+    assert [r["skill_name"] for r in rows[SKILL_TABLE]] == ["Python", "SQL"]
+    assert [r["project"] for r in rows[PROJECT_TABLE]] == ["my app"]
+    assert rows[CERTIFICATION_TABLE] == [{"user_id": 1, "certification": "aws saa", "title": "AWS SAA", "issuer": "AWS"}]
+
+
+def test_side_tables_follow_profile_saves():
+    certified = save_user_profile(UserProfile(
+        email="idx-cert@example.com", name="Cert", skills=["Rust", "SQL"],
+        certifications=[Certifications(title="CKA", issuer="CNCF", issued_date="2024")],
+    ))
+    plain = save_user_profile(UserProfile(email="idx-plain@example.com", name="Plain", skills=["Rust"], projects=["Tool"]))
+    db = SessionLocal()
+    try:
+        assert {certified, plain} <= ids(find_users_with_skill(db, "rust"))
+        assert certified in ids(db.execute(users_with_all_skills_query(["Rust", "sql"])).all())
+        assert plain not in ids(db.execute(users_with_all_skills_query(["Rust", "sql"])).all())
+        assert ids(db.execute(users_with_certification_query(" cka ")).all()) == {certified}
+        assert plain in ids(find_users_missing_certifications(db))
+        assert certified in ids(db.execute(users_missing_projects_query()).all())
+
+        # An update rewrites the user's rows
+        save_user_profile(UserProfile(id=plain, email="idx-plain@example.com", name="Plain", skills=["Go"]))
+        assert plain not in ids(find_users_with_skill(db, "Rust"))
+        assert plain in ids(find_users_with_skill(db, "Go"))
+        assert plain in ids(db.execute(users_missing_projects_query()).all())
+    finally:
+        db.close()
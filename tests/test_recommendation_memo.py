@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from ingestion import _stub_payload
+from schemas import DataSource, GitHubUserExtract, UserProfile
+from trend_scrapping_node import apply_extractions_and_recommend, process_extractions_and_recommend, recommendation_memo
+
+FETCHED_AT = datetime(2026, 1, 1)
+
+
+def github_extract(fetched_at=FETCHED_AT, **repo0):
+    payload = _stub_payload(DataSource.github, "octo")
+    payload["meta"]["fetched_at"] = fetched_at
+    payload["repositories"][0].update(last_updated=fetched_at, **repo0)
+    return GitHubUserExtract.model_validate(payload)
+
+
+@pytest.fixture
+def user():
+    recommendation_memo.clear()
+    return UserProfile(id=7, email="memo@example.com", name="Memo", skills=["SQL"])
+
+
+def test_hit_returns_equal_independent_copies(user):
+    github = github_extract()
+    first, first_recs = process_extractions_and_recommend(user, github=github)
+    hits = recommendation_memo.stats()["hits"]
+
+    first.projects.append(first.projects[0])
+    first_recs[0].approval_status = "Approved"
+    second, second_recs = process_extractions_and_recommend(user, github=github)
+    assert recommendation_memo.stats()["hits"] == hits + 1
+    assert len(second.projects) == len(first.projects) - 1
+    assert second_recs[0].approval_status != "Approved"
+
+
+def test_delta_apply_does_not_corrupt_memoized_projects(user):
+    github = github_extract()
+    aligned, _ = process_extractions_and_recommend(user, github=github)
+    techs = list(aligned.projects[0].technologies)
+
+    # A later fetch where the first repo picked up a new language merges into that project
+    newer = github_extract(FETCHED_AT + timedelta(days=1), primary_language="Haskell")
+    patched, _, patch = apply_extractions_and_recommend(aligned, github=newer, since={"github": FETCHED_AT})
+    assert patch.merged_projects
+    assert "Haskell" in patched.projects[0].technologies
+
+    cached, _ = process_extractions_and_recommend(user, github=github)
+    assert cached.projects[0].technologies == techs
@@ -0,0 +1,66 @@
+import asyncio
+
+import httpx
+import pytest
+
+import server
+from table import async_engine
+
+
+def test_register_then_duplicate(client):
+    resp = client.post("/registration", json={"name": "Reg", "email": "reg@example.com", "skills": ["Python"]})
+    assert resp.status_code == 200
+    assert resp.json()["user_email"] == "reg@example.com"
+    assert client.get(f"/users/{resp.json()['user_id']}").json()["name"] == "Reg"
+
+    again = client.post("/registration", json={"name": "Reg", "email": "reg@example.com"})
+    assert again.status_code == 400
+
+
+@pytest.mark.parametrize("group_commit", [True, False])
+def test_concurrent_same_email_registers_once(monkeypatch, group_commit):
+    monkeypatch.setattr(server, "GROUP_COMMIT_ENABLED", group_commit)
+    email = f"race-{group_commit}@example.com"
+
+    async def register_all():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            responses = await asyncio.gather(
+                *(http.post("/registration", json={"name": "Race", "email": email}) for _ in range(8))
+            )
+        await server.registration_writer.stop()
+        # Pooled aiosqlite connections belong to this loop
+        await async_engine.dispose()
+        return sorted(r.status_code for r in responses)
+
+    # The unique-email race maps to 400, never 500
+    assert asyncio.run(register_all()) == [200] + [400] * 7
+
+
+def test_batch_registration_ndjson(client, monkeypatch):
+    monkeypatch.setattr(server, "BATCH_CHUNK_SIZE", 2)  # several chunks, results still in input order
+    client.post("/registration", json={"name": "Old", "email": "batch-old@example.com"})
+    body = b"\n".join([
+        b'{"name": "B1", "email": "batch1@example.com", "skills": ["Go"]}',
+        b'{"name": "No email"}',
+        b'{"name": "Old", "email": "batch-old@example.com"}',
+        b"",
+        b'{"name": "B2", "email": "batch2@example.com"}',
+        b'{"name": "B1 again", "email": "batch1@example.com"}',
+    ])
+    resp = client.post("/registration/batch", content=body, headers={"content-type": "application/x-ndjson"})
+    results = [server.loads_json(line) for line in resp.content.splitlines()]
+    assert [(r["index"], r["status"]) for r in results] == [
+        (0, "created"), (1, "invalid"), (2, "duplicate"), (3, "created"), (4, "duplicate"),
+    ]
+    assert results[1]["error"].startswith("email")
+    assert client.get(f"/users/{results[0]['user_id']}").json()["skills"][0]["skill_name"] == "Go"
+
+
+def test_batch_registration_json_array(client):
+    resp = client.post("/registration/batch", json=[{"name": "J", "email": "batch-json@example.com"}])
+    assert server.loads_json(resp.content.splitlines()[0])["status"] == "created"
+
+    bad = client.post("/registration/batch", content=b"{not json", headers={"content-type": "application/json"})
+    assert bad.status_code == 400
+    assert client.post("/registration/batch", json={"name": "not a list"}).status_code == 400
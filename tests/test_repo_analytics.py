@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from repo_analytics import RepoFrame, repo_frame
+from schemas import DataSource, EngagementMetrics, ExtractionMeta, GitHubRepoExtract, GitHubUserExtract
+
+START = datetime(2025, 1, 1)
+
+
+def repo(name, days=None, stars=0, forks=0, impressions=0, language=None):
+    return GitHubRepoExtract(
+        name=name,
+        url=f"https://github.com/octo/{name}",
+        last_updated=START + timedelta(days=days) if days is not None else None,
+        primary_language=language,
+        metrics=EngagementMetrics(stars=stars, forks=forks, impressions=impressions),
+    )
+
+
+@pytest.fixture
+def repos():
+    return [
+        repo("a", days=1, stars=5, forks=1),
+        repo("b", days=30, stars=0, forks=4),
+        repo("c", stars=9, impressions=100),  # undated
+        repo("d", days=30, stars=5),
+        repo("e", days=2, impressions=300),
+        repo("f", days=3),
+    ]
+
+
+def test_top_orders_best_first_and_keeps_repo_order_on_ties(repos):
+    frame = RepoFrame(repos)
+    assert frame.top("stars", 2).tolist() == [2, 0]
+    assert frame.top("stars", 3).tolist() == [2, 0, 3]
+    # b and d tie on recency: repository order
+    assert frame.top("recency", 3).tolist() == [1, 3, 5]
+
+
+def test_top_leaves_out_repos_with_nothing_to_rank(repos):
+    frame = RepoFrame(repos)
+    assert frame.top("forks", 5).tolist() == [1, 0]
+    assert 2 not in frame.top("recency", 6).tolist()
+    assert frame.top("impressions", 1).tolist() == [4]
+
+
+def test_featured_round_robins_over_rankings(repos):
+    frame = RepoFrame(repos)
+    # Rank 0 of recency, stars, forks, impressions: b, c, b, e
+    assert frame.featured(3) == [1, 2, 4]
+    assert frame.featured(10) == list(range(6))
+
+
+def test_featured_tops_up_in_repo_order():
+    frame = RepoFrame([repo("x"), repo("y"), repo("z", stars=1)])
+    assert frame.featured(2) == [0, 2]
+
+
+def test_most_recent(repos):
+    assert RepoFrame(repos).most_recent().name == "b"
+    assert RepoFrame([repo("u"), repo("v")]).most_recent() is None
+    assert RepoFrame([]).most_recent() is None
+
+
+def test_frame_snapshots_repos(repos):
+    frame = RepoFrame(repos)
+    repos.append(repo("g", days=99, stars=50))
+    assert len(frame) == 6
+    assert frame.most_recent().name == "b"
+
+
+def test_cached_frame_follows_appended_repos(repos):
+    github = GitHubUserExtract(username="octo", repositories=repos, meta=ExtractionMeta(source=DataSource.github))
+    frame = repo_frame(github)
+    assert repo_frame(github) is frame
+    github.repositories.append(repo("g", days=99))
+    fresh = repo_frame(github)
+    assert fresh is not frame and len(fresh) == 7
+    assert fresh.most_recent().name == "g"
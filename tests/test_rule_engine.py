@@ -0,0 +1,152 @@
+import copy
+import json
+import os
+
+import pytest
+
+import trend_scrapping_node
+from cohort_recs import synthetic_cohort
+from rule_engine import DEFAULT_RULESET, RULES, Features, RuleEngine, RuleSetError, compile_ruleset
+from schemas import DataSource, ExtractionMeta, GitHubRepoExtract, GitHubUserExtract, LinkedInProfileExtract, UserProfile
+from trend_scrapping_node import process_extractions_and_recommend, recommendation_memo
+
+TRENDING = ("Python", "Rust", "Go", "Kubernetes")
+
+# Templates with filters, "in", "not"/"any", a rule without "when" and rule text that isn't valid Python
+CUSTOM_RULESET = {
+    "version": "test",
+    "rules": [
+        {"id": "gaps", "when": {"all": ["has_skills", ["trending_gap_count", ">=", 2]]},
+         "title": "Gaps: {trending_gaps|join:2}", "description": "Start with {trending_gaps|first}"},
+        {"id": "named", "when": ["most_recent_repo", "in", ["repo-0", "repo-1"]],
+         "title": "Named {most_recent_repo}", "description": "it's \"{most_recent_repo}\") \\ {{"},
+        {"id": "quiet", "when": {"not": {"any": ["has_linkedin", ["repo_count", ">", 3]]}},
+         "priority": 5, "title": "Quiet", "description": "quiet", "reason": "{skill_count} skills"},
+        {"id": "always", "title": "Always", "description": "always", "suggested_actions": ["a", "{project_count}"]},
+    ],
+}
+
+
+def profile(**fields):
+    return UserProfile(id=1, email="rules@example.com", name="Rules", **fields)
+
+
+def github(*repos):
+    return GitHubUserExtract(
+        username="octo",
+        repositories=[GitHubRepoExtract(name=name, url=f"https://github.com/octo/{name}", last_updated=updated) for name, updated in repos],
+        meta=ExtractionMeta(source=DataSource.github),
+    )
+
+
+def linkedin(**fields):
+    return LinkedInProfileExtract(username="octo", meta=ExtractionMeta(source=DataSource.linkedin), **fields)
+
+
+def test_default_rules():
+    user = profile(skills=["Python", "SQL"], certifications=["AWS"])
+    recs = RuleEngine().evaluate(
+        user,
+        github=github(("old", "2024-01-01T00:00:00"), ("new", "2025-01-01T00:00:00")),
+        linkedin=linkedin(connections=150, post_count=0),
+        trending=TRENDING,
+    )
+    assert [(r.title, r.priority) for r in recs] == [
+        ("Close top skill gaps", 1),
+        ("Polish your most recent repo", 2),
+        ("Post on LinkedIn", 2),
+        ("Grow your network", 3),
+        ("Turn a certification into a project", 2),
+    ]
+    assert recs[0].description == "Focus on: Rust, Go, Kubernetes"
+    assert recs[0].suggested_actions[0] == "Take a short course on Rust"
+    assert recs[1].description == "Improve README and add a demo to new"
+    assert RuleEngine().evaluate(profile(), trending=TRENDING) == []
+
+
+@pytest.mark.parametrize("ruleset", [DEFAULT_RULESET, CUSTOM_RULESET], ids=["default", "custom"])
+def test_plan_matches_rule_closures(ruleset):
+    # The generated plan function and the per-rule closures cohort_recs uses agree
+    plan = compile_ruleset(ruleset)
+    for user, gh, li in synthetic_cohort(200, repos=5, seed=11):
+        f = Features(user=user, github=gh, linkedin=li, trending=TRENDING)
+        expected = [rule.render(f) for rule in plan.rules if rule.test(f)]
+        assert plan.evaluate(user, gh, li, TRENDING) == expected
+
+
+def test_rule_text_is_not_code():
+    plan = compile_ruleset(CUSTOM_RULESET)
+    recs = plan.evaluate(profile(skills=["Go"], projects=["p"]), github(("repo-1", "2025-01-01T00:00:00")), None, TRENDING)
+    named = next(r for r in recs if r.title == "Named repo-1")
+    assert named.description == "it's \"repo-1\") \\ {{"
+    assert recs[0].title == "Gaps: Python, Rust"
+    assert recs[-1].suggested_actions == ["a", "1"]
+    assert "it's" not in plan.source
+
+
+def test_max_recommendations_and_hit_counts():
+    ruleset = dict(CUSTOM_RULESET, max_recommendations=1)
+    engine = RuleEngine(ruleset=ruleset)
+    assert [r.title for r in engine.evaluate(profile(), trending=TRENDING)] == ["Quiet"]
+    engine.evaluate(profile(skills=["Go"]), trending=TRENDING)
+    assert engine.hit_counts() == {
+        "gaps": {"evaluated": 2, "hits": 1},
+        "named": {"evaluated": 1, "hits": 0},
+        "quiet": {"evaluated": 1, "hits": 1},
+        "always": {"evaluated": 0, "hits": 0},
+    }
+
+
+@pytest.mark.parametrize("rule, message", [
+    ({"id": "x", "when": "no_such_feature", "title": "t", "description": "d"}, "unknown feature"),
+    ({"id": "x", "when": ["skill_count", "~", 1], "title": "t", "description": "d"}, "expected"),
+    ({"id": "x", "when": {"all": []}, "title": "t", "description": "d"}, "bad condition"),
+    ({"id": "x", "title": "{skill_count|upper}", "description": "d"}, "unknown template filter"),
+    ({"id": "x", "title": "{nope}", "description": "d"}, "unknown feature"),
+    ({"id": "x", "priority": 9, "title": "t", "description": "d"}, "priority"),
+    ({"id": "x", "title": "t"}, "required"),
+    ({"title": "t", "description": "d"}, "without an id"),
+])
+def test_bad_rules_are_rejected(rule, message):
+    with pytest.raises(RuleSetError, match=message):
+        compile_ruleset({"rules": [rule]})
+
+
+def test_duplicate_ids_are_rejected():
+    rule = {"id": "x", "title": "t", "description": "d"}
+    with pytest.raises(RuleSetError, match="Duplicate"):
+        compile_ruleset({"rules": [rule, rule]})
+
+
+def test_hot_reload_keeps_plan_on_bad_file(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(DEFAULT_RULESET))
+    engine = RuleEngine(path=str(path), check_interval=0)
+    version = engine.version
+
+    edited = copy.deepcopy(DEFAULT_RULESET)
+    edited["rules"] = edited["rules"][:1]
+    path.write_text(json.dumps(edited))
+    os.utime(path, (1e9, 1e9))
+    assert engine.maybe_reload()
+    assert engine.version != version and len(engine.plan.rules) == 1
+
+    path.write_text("{not json")
+    os.utime(path, (2e9, 2e9))
+    assert not engine.maybe_reload()
+    assert len(engine.plan.rules) == 1 and engine.reload_errors == 1
+
+
+def test_loading_rules_invalidates_memo(monkeypatch):
+    monkeypatch.setattr(RULES, "plan", RULES.plan)
+    recommendation_memo.clear()
+    user = profile(skills=["SQL"])
+    _, recs = process_extractions_and_recommend(user)
+    assert recs and recommendation_memo.stats()["entries"] == 1
+    invalidations = recommendation_memo.stats()["invalidations"]
+
+    RULES.load({"version": "memo-test", "rules": [{"id": "only", "title": "Only", "description": "d"}]})
+    assert trend_scrapping_node._memo_version().startswith(RULES.version)
+    _, recs = process_extractions_and_recommend(user)
+    assert [r.title for r in recs] == ["Only"]
+    assert recommendation_memo.stats()["invalidations"] == invalidations + 1
@@ -0,0 +1,76 @@
+import threading
+from datetime import datetime, timedelta
+
+from scheduler import AgentScheduler
+from schemas import UserProfile
+
+
+def test_wake_during_running_cycle_is_kept():
+    started, release, second_run = threading.Event(), threading.Event(), threading.Event()
+    calls = []
+
+    def run_cycle(state):
+        calls.append(datetime.now())
+        if len(calls) == 1:
+            started.set()
+            release.wait(5)
+        else:
+            second_run.set()
+        # A normal cycle schedules the next run a week out
+        state["next_user_processing_at"] = datetime.now() + timedelta(days=7)
+        return state
+
+    scheduler = AgentScheduler(workers=2, run_cycle=run_cycle)
+    key = scheduler.add_user(UserProfile(id=1, email="wake@example.com", name="Wake"))
+    stop = threading.Event()
+    loop = threading.Thread(target=scheduler.run, kwargs={"stop": stop})
+    loop.start()
+    try:
+        assert started.wait(5)
+        scheduler.wake(key)  # e.g. a profile edit while the cycle is still running
+        release.set()
+        assert second_run.wait(5), "wake() during the cycle was dropped"
+        assert len(calls) == 2
+    finally:
+        stop.set()
+        scheduler.stop()
+        loop.join(5)
+
+
+def test_wake_idle_user_moves_next_run():
+    scheduler = AgentScheduler(run_cycle=lambda state: state)
+    key = scheduler.add_user(UserProfile(id=2, email="idle@example.com", name="Idle"))
+    at = datetime.now() + timedelta(hours=1)
+    scheduler.wake(key, at)
+    assert scheduler.get_state(key)["next_user_processing_at"] == at
+
+
+def test_add_user_during_running_cycle_keeps_new_state():
+    started, release, second_run = threading.Event(), threading.Event(), threading.Event()
+    seen = []
+
+    def run_cycle(state):
+        seen.append(state["user"].name)
+        if len(seen) == 1:
+            started.set()
+            release.wait(5)
+        else:
+            second_run.set()
+        return {**state, "next_user_processing_at": datetime.now() + timedelta(days=7)}
+
+    scheduler = AgentScheduler(workers=2, run_cycle=run_cycle)
+    key = scheduler.add_user(UserProfile(id=3, email="swap@example.com", name="Old"))
+    stop = threading.Event()
+    loop = threading.Thread(target=scheduler.run, kwargs={"stop": stop})
+    loop.start()
+    try:
+        assert started.wait(5)
+        scheduler.add_user(UserProfile(id=3, email="swap@example.com", name="New"))
+        release.set()
+        assert second_run.wait(5), "state installed during the cycle was not rescheduled"
+        assert seen == ["Old", "New"]
+    finally:
+        stop.set()
+        scheduler.stop()
+        loop.join(5)
+    assert scheduler.get_state(key)["user"].name == "New"
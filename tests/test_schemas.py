@@ -0,0 +1,21 @@
+from schemas import Certifications, Projects, Skills, UserProfile
+
+
+def test_registration_strings_become_models():
+    user = UserProfile.model_validate({
+        "email": "plain@example.com",
+        "name": "Plain",
+        "skills": ["Python", " ", "SQL"],
+        "projects": ["Portfolio"],
+        "certifications": ["AWS SAA"],
+    })
+    assert user.skills == [Skills(skill_name="Python", skill_strength="Medium"), Skills(skill_name="SQL", skill_strength="Medium")]
+    assert user.projects == [Projects(name="Portfolio", description="")]
+    assert user.certifications == [Certifications(title="AWS SAA", issuer="Unknown", issued_date="Unknown")]
+
+
+def test_model_entries_pass_through():
+    skill = Skills(skill_name="Go", skill_strength="High")
+    user = UserProfile(email="model@example.com", name="Model", skills=[skill, "Rust"])
+    assert user.skills[0] == skill
+    assert user.skills[1].skill_name == "Rust"
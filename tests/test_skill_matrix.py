@@ -0,0 +1,62 @@
+from metrics import REGISTRY
+from skill_matrix import SkillBitMatrix
+
+
+def test_sparse_ids_use_rows_not_id_space():
+    matrix = SkillBitMatrix(capacity=4)
+    big = 10**12
+    matrix.set_user(big, ["Python", "aws"])
+    matrix.set_user(7, ["Go"])
+    matrix.set_user(3, [])
+    stats = matrix.stats()
+    assert stats["users"] == 3 and stats["capacity"] == 4
+
+    assert matrix.has_skill(big, "python") and matrix.has_skill(big, "AWS")
+    assert matrix.user_skills(7) == ["Go"]
+    assert not matrix.has_skill(8, "Go")
+    # Ascending ids even though rows were handed out in arrival order
+    assert matrix.users_missing("Python").tolist() == [3, 7]
+    assert matrix.count_missing("Python") == 2
+
+    ids, missing = matrix.missing(["Python", "Go"], with_skills_only=True)
+    assert dict(zip(ids.tolist(), missing.tolist())) == {big: [False, True], 7: [True, False]}
+
+
+def test_removed_rows_are_reused():
+    matrix = SkillBitMatrix(capacity=2)
+    matrix.set_user(50, ["Rust"])
+    matrix.set_user(20, ["Go"])
+    matrix.remove_user(50)
+    assert matrix.user_skills(50) == [] and matrix.users == 1
+
+    matrix.set_user(90, ["SQL"])
+    assert matrix.stats()["capacity"] == 2
+    assert matrix.user_skills(90) == ["SQL"]
+    assert matrix.users_missing("Rust").tolist() == [20, 90]
+    assert matrix.users_missing("SQL").tolist() == [20]
+
+
+def metric_families(text):
+    return [line.split()[2] for line in text.splitlines() if line.startswith("# TYPE ")]
+
+
+def test_lifespans_do_not_duplicate_metric_families():
+    import server
+    from fastapi.testclient import TestClient
+
+    for _ in range(2):
+        with TestClient(server.app) as client:
+            families = metric_families(client.get("/metrics").text)
+            assert "lakshsetu_skill_matrix_users" in families
+            assert len(families) == len(set(families))
+    # Detached on shutdown: the matrix no longer reports
+    assert "lakshsetu_skill_matrix_users" not in metric_families(REGISTRY.render())
+
+
+def test_collectors_unregister_on_close():
+    matrix = SkillBitMatrix().attach()
+    matrix.attach()
+    assert metric_families(REGISTRY.render()).count("lakshsetu_skill_matrix_users") == 1
+    matrix.detach()
+    matrix.detach()
+    assert "lakshsetu_skill_matrix_users" not in metric_families(REGISTRY.render())
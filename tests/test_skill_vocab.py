@@ -0,0 +1,58 @@
+import pytest
+
+from profile_index import SKILL_VOCABULARY_KEY, ensure_skill_index_current, find_users_with_skill, save_user_profile
+from schemas import Skills, UserProfile, analyze_skill_gaps
+from skill_vocab import VOCABULARY, canonical_skill, skill_key
+from table import IndexMetaDB, SessionLocal, UserSkillDB
+from trend_engine import ARXIV_CATEGORY_SKILLS
+from trend_scrapping_node import DEFAULT_TRENDING_SKILLS, _merge_skills
+
+
+def test_aliases_fold_spellings_only():
+    assert skill_key("ML") == skill_key("machine learning")
+    assert skill_key("k8s") == skill_key("Kubernetes")
+    assert canonical_skill("llms") == "Large Language Models"
+    # Distinct skills are not folded into a category
+    assert len({skill_key(s) for s in ("AWS", "Azure", "GCP", "Cloud Computing")}) == 4
+    assert skill_key("Docker") != skill_key("Kubernetes")
+
+
+@pytest.mark.parametrize("name", ["ML", "Machine Learning", "AI/ML", "ai & ml"])
+def test_ml_profile_has_no_machine_learning_gap(name):
+    gaps = analyze_skill_gaps([Skills(skill_name=name, skill_strength="Medium")], DEFAULT_TRENDING_SKILLS)
+    assert not any(skill_key(g) == skill_key("Machine Learning") for g in gaps)
+    assert len(gaps) == len(DEFAULT_TRENDING_SKILLS) - 1
+
+
+def test_arxiv_ml_categories_score_one_skill():
+    assert len({skill_key(ARXIV_CATEGORY_SKILLS[c]) for c in ("cs.AI", "cs.LG", "stat.ML")}) == 1
+
+
+def test_merge_keeps_every_existing_entry():
+    existing = [Skills(skill_name="AWS", skill_strength="High"), Skills(skill_name="Azure", skill_strength="Low")]
+    merged = _merge_skills(existing, ["GCP", "aws", "Machine Learning", "ml", ""])
+    assert [(s.skill_name, s.skill_strength) for s in merged] == [
+        ("AWS", "High"),
+        ("Azure", "Low"),
+        ("GCP", "Medium"),
+        ("Machine Learning", "Medium"),
+    ]
+
+
+def test_side_tables_rekeyed_when_vocabulary_changes():
+    user_id = save_user_profile(UserProfile(email="rekey@example.com", name="Rekey", skills=["k8s"]))
+    db = SessionLocal()
+    try:
+        ensure_skill_index_current(db)
+        assert not ensure_skill_index_current(db)
+        # Rows written under an older alias table, e.g. k8s -> "cloud-native"
+        db.query(UserSkillDB).filter(UserSkillDB.user_id == user_id).update({"skill": "cloud-native"})
+        db.merge(IndexMetaDB(key=SKILL_VOCABULARY_KEY, value="older"))
+        db.commit()
+        assert user_id not in [row.id for row in find_users_with_skill(db, "Kubernetes")]
+
+        assert ensure_skill_index_current(db)
+        assert user_id in [row.id for row in find_users_with_skill(db, "Kubernetes")]
+        assert db.get(IndexMetaDB, SKILL_VOCABULARY_KEY).value == VOCABULARY.version
+    finally:
+        db.close()
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+import trend_scrapping_node
+from ingestion import SOURCE_SPECS, TREND_SOURCES, HttpSourceFetcher, Ingestion, stub_app
+from schemas import ExtractionMeta, TrendSkillExtract, UserProfile
+from trend_engine import TrendEngine
+
+T0 = datetime(2026, 3, 1)
+
+
+def trend(name, score, when=T0):
+    return TrendSkillExtract(name=name, score=score, meta=ExtractionMeta(source="x", fetched_at=when))
+
+
+def test_scores_halve_every_half_life():
+    engine = TrendEngine(half_life_days=10, publish=False)
+    engine.ingest([trend("Rust", 0.0)])
+    fresh = engine.scores()["Rust"]
+    assert engine.scores(T0 + timedelta(days=10))["Rust"] == pytest.approx(fresh / 2)
+    assert engine.scores(T0 + timedelta(days=20))["Rust"] == pytest.approx(fresh / 4)
+
+
+def test_newer_observations_outrank_older_equal_ones():
+    engine = TrendEngine(half_life_days=10, top_n=2, publish=False)
+    engine.ingest([trend("Go", 5.0, T0 - timedelta(days=30)), trend("Rust", 5.0), trend("python", 0.1), trend("Python", 0.1)])
+    assert [name for name, _ in engine.top()] == ["Rust", "Python"]
+    assert engine.rank("rust") == 1 and engine.rank("Go") is None
+    # Moving the clock decays everything alike, so the ranking holds
+    engine.refresh(T0 + timedelta(days=90))
+    assert [name for name, _ in engine.top()] == ["Rust", "Python"]
+
+
+def test_refresh_publishes_only_new_rankings(monkeypatch):
+    monkeypatch.setattr(trend_scrapping_node, "TRENDING_SKILLS", trend_scrapping_node.DEFAULT_TRENDING_SKILLS)
+    monkeypatch.setattr(trend_scrapping_node, "TRENDS_VERSION", "static")
+    engine = TrendEngine()
+    engine.ingest([trend("Rust", 3.0), trend("Go", 1.0)])
+    assert trend_scrapping_node.TRENDING_SKILLS == ("Rust", "Go")
+    version = trend_scrapping_node.TRENDS_VERSION
+    engine.refresh(T0 + timedelta(days=1))
+    assert trend_scrapping_node.TRENDS_VERSION == version
+
+
+def test_ingestion_feeds_fresh_trend_extracts():
+    engine = TrendEngine(publish=False)
+    fetchers = [HttpSourceFetcher(SOURCE_SPECS[s], "http://stub") for s in TREND_SOURCES]
+    ingestion = Ingestion(fetchers, transport=httpx.ASGITransport(app=stub_app()), trends=engine)
+    user = UserProfile(email="trends@example.com", name="Trends", x="trends")
+    ingestion.run({"user": user})
+    assert {name for name, _ in engine.top()} == {"Python", "Machine Learning", "FastAPI"}
+    observed = engine.observations
+
+    # Every source failing: the cached extracts are kept but not counted again
+    failing = Ingestion(fetchers, transport=httpx.ASGITransport(app=stub_app(fail_rate={s.value: 1.0 for s in TREND_SOURCES})),
+                        retries=0, trends=engine)
+    state = failing.run({"user": user, "extracts": {"medium": ["cached"]}})
+    assert state["ingestion"]["medium"]["status"] == "cached"
+    assert engine.observations == observed
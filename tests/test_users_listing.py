@@ -0,0 +1,47 @@
+import pytest
+
+import server
+from profile_codec import loads_json
+
+
+@pytest.fixture
+def listed(client, request):
+    # Five fresh users per test; returns (ids, email prefix)
+    prefix = request.node.name
+    ids = []
+    for i in range(5):
+        resp = client.post("/registration", json={"name": f"List {i}", "email": f"{prefix}{i}@example.com", "skills": [f"Skill {i}"]})
+        ids.append(resp.json()["user_id"])
+    return ids, prefix
+
+
+def test_keyset_pages(client, listed):
+    listed, _ = listed
+    after = listed[0] - 1
+    seen = []
+    while True:
+        page = client.get("/users", params={"after_id": after, "limit": 2}).json()
+        seen += [item["id"] for item in page["items"]]
+        if page["next_after_id"] is None:
+            break
+        after = page["next_after_id"]
+    assert seen[:5] == listed
+    assert seen == sorted(seen)
+
+
+def test_field_projection(client, listed):
+    listed, _ = listed
+    page = client.get("/users", params={"after_id": listed[0] - 1, "limit": 1, "fields": "skills,name"}).json()
+    (item,) = page["items"]
+    assert list(item) == ["id", "skills", "name"]
+    assert item["id"] == listed[0] and item["name"] == "List 0"
+    assert [s["skill_name"] for s in item["skills"]] == ["Skill 0"]
+    assert client.get("/users", params={"fields": "nope"}).status_code == 400
+
+
+def test_ndjson_export(client, listed, monkeypatch):
+    listed, prefix = listed
+    monkeypatch.setattr(server, "USERS_EXPORT_CHUNK", 2)
+    resp = client.get("/users", params={"after_id": listed[0] - 1, "limit": 3, "format": "ndjson", "fields": "email"})
+    lines = [loads_json(line) for line in resp.content.splitlines()]
+    assert lines == [{"id": i, "email": f"{prefix}{n}@example.com"} for n, i in enumerate(listed[:3])]
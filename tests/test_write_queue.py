@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from table import SQLITE_PROFILE, async_engine, engine
+from write_queue import DuplicateEmailError, GroupCommitWriter
+
+
+def row(email):
+    return {"name": email.split("@")[0], "email": email, "profile_data": {"email": email, "skills": [{"skill_name": "Go"}]}}
+
+
+@pytest.mark.skipif(SQLITE_PROFILE != "wal", reason="LAKSHSETU_SQLITE_PROFILE overridden")
+def test_wal_profile_applied():
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+
+
+def test_concurrent_submits_share_commits():
+    async def submit_all():
+        writer = GroupCommitWriter(window_ms=50, max_batch=64)
+        emails = [f"group{i}@example.com" for i in range(20)] + ["group0@example.com"]
+        results = await asyncio.gather(*(writer.submit(row(e)) for e in emails), return_exceptions=True)
+        await writer.stop()
+        await async_engine.dispose()
+        return writer, results
+
+    writer, results = asyncio.run(submit_all())
+    ids = results[:20]
+    assert all(isinstance(i, int) for i in ids) and len(set(ids)) == 20
+    # The repeated email in the same group is rejected, the rest are written
+    assert isinstance(results[20], DuplicateEmailError)
+    assert writer.rows_written == 20
+    assert writer.commits < 5
+
+
+def test_existing_email_rejected():
+    async def submit_twice():
+        writer = GroupCommitWriter(window_ms=1)
+        first = await writer.submit(row("again@example.com"))
+        with pytest.raises(DuplicateEmailError):
+            await writer.submit(row("again@example.com"))
+        await writer.stop()
+        await async_engine.dispose()
+        return first
+
+    assert isinstance(asyncio.run(submit_twice()), int)
@@ -0,0 +1,140 @@
+"""Opt-in span tracing of agent cycles, exported as Chrome trace JSON.
+
+Load the output in chrome://tracing or https://ui.perfetto.dev. Each span is a
+complete ("X") event carrying the user being processed, the wall and CPU
+(thread) time, and any sizes the caller attached.
+
+Disabled by default: span() then returns a shared no-op context manager and
+never evaluates its args, so instrumented code pays one global lookup per
+span. Enable with enable() or LAKSHSETU_TRACE_FILE=<path> (written at exit;
+"{pid}" in the path is replaced, for process pools).
+"""
+import atexit
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+TRACE_FILE = os.getenv("LAKSHSETU_TRACE_FILE")
+TRACE_MAX_EVENTS = int(os.getenv("LAKSHSETU_TRACE_MAX_EVENTS", "1000000"))
+
+# User whose state is being processed; set by the agent node wrapper, read by nested spans
+current_user: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("lakshsetu_trace_user", default=None)
+
+_NOOP = nullcontext()
+
+SpanArgs = Union[Dict[str, Any], Callable[[], Dict[str, Any]], None]
+
+
+class Tracer:
+    def __init__(self, max_events: int = TRACE_MAX_EVENTS):
+        self.max_events = max_events
+        self.events: List[Dict[str, Any]] = []
+        self.dropped = 0
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter_ns()
+
+    @contextmanager
+    def span(self, name: str, cat: str = "agent", args: SpanArgs = None) -> Iterator[Dict[str, Any]]:
+        """Record `name` around the block. Yields the args dict so the block can add results."""
+        data = dict(args() if callable(args) else args or {})
+        user = current_user.get()
+        if user is not None:
+            data.setdefault("user", user)
+        start = time.perf_counter_ns()
+        cpu_start = time.thread_time_ns()
+        try:
+            yield data
+        finally:
+            cpu = time.thread_time_ns() - cpu_start
+            end = time.perf_counter_ns()
+            data["wall_ms"] = round((end - start) / 1e6, 3)
+            data["cpu_ms"] = round(cpu / 1e6, 3)
+            self._record(name, cat, start, end, data)
+
+    def _record(self, name: str, cat: str, start: int, end: int, args: Dict[str, Any]) -> None:
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": cat,
+            "ph": "X",
+            "ts": (start - self._t0) / 1000,
+            "dur": (end - start) / 1000,
+            "pid": os.getpid(),
+            "tid": thread.ident,
+            "args": args,
+        }
+        with self._lock:
+            if len(self.events) >= self.max_events:
+                self.dropped += 1
+                return
+            self.events.append(event)
+            self._threads.setdefault(thread.ident, thread.name)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        with self._lock:
+            events = list(self.events)
+            threads = dict(self._threads)
+            dropped = self.dropped
+        pid = os.getpid()
+        meta = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": f"lakshsetu[{pid}]"}}]
+        meta += [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}} for tid, name in threads.items()]
+        return {"traceEvents": meta + events, "displayTimeUnit": "ms", "otherData": {"dropped_events": dropped}}
+
+    def export(self, path: str) -> int:
+        """Write the trace as JSON; returns the number of span events."""
+        trace = self.to_chrome_trace()
+        with open(path.replace("{pid}", str(os.getpid())), "w") as f:
+            json.dump(trace, f, default=str)
+        return len(trace["traceEvents"]) - sum(1 for e in trace["traceEvents"] if e["ph"] == "M")
+
+
+_tracer: Optional[Tracer] = None
+
+
+def enable(max_events: int = TRACE_MAX_EVENTS) -> Tracer:
+    """Start recording spans (replaces any current tracer)."""
+    global _tracer
+    _tracer = Tracer(max_events)
+    return _tracer
+
+
+def disable() -> Optional[Tracer]:
+    """Stop recording; returns the tracer so its events can still be exported."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+def span(name: str, cat: str = "agent", args: SpanArgs = None):
+    """Context manager timing the block when tracing is on; a no-op otherwise.
+
+    Pass costly args as a callable so they are only computed while tracing.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NOOP
+    return tracer.span(name, cat, args)
+
+
+def export_trace_file() -> None:
+    """Write the spans to LAKSHSETU_TRACE_FILE, if set and tracing is on.
+
+    Registered with atexit here; pool workers don't run atexit handlers, so
+    their initializers register this as a multiprocessing finalizer instead.
+    """
+    if _tracer is not None and TRACE_FILE:
+        _tracer.export(TRACE_FILE)
+
+
+if TRACE_FILE:
+    enable()
+    atexit.register(export_trace_file)
@@ -0,0 +1,250 @@
+"""Data-driven trending skills from scraped extracts.
+
+Every extract contributes (skill, timestamp, engagement) observations. A skill's
+score is the sum of its observations' weights, each decayed exponentially with
+age (half-life LAKSHSETU_TREND_HALF_LIFE_DAYS):
+
+    weight = source_weight * (1 + log1p(engagement . ENGAGEMENT_COEFFICIENTS))
+    score  = sum(weight * 0.5 ** (age / half_life))
+
+Scores are kept as one NumPy array valued at a reference time, so new batches
+are added with a single bincount and moving the clock is one scalar multiply.
+refresh() ranks the array with argpartition and publishes the top N to
+trend_scrapping_node.set_trending_skills, which suggest_next_steps reads.
+
+ingestion.Ingestion.from_env() feeds shared_engine() with every cycle's fresh
+X / arXiv / Medium / Stack Overflow extracts, so a process running agent cycles
+with ingestion (scheduler.py --ingest, batch_runner.py --ingest) keeps the
+published table current.
+"""
+import math
+import os
+import re
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError("numpy is required for the trend engine. Install with: pip install numpy") from e
+
+import trend_scrapping_node
+from metrics import REGISTRY
+from skill_vocab import canonical_skill, skill_key
+from schemas import (
+    ArxivPaperExtract,
+    MediumArticleExtract,
+    StackOverflowProfileExtract,
+    TrendSkillExtract,
+    XPostExtract,
+)
+
+TREND_HALF_LIFE_DAYS = float(os.getenv("LAKSHSETU_TREND_HALF_LIFE_DAYS", "30"))
+TREND_TOP_N = int(os.getenv("LAKSHSETU_TREND_TOP_N", "10"))
+
+# Engagement columns; weights are log-damped so one viral post doesn't swamp a trend
+ENGAGEMENT_COLUMNS = ("views", "likes", "comments", "shares", "stars", "forks", "impressions", "citations", "reputation", "score")
+ENGAGEMENT_COEFFICIENTS = np.array([0.01, 1.0, 2.0, 3.0, 1.0, 2.0, 0.001, 5.0, 0.01, 10.0])
+
+SOURCE_WEIGHTS: Dict[type, float] = {
+    TrendSkillExtract: 2.0,  # already aggregated upstream
+    ArxivPaperExtract: 1.5,
+    StackOverflowProfileExtract: 1.0,
+    MediumArticleExtract: 1.0,
+    XPostExtract: 0.5,
+}
+
+# arXiv categories that name a skill people list on a profile
+ARXIV_CATEGORY_SKILLS = {
+    "cs.AI": "Machine Learning",
+    "cs.LG": "Machine Learning",
+    "stat.ML": "Machine Learning",
+    "cs.CL": "NLP",
+    "cs.CV": "Computer Vision",
+    "cs.CR": "Cybersecurity",
+    "cs.DC": "Distributed Systems",
+    "cs.DB": "Data Engineering",
+    "cs.RO": "Robotics",
+    "cs.SE": "Software Engineering",
+}
+
+_HASHTAG = re.compile(r"#(\w+)")
+
+Observation = Tuple[str, datetime, Dict[str, float]]
+
+
+def to_epoch(ts: datetime) -> float:
+    """POSIX seconds for `ts`; naive timestamps are UTC (ExtractionMeta.fetched_at)."""
+    return (ts if ts.tzinfo is not None else ts.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def _metrics(metrics: Any) -> Dict[str, float]:
+    return {k: getattr(metrics, k) for k in ("views", "likes", "comments", "shares", "stars", "forks", "impressions")}
+
+
+def observations(extract: Any) -> List[Observation]:
+    """(skill, when, engagement) rows for one extract; unknown types yield nothing."""
+    fetched_at = extract.meta.fetched_at if extract.meta else None
+    if isinstance(extract, TrendSkillExtract):
+        return [(extract.name, fetched_at, {"score": extract.score})] if fetched_at else []
+    if isinstance(extract, ArxivPaperExtract):
+        when = extract.published_at or fetched_at
+        engagement = {"citations": extract.citations or 0}
+        return [(ARXIV_CATEGORY_SKILLS.get(c, c), when, engagement) for c in dict.fromkeys(extract.categories)]
+    if isinstance(extract, MediumArticleExtract):
+        when = extract.published_at or fetched_at
+        engagement = _metrics(extract.metrics)
+        return [(tag, when, engagement) for tag in dict.fromkeys(extract.tags)]
+    if isinstance(extract, XPostExtract):
+        when = extract.created_at or fetched_at
+        engagement = _metrics(extract.metrics)
+        return [(tag, when, engagement) for tag in dict.fromkeys(_HASHTAG.findall(extract.content))]
+    if isinstance(extract, StackOverflowProfileExtract):
+        engagement = {"reputation": extract.reputation, "comments": extract.answers}
+        return [(tag, fetched_at, engagement) for tag in dict.fromkeys(extract.top_tags)]
+    return []
+
+
+class TrendEngine:
+    """Incrementally maintained, time-decayed skill scores with a published top-N table.
+
+    Readers use top()/rank(), which only touch the last published table.
+    """
+
+    def __init__(self, half_life_days: float = TREND_HALF_LIFE_DAYS, top_n: int = TREND_TOP_N, publish: bool = True):
+        self.decay_rate = math.log(2) / (half_life_days * 86400.0)  # per second
+        self.top_n = top_n
+        self.publish = publish
+        self._index: Dict[str, int] = {}  # skill_vocab key -> column
+        self._names: List[str] = []  # canonical display name
+        self._scores = np.zeros(0)
+        self._ref: Optional[float] = None  # epoch seconds the scores are valued at
+        self._lock = threading.Lock()
+        self.observations = 0
+        self.version = 0
+        self.table: Tuple[Tuple[str, float], ...] = ()
+        self._ranks: Dict[str, int] = {}
+        self._published: Tuple[str, ...] = ()
+
+    def _columns(self, names: Iterable[str]) -> np.ndarray:
+        # Caller holds self._lock
+        cols = []
+        for name in names:
+            key = skill_key(name)
+            col = self._index.get(key)
+            if col is None:
+                col = self._index[key] = len(self._names)
+                self._names.append(canonical_skill(name))
+            cols.append(col)
+        if len(self._names) > len(self._scores):
+            self._scores = np.concatenate([self._scores, np.zeros(len(self._names) - len(self._scores))])
+        return np.fromiter(cols, dtype=np.intp, count=len(cols))
+
+    def _advance(self, to: float) -> None:
+        # Caller holds self._lock; revalue every score at `to` in one multiply
+        if self._ref is None:
+            self._ref = to
+        elif to > self._ref:
+            self._scores *= math.exp(-self.decay_rate * (to - self._ref))
+            self._ref = to
+
+    def ingest(self, extracts: Iterable[Any], refresh: bool = True) -> int:
+        """Add a batch of extracts; returns the number of observations taken."""
+        names: List[str] = []
+        times: List[float] = []
+        engagement: List[List[float]] = []
+        source_weights: List[float] = []
+        for extract in extracts:
+            weight = SOURCE_WEIGHTS.get(type(extract), 1.0)
+            for skill, when, values in observations(extract):
+                if not skill or when is None:
+                    continue
+                names.append(skill)
+                times.append(to_epoch(when))
+                engagement.append([values.get(c, 0) for c in ENGAGEMENT_COLUMNS])
+                source_weights.append(weight)
+        if not names:
+            return 0
+
+        ts = np.asarray(times)
+        weights = np.asarray(source_weights) * (1.0 + np.log1p(np.asarray(engagement, dtype=np.float64) @ ENGAGEMENT_COEFFICIENTS))
+        with self._lock:
+            cols = self._columns(names)
+            self._advance(float(ts.max()))
+            decayed = weights * np.exp(-self.decay_rate * (self._ref - ts))
+            self._scores += np.bincount(cols, weights=decayed, minlength=len(self._scores))
+            self.observations += len(names)
+        if refresh:
+            self.refresh()
+        return len(names)
+
+    def refresh(self, now: Optional[datetime] = None) -> int:
+        """Decay scores to `now` (default: latest observation) and publish a new top-N table."""
+        with self._lock:
+            if now is not None:
+                self._advance(to_epoch(now))
+            scores = self._scores
+            k = min(self.top_n, len(scores))
+            if k:
+                top = np.argpartition(-scores, k - 1)[:k]
+                top = top[np.argsort(-scores[top], kind="stable")]
+                table = tuple((self._names[i], float(scores[i])) for i in top if scores[i] > 0)
+            else:
+                table = ()
+            self.version += 1
+            version = self.version
+        self.table = table
+        self._ranks = {skill_key(name): rank for rank, (name, _) in enumerate(table, 1)}
+        names = tuple(name for name, _ in table)
+        # Uniform decay doesn't reorder; only publish (and invalidate memoized recs) on a new ranking
+        if self.publish and names != self._published:
+            self._published = names
+            trend_scrapping_node.set_trending_skills(names, f"{id(self):x}-{version}")
+        return version
+
+    def top(self, n: Optional[int] = None) -> Tuple[Tuple[str, float], ...]:
+        """Ranked (skill, score) pairs from the last refresh."""
+        return self.table if n is None else self.table[:n]
+
+    def rank(self, skill: str) -> Optional[int]:
+        """1-based rank of `skill` in the last refresh, or None if outside the top N."""
+        return self._ranks.get(skill_key(skill))
+
+    def scores(self, now: Optional[datetime] = None) -> Dict[str, float]:
+        """Every skill's score, valued at `now` (default: the engine's reference time)."""
+        with self._lock:
+            factor = 1.0
+            if now is not None and self._ref is not None:
+                factor = math.exp(-self.decay_rate * (to_epoch(now) - self._ref))
+            return {name: float(v) * factor for name, v in zip(self._names, self._scores)}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "skills": len(self._names),
+                "observations": self.observations,
+                "version": self.version,
+                "reference_time": datetime.fromtimestamp(self._ref, timezone.utc).isoformat() if self._ref else None,
+                "top": [name for name, _ in self.table[:5]],
+            }
+
+    def _collect(self):
+        stats = self.stats()
+        yield ("lakshsetu_trend_skills", "gauge", "Distinct skills scored by the trend engine", [({}, stats["skills"])])
+        yield ("lakshsetu_trend_observations_total", "counter", "Extract observations ingested", [({}, stats["observations"])])
+        yield ("lakshsetu_trend_table_version", "gauge", "Refreshes of the published trend table", [({}, stats["version"])])
+
+
+_shared: Optional[TrendEngine] = None
+_shared_lock = threading.Lock()
+
+
+def shared_engine() -> TrendEngine:
+    """The process's publishing TrendEngine, created on first use; it alone exports metrics."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = TrendEngine()
+            REGISTRY.register_collector(_shared._collect)
+        return _shared
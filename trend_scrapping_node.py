@@ -11,13 +11,31 @@ from schemas import (
     MediumArticleExtract,
     StackOverflowProfileExtract,
     GoogleScholarPublicationExtract,
-    CareerActionRecommendation
+    CareerActionRecommendation,
+    DataSource,
 )
+import hashlib
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from schemas import UserProfile, Skills, Projects, Certifications
+from metrics import REGISTRY
+from rule_engine import RULES
+from skill_vocab import canonical_skill, skill_key
+import tracing
 # --- Alignment + Recommendation pipeline ---
 
+# Accounts with more repositories than this feed only their top repos (by recency,
+# stars, forks, impressions; see repo_analytics) into profile.projects. Skills still
+# come from every repo's primary language.
+PROFILE_REPO_LIMIT = int(os.getenv("LAKSHSETU_PROFILE_REPO_LIMIT", "50"))
+
+
 def _safe_model_dump(model: BaseModel) -> dict:
     return model.model_dump() if hasattr(model, "model_dump") else model.dict()
 
@@ -49,7 +67,7 @@ def _merge_projects(existing: List[Projects], new: List[Projects]) -> List[Proje
         if key in by_name:
             # Merge technologies and keep first description/link
             merged = by_name[key]
-            merged.techniques = list(set(merged.technologies + p.technologies)) if hasattr(merged, 'technologies') else merged.technologies
+            merged.technologies = list(dict.fromkeys(merged.technologies + p.technologies))
             if not merged.link and p.link:
                 merged.link = p.link
             if not merged.interactions and p.interactions:
@@ -60,17 +78,19 @@ def _merge_projects(existing: List[Projects], new: List[Projects]) -> List[Proje
 
 
 def _merge_skills(existing: List[Skills], new_names: List[str], default_strength: str = "Medium") -> List[Skills]:
-    if not existing:
-        existing = []
-    have = {s.skill_name.lower(): s for s in existing}
+    # Existing entries are all kept; a new name is added only if no skill has its
+    # canonical vocabulary key yet, so "ML" and "Machine Learning" are one skill
+    merged = list(existing or [])
+    have = {skill_key(s.skill_name) for s in merged}
     for n in new_names:
-        key = str(n).strip()
-        if not key:
+        name = str(n).strip()
+        if not name:
             continue
-        lk = key.lower()
-        if lk not in have:
-            have[lk] = Skills(skill_name=key, skill_strength=default_strength)
-    return list(have.values())
+        key = skill_key(name)
+        if key not in have:
+            have.add(key)
+            merged.append(Skills(skill_name=canonical_skill(name), skill_strength=default_strength))
+    return merged
 
 
 def align_extractions_with_profile(
@@ -86,11 +106,19 @@ def align_extractions_with_profile(
     # Map GitHub
     if github:
         updated.github = github.username or updated.github
-        # Projects from repos
-        gh_projects = [_project_from_github_repo(r) for r in (github.repositories or [])]
+        repos = github.repositories or []
+        if len(repos) > PROFILE_REPO_LIMIT:
+            from repo_analytics import repo_frame
+
+            frame = repo_frame(github)
+            gh_projects = frame.projects(PROFILE_REPO_LIMIT)
+            gh_skills = frame.language_names()
+        else:
+            # Projects from repos
+            gh_projects = [_project_from_github_repo(r) for r in repos]
+            # Skills from repo primary languages (heuristic)
+            gh_skills = [r.primary_language for r in repos if r.primary_language]
         updated.projects = _merge_projects(updated.projects or [], gh_projects)
-        # Skills from repo primary languages (heuristic)
-        gh_skills = [r.primary_language for r in (github.repositories or []) if r.primary_language]
         updated.skills = _merge_skills(updated.skills or [], gh_skills)
         # Website/blog
         if github.blog and not updated.website:
@@ -122,115 +150,399 @@ def align_extractions_with_profile(
     return updated
 
 
-def suggest_next_steps(
+
+# --- Delta alignment ---
+#
+# align_extractions_with_profile copies the whole profile and rescans every extract
+# item on each call. diff_extractions builds a ProfilePatch from only the extract
+# items fetched/updated after `since` (the last aligned ExtractionMeta.fetched_at per
+# source), and ProfilePatch.apply adds it to the existing profile in place.
+
+def _utc_naive(ts: Optional[datetime]) -> Optional[datetime]:
+    # ExtractionMeta.fetched_at is naive UTC; parsed extracts may carry a tzinfo
+    if ts is not None and ts.tzinfo is not None:
+        return ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def _is_new(ts: Optional[datetime], since: Optional[datetime]) -> bool:
+    return since is None or ts is None or _utc_naive(ts) > since
+
+
+@dataclass
+class ProjectMerge:
+    technologies: List[str] = field(default_factory=list)
+    link: Optional[str] = None
+    interactions: Optional[str] = None
+
+
+@dataclass
+class ProfilePatch:
+    fields: Dict[str, Any] = field(default_factory=dict)
+    added_skills: List[Skills] = field(default_factory=list)
+    added_projects: List[Projects] = field(default_factory=list)
+    merged_projects: Dict[str, ProjectMerge] = field(default_factory=dict)  # lowercased existing project name -> merge
+    added_certifications: List[Certifications] = field(default_factory=list)
+    fetched_at: Dict[str, datetime] = field(default_factory=dict)  # source -> newest fetched_at seen (next `since`)
+
+    def is_empty(self) -> bool:
+        return not (self.fields or self.added_skills or self.added_projects or self.merged_projects or self.added_certifications)
+
+    def apply(self, user: UserProfile) -> UserProfile:
+        """Apply in place and return `user`.
+
+        Merged projects are replaced with updated copies rather than edited: the
+        Projects objects may be shared with a memoized result (see _detached).
+        """
+        for name, value in self.fields.items():
+            setattr(user, name, value)
+        if self.merged_projects:
+            projects = []
+            for p in user.projects:
+                merge = self.merged_projects.get(p.name.lower())
+                if merge is not None:
+                    p = p.model_copy(
+                        update={
+                            "technologies": list(dict.fromkeys((p.technologies or []) + merge.technologies)),
+                            "link": p.link or merge.link,
+                            "interactions": p.interactions or merge.interactions,
+                        }
+                    )
+                projects.append(p)
+            user.projects = projects
+        if self.added_projects:
+            user.projects = user.projects + self.added_projects
+        if self.added_skills:
+            user.skills = (user.skills or []) + self.added_skills
+        if self.added_certifications:
+            user.certifications = (user.certifications or []) + self.added_certifications
+        return user
+
+
+def diff_extractions(
     user: UserProfile,
     github: Optional[GitHubUserExtract] = None,
     linkedin: Optional[LinkedInProfileExtract] = None,
-) -> List[CareerActionRecommendation]:
-    """Suggest prioritized next actions based on profile and recent extractions."""
-    recs: List[CareerActionRecommendation] = []
-
-    # 1) Skill gap suggestions (vs. simple heuristic trending list)
-    trending = ["AI/ML", "Generative AI", "Cloud-Native", "MLOps", "Data Engineering", "Cybersecurity"]
-    if user.skills:
-        user_skill_names = {s.skill_name.lower() for s in user.skills}
-        gaps = [t for t in trending if t.lower() not in user_skill_names]
-        if gaps:
-            recs.append(CareerActionRecommendation(
-                title="Close top skill gaps",
-                description=f"Focus on: {', '.join(gaps[:3])}",
-                reason="In-demand skills not present in profile",
-                priority=1,
-                suggested_actions=[
-                    f"Take a short course on {gaps[0]}" if gaps else "",
-                    "Build a weekend project demonstrating the skill",
-                    "Share a LinkedIn post about what you learned",
-                ],
-            ))
-
-    # 2) GitHub recency-driven suggestions
-    if github and github.repositories:
-        # Find most recently updated repo
-        most_recent = None
-        for r in github.repositories:
-            if r.last_updated and (most_recent is None or (r.last_updated > most_recent.last_updated)):
-                most_recent = r
-        if most_recent:
-            recs.append(CareerActionRecommendation(
-                title="Polish your most recent repo",
-                description=f"Improve README and add a demo to {most_recent.name}",
-                reason="Recent work is easiest to showcase for quick wins",
-                priority=2,
-                suggested_actions=[
-                    "Add a clear README with setup, features, and screenshots",
-                    "Publish a short demo video (GIF or Loom) and link it",
-                    "Pin the repo and share on LinkedIn",
-                ],
-            ))
-
-    # 3) LinkedIn activity suggestions
+    hf_models: Optional[List[HuggingFaceModelExtract]] = None,
+    since: Optional[Dict[str, datetime]] = None,
+) -> ProfilePatch:
+    """Patch that brings `user` up to date with the extract items newer than `since`.
+
+    `since` maps DataSource values to the fetched_at of the extracts aligned last
+    time; sources missing from it are processed in full. Applied to a profile with
+    no earlier alignment, the result matches align_extractions_with_profile, except
+    that LinkedIn certifications already on the profile are not added again.
+    """
+    since = since or {}
+    patch = ProfilePatch()
+    skill_keys = {skill_key(s.skill_name) for s in (user.skills or [])}
+    project_keys = None  # built on first use
+    new_projects: Dict[str, Projects] = {}
+
+    def add_skills(names: List[str]) -> None:
+        for n in names:
+            name = str(n).strip()
+            if not name:
+                continue
+            key = skill_key(name)
+            if key not in skill_keys:
+                skill_keys.add(key)
+                patch.added_skills.append(Skills(skill_name=canonical_skill(name), skill_strength="Medium"))
+
+    def current(name: str) -> Any:
+        return patch.fields.get(name, getattr(user, name))
+
+    if github:
+        source_since = since.get(DataSource.github.value)
+        fetched_at = _utc_naive(github.meta.fetched_at)
+        patch.fetched_at[DataSource.github.value] = fetched_at
+        if _is_new(fetched_at, source_since):
+            if github.username and github.username != user.github:
+                patch.fields["github"] = github.username
+            all_repos = github.repositories or []
+            if len(all_repos) > PROFILE_REPO_LIMIT:
+                from repo_analytics import repo_frame
+
+                frame = repo_frame(github)
+                changed = frame.updated_since(source_since)
+                new = set(changed.tolist())
+                repos = [all_repos[i] for i in frame.featured(PROFILE_REPO_LIMIT) if i in new]
+                languages = frame.language_names(changed)
+            else:
+                repos = [r for r in all_repos if _is_new(r.last_updated, source_since)]
+                languages = [r.primary_language for r in repos if r.primary_language]
+            if repos:
+                project_keys = {p.name.lower() for p in user.projects}
+            for r in repos:
+                project = _project_from_github_repo(r)
+                key = project.name.lower()
+                if key in new_projects:
+                    target = new_projects[key]
+                    target.technologies = list(dict.fromkeys(target.technologies + project.technologies))
+                    target.link = target.link or project.link
+                    target.interactions = target.interactions or project.interactions
+                elif key in project_keys:
+                    merge = patch.merged_projects.setdefault(key, ProjectMerge())
+                    merge.technologies = list(dict.fromkeys(merge.technologies + project.technologies))
+                    merge.link = merge.link or project.link
+                    merge.interactions = merge.interactions or project.interactions
+                else:
+                    new_projects[key] = project
+            add_skills(languages)
+            if github.blog and not current("website"):
+                patch.fields["website"] = str(github.blog)
+
     if linkedin:
-        if (linkedin.post_count or 0) == 0:
-            recs.append(CareerActionRecommendation(
-                title="Post on LinkedIn",
-                description="Write a short post summarizing a recent learning or project",
-                reason="Zero posts — build visibility",
-                priority=2,
-                suggested_actions=[
-                    "Share a 150–200 word post with a screenshot",
-                    "Add relevant hashtags",
-                    "Cross-link to your GitHub project",
-                ],
-            ))
-        if (linkedin.connections or 0) < 200:
-            recs.append(CareerActionRecommendation(
-                title="Grow your network",
-                description="Connect with alumni and peers in your field",
-                reason="Under 200 connections typically limits reach",
-                priority=3,
-                suggested_actions=[
-                    "Send 5 personalized connection requests to alumni",
-                    "Join 1–2 relevant LinkedIn groups",
-                ],
-            ))
-
-    # 4) Certification utilization
-    if user.certifications and not user.projects:
-        recs.append(CareerActionRecommendation(
-            title="Turn a certification into a project",
-            description="Build a small project applying your certified skill",
-            reason="Projects demonstrate practical ability",
-            priority=2,
-            suggested_actions=[
-                "Scope a 1–2 week build",
-                "Write a blog/README on the approach and results",
-            ],
-        ))
-
-    return recs
+        source_since = since.get(DataSource.linkedin.value)
+        fetched_at = _utc_naive(linkedin.meta.fetched_at)
+        patch.fetched_at[DataSource.linkedin.value] = fetched_at
+        if _is_new(fetched_at, source_since):
+            if linkedin.username and linkedin.username != user.linkedin:
+                patch.fields["linkedin"] = linkedin.username
+            if linkedin.location and not current("location"):
+                patch.fields["location"] = linkedin.location
+            add_skills(linkedin.skills or [])
+            if linkedin.certifications:
+                have = {c.title.lower() for c in (user.certifications or [])}
+                for title in linkedin.certifications:
+                    if title.lower() not in have:
+                        have.add(title.lower())
+                        patch.added_certifications.append(Certifications(title=title, issuer="LinkedIn", issued_date="Unknown"))
+
+    if hf_models:
+        source_since = since.get(DataSource.huggingface.value)
+        hf_skill_names: List[str] = []
+        for m in hf_models:
+            fetched_at = _utc_naive(m.meta.fetched_at)
+            newest = patch.fetched_at.get(DataSource.huggingface.value)
+            if newest is None or fetched_at > newest:
+                patch.fetched_at[DataSource.huggingface.value] = fetched_at
+            if not (_is_new(fetched_at, source_since) and _is_new(m.last_modified, source_since)):
+                continue
+            if m.task:
+                hf_skill_names.append(m.task)
+            hf_skill_names.extend(m.tags or [])
+        add_skills(hf_skill_names)
 
+    patch.added_projects = list(new_projects.values())
+    return patch
 
-def process_extractions_and_recommend(
+
+def suggest_next_steps(
     user: UserProfile,
     github: Optional[GitHubUserExtract] = None,
     linkedin: Optional[LinkedInProfileExtract] = None,
-    hf_models: Optional[List[HuggingFaceModelExtract]] = None,
-) -> tuple[UserProfile, List[CareerActionRecommendation]]:
-    """End-to-end: align extractions into the profile and produce next-step recommendations."""
-    aligned = align_extractions_with_profile(user, github=github, linkedin=linkedin, hf_models=hf_models)
-    recs = suggest_next_steps(aligned, github=github, linkedin=linkedin)
-    aligned.recommendations = [r.title for r in recs]
-    return aligned, recs
+) -> List[CareerActionRecommendation]:
+    """Suggest prioritized next actions based on profile and recent extractions.
+
+    The rules live in rule_engine (built-in set, or LAKSHSETU_RULES_FILE); skill
+    gaps are taken against the published trend table.
+    """
+    return RULES.evaluate(user, github=github, linkedin=linkedin, trending=TRENDING_SKILLS)
+
+
+# --- Memoization ---
+#
+# trend_scrapping_node and run_interaction both call process_extractions_and_recommend,
+# usually on unchanged inputs. Results are memoized by a content hash of
+# (user, github, linkedin, hf_models) plus the rule-set and trend versions, and
+# dropped whenever either version changes. The rules file is checked for changes
+# before every lookup.
+
+RECS_MEMO_MAX_ENTRIES = int(os.getenv("LAKSHSETU_RECS_MEMO_SIZE", "4096"))  # 0 disables
+# How agent.trend_scrapping_node aligns: "full" (memoized rebuild, the default) or
+# "delta" (opt-in diff_extractions patch; recomputes recommendations, bypassing the memo)
+ALIGN_MODE = os.getenv("LAKSHSETU_ALIGN_MODE", "full")
+
 
+# Ranked trending skills read by suggest_next_steps. trend_engine.TrendEngine.refresh()
+# publishes a data-driven table here; the static list is used until it has data.
+DEFAULT_TRENDING_SKILLS: Tuple[str, ...] = ("Machine Learning", "Generative AI", "Cloud-Native", "MLOps", "Data Engineering", "Cybersecurity")
+TRENDING_SKILLS: Tuple[str, ...] = DEFAULT_TRENDING_SKILLS
+TRENDS_VERSION = "static"
 
 
+def set_trending_skills(names: Sequence[str], version: str) -> None:
+    """Publish a new ranked trend table (memoized recommendations are invalidated)."""
+    global TRENDING_SKILLS, TRENDS_VERSION
+    TRENDING_SKILLS = tuple(names) or DEFAULT_TRENDING_SKILLS
+    TRENDS_VERSION = str(version)
 
 
+def _memo_version() -> str:
+    # RULES.version is the one rule-set version: it changes on every (re)load
+    return f"{RULES.version}/trends:{TRENDS_VERSION}"
 
 
+# Extract digests by object identity: extracts are never edited after fetching
+# (ingestion replaces them wholesale), so each is serialized once, not once per call.
+_extract_digests: Dict[int, Tuple[weakref.ref, bytes]] = {}
 
 
+def _model_digest(model: BaseModel) -> bytes:
+    return hashlib.blake2b(model.__pydantic_serializer__.to_json(model, warnings=False), digest_size=16).digest()
 
 
+def _extract_digest(extract: BaseModel) -> bytes:
+    cached = _extract_digests.get(id(extract))
+    if cached is not None and cached[0]() is extract:
+        return cached[1]
+    digest = _model_digest(extract)
+    key = id(extract)
+    _extract_digests[key] = (weakref.ref(extract, lambda _, key=key: _extract_digests.pop(key, None)), digest)
+    return digest
 
 
+def _memo_key(
+    user: UserProfile,
+    github: Optional[GitHubUserExtract],
+    linkedin: Optional[LinkedInProfileExtract],
+    hf_models: Optional[List[HuggingFaceModelExtract]],
+) -> Tuple[bytes, ...]:
+    # The profile is mutable (answers, approvals), so it is hashed on every call. The
+    # rule-set and trend versions are part of the key, so no hit outlives a reload.
+    return (
+        _memo_version().encode(),
+        _model_digest(user),
+        _extract_digest(github) if github is not None else b"",
+        _extract_digest(linkedin) if linkedin is not None else b"",
+        *(_extract_digest(m) for m in hf_models or []),
+    )
+
+
+def _detached(aligned: UserProfile, recs: List[CareerActionRecommendation]) -> Tuple[UserProfile, List[CareerActionRecommendation]]:
+    # Callers mutate results (approval_status, projects.append), so hand out fresh
+    # top-level objects and lists. Nested Skills/Projects stay shared, so nothing
+    # may edit them in place (ProfilePatch.apply copies the projects it merges into).
+    lists = {name: list(value) for name, value in aligned.__dict__.items() if isinstance(value, list)}
+    return aligned.model_copy(update=lists), [r.model_copy(update={"suggested_actions": list(r.suggested_actions)}) for r in recs]
+
+
+class RecommendationMemo:
+    """LRU of (aligned_user, recs) keyed by input content hash, scoped to the rule-set and trend versions."""
+
+    def __init__(self, max_entries: int = RECS_MEMO_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.version = _memo_version()
+        self._entries: "OrderedDict[Tuple[bytes, ...], Tuple[UserProfile, List[CareerActionRecommendation]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self) -> None:
+        # Caller holds self._lock
+        version = _memo_version()
+        if self.version != version:
+            self._entries.clear()
+            self.version = version
+            self.invalidations += 1
+
+    def get(self, key: Tuple[bytes, ...]) -> Optional[Tuple[UserProfile, List[CareerActionRecommendation]]]:
+        with self._lock:
+            self._check_version()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return _detached(*entry)
+
+    def put(self, key: Tuple[bytes, ...], aligned: UserProfile, recs: List[CareerActionRecommendation]) -> None:
+        entry = _detached(aligned, recs)
+        with self._lock:
+            self._check_version()
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "ruleset_version": self.version,
+            }
+
+
+recommendation_memo = RecommendationMemo()
+
+
+def _memo_metrics():
+    stats = recommendation_memo.stats()
+    yield (
+        "lakshsetu_recs_memo_events_total", "counter", "process_extractions_and_recommend memo lookups and evictions",
+        [({"event": k}, stats[k]) for k in ("hits", "misses", "evictions", "invalidations")],
+    )
+    yield ("lakshsetu_recs_memo_entries", "gauge", "Memoized recommendation results", [({}, stats["entries"])])
+
+
+REGISTRY.register_collector(_memo_metrics)
+
+
+def _process_extractions_and_recommend(
+    user: UserProfile,
+    github: Optional[GitHubUserExtract] = None,
+    linkedin: Optional[LinkedInProfileExtract] = None,
+    hf_models: Optional[List[HuggingFaceModelExtract]] = None,
+) -> tuple[UserProfile, List[CareerActionRecommendation]]:
+    with tracing.span("align_extractions"):
+        aligned = align_extractions_with_profile(user, github=github, linkedin=linkedin, hf_models=hf_models)
+    with tracing.span("suggest_next_steps"):
+        recs = suggest_next_steps(aligned, github=github, linkedin=linkedin)
+    aligned.recommendations = [r.title for r in recs]
+    return aligned, recs
+
+
+def process_extractions_and_recommend(
+    user: UserProfile,
+    github: Optional[GitHubUserExtract] = None,
+    linkedin: Optional[LinkedInProfileExtract] = None,
+    hf_models: Optional[List[HuggingFaceModelExtract]] = None,
+) -> tuple[UserProfile, List[CareerActionRecommendation]]:
+    """End-to-end: align extractions into the profile and produce next-step recommendations."""
+    # Before the memo: a hit never reaches RULES.evaluate, where reloads are otherwise checked
+    RULES.maybe_reload()
+    if recommendation_memo.max_entries <= 0:
+        return _process_extractions_and_recommend(user, github=github, linkedin=linkedin, hf_models=hf_models)
+    with tracing.span("recs_memo_lookup"):
+        key = _memo_key(user, github, linkedin, hf_models)
+        cached = recommendation_memo.get(key)
+    if cached is not None:
+        return cached
+    aligned, recs = _process_extractions_and_recommend(user, github=github, linkedin=linkedin, hf_models=hf_models)
+    recommendation_memo.put(key, aligned, recs)
+    return aligned, recs
+
+
+def apply_extractions_and_recommend(
+    user: UserProfile,
+    github: Optional[GitHubUserExtract] = None,
+    linkedin: Optional[LinkedInProfileExtract] = None,
+    hf_models: Optional[List[HuggingFaceModelExtract]] = None,
+    since: Optional[Dict[str, datetime]] = None,
+) -> Tuple[UserProfile, List[CareerActionRecommendation], ProfilePatch]:
+    """Delta counterpart of process_extractions_and_recommend: patches `user` in place.
+
+    Returns (user, recs, patch); patch.fetched_at is the `since` for the next call.
+    """
+    with tracing.span("diff_extractions"):
+        patch = diff_extractions(user, github=github, linkedin=linkedin, hf_models=hf_models, since=since)
+        patch.apply(user)
+    with tracing.span("suggest_next_steps"):
+        recs = suggest_next_steps(user, github=github, linkedin=linkedin)
+    user.recommendations = [r.title for r in recs]
+    return user, recs, patch